@@ -33,10 +33,10 @@ setup(
     scripts=glob('src/scripts/*'),
     install_requires=[
         'Pillow >=7.2.0',
+        'numpy >=1.19.0',
         'PySide2 >=5.15.0',
         'imageio >=2.9.0',
         'imageio-ffmpeg >=0.4.2',
-        'stockfish >=3.10.2'
     ],
     license='MIT',
     classifiers=[
@@ -37,12 +37,28 @@ class GAME:
     )
     DEFAULT_PLAY_TIME = 10
     DEFAULT_BONUS_TIME = 0
+    FIFTY_MOVES_HALFMOVES = 100
+    REPETITIONS_FOR_DRAW = 3
+
+    # Total worth of the pieces, kings left out, above which mate is
+    # always possible
+    MAX_INSUFFICIENT_MATERIAL = 6
+
+
+@enum.unique
+class DrawReason(enum.Enum):
+    stalemate = 0
+    repetition = 1
+    fifty_moves = 2
+    insufficient_material = 3
+    adjudication = 4
 
 
 @enum.unique
 class EngineType(enum.Enum):
     stockfish = 0
     leela = 1
+    native = 2
 
 
 @enum.unique
@@ -99,6 +115,7 @@ class APP:
     LCD_HEIGHT = 40
     MEDIUM_HEIGHT = 30
     STOCKFISH_EXE_NAME = 'stockfish'
+    BITBASE_DIR = os.path.join(RESOURCE_DIR, 'bitbase')
 
     FONT_FAMILY = 'Andale Mono'
     FONT_FILE_PATH = os.path.join(RESOURCE_DIR, f'font/{FONT_FAMILY}.ttf')
@@ -15,12 +15,14 @@ def run():
     QtGui.QFontDatabase.addApplicationFont(c.APP.FONT_FILE_PATH)
     QtGui.QFontDatabase.addApplicationFont(c.APP.CHESS_FONT_FILE_PATH)
 
+    # Games between people are played out, endgames are not adjudicated
     game = Game()
     w = MainWidget(board=game.board)
     w.MOVE_SIGNAL.connect(game.move)
     w.GAME_RESET_SIGNAL.connect(game.reset)
     w.GAME_OPTIONS_SET_SIGNAL.connect(game.set_game_options)
     w.GAME_OVER_SIGNAL.connect(game.game_over)
+    # Loaded games come from a user file, their moves are validated
     w.BULK_MOVE_SIGNAL.connect(game.apply_moves)
 
     game.MOVE_SIGNAL.connect(w.update_move)
@@ -29,6 +31,7 @@ def run():
     game.MATE_SIGNAL.connect(w.game_over)
     game.NON_STANDARD_BOARD_SET_SIGNAL.connect(w.update_board)
     game.STALEMATE_SIGNAL.connect(w.stalemate)
+    game.DRAW_SIGNAL.connect(w.draw)
     game.PROMOTION_REQUIRED_SIGNAL.connect(w.promotion_required)
 
     w.show()
@@ -0,0 +1,264 @@
+import os
+import collections
+import json
+import queue
+import textwrap
+import threading
+
+
+from .. import constant as c
+from .engineer import Engine
+from .pgn import PGN2MOVES
+from .positioner import Position, WHITE
+
+
+PLY_ANNOTATION = collections.namedtuple(
+    'PLY_ANNOTATION',
+    [
+        'san',
+        'eval_text',
+        'nag',
+        'comment',
+    ],
+)
+
+
+PROMOTION_CODES = {
+    c.PieceType.queen: 'q',
+    c.PieceType.rook: 'r',
+    c.PieceType.bishop: 'b',
+    c.PieceType.knight: 'n',
+}
+
+
+class Annotator:
+    # Eval swing thresholds in centipawns, from the point of view of the
+    # player who made the move, and their NAGs
+    INACCURACY = (50, '$6', 'Inaccuracy')
+    MISTAKE = (100, '$2', 'Mistake')
+    BLUNDER = (300, '$4', 'Blunder')
+
+    # Centipawn value given to a forced mate when measuring eval swings
+    MATE_VALUE = 10000
+
+    DEFAULT_DEPTH = 12
+
+    def __init__(
+            self,
+            engine_type=c.EngineType.stockfish,
+            engine_params=None,
+            nb_engines=None,
+            depth=None,
+            movetime=None,
+            nodes=None,
+            cache=None,
+    ):
+        self._engine_type = engine_type
+        self._engine_params = engine_params
+        self._nb_engines = nb_engines or os.cpu_count() or 1
+        self._depth = depth
+        self._movetime = movetime
+        self._nodes = nodes
+        if depth is None and movetime is None and nodes is None:
+            self._depth = self.DEFAULT_DEPTH
+        self._cache = cache
+
+    def annotate(self, pgn_file_path, output_path, checkpoint_path=None):
+        """
+        Annotates every game of the PGN file and writes them to output_path.
+
+        Finished games are appended to the checkpoint file as soon as they
+        are done, a run that is interrupted can be started again with the
+        same checkpoint and only the remaining games are analysed.
+        """
+        pgn = PGN2MOVES(pgn_file_path=pgn_file_path)
+        checkpoint_path = checkpoint_path or f'{output_path}.checkpoint'
+        done = self._read_checkpoint(checkpoint_path)
+
+        pending = [i for i in range(pgn.nb_games) if i not in done]
+        jobs = queue.Queue()
+        for index in pending:
+            moves = [
+                self._to_uci(src, dst, promotion)
+                for src, dst, promotion in pgn.get_moves(index)
+            ]
+            result = pgn.header_info[index].result or '*'
+            jobs.put((index, pgn.game_info[index], moves, result))
+
+        results = queue.Queue()
+        nb_workers = min(self._nb_engines, len(pending))
+        workers = [
+            threading.Thread(
+                target=self._work,
+                args=(jobs, results),
+                daemon=True,
+            )
+            for _ in range(nb_workers)
+        ]
+        for worker in workers:
+            jobs.put(None)
+            worker.start()
+
+        with open(checkpoint_path, 'a') as fp:
+            for _ in pending:
+                index, text = results.get()
+                if isinstance(text, Exception):
+                    raise text
+
+                done[index] = text
+                fp.write(json.dumps({'index': index, 'text': text}) + '\n')
+                fp.flush()
+
+        for worker in workers:
+            worker.join()
+
+        with open(output_path, 'w') as fp:
+            fp.write('\n\n'.join(done[i] for i in sorted(done)))
+            fp.write('\n')
+
+        return len(pending)
+
+    def annotate_moves(self, engine, moves):
+        """
+        Evaluates the position before and after every ply of the game (uci
+        moves) and returns a PLY_ANNOTATION per ply.
+        """
+        position = Position()
+        evals = []
+        for ply in range(len(moves) + 1):
+            result = engine.analyse(
+                moves=moves[:ply],
+                depth=self._depth,
+                movetime=self._movetime,
+                nodes=self._nodes,
+            )
+            evals.append(result)
+
+        annotations = []
+        for ply, uci in enumerate(moves):
+            before, after = evals[ply], evals[ply + 1]
+            move = position.parse_uci(uci)
+            san = position.move_to_san(move)
+
+            # Scores are from the side to move, the mover is to move before
+            # the ply and its opponent after it
+            loss = self._value(before) + self._value(after)
+
+            nag = None
+            comment = None
+            for threshold, code, label in (
+                    self.BLUNDER,
+                    self.MISTAKE,
+                    self.INACCURACY,
+            ):
+                if loss >= threshold:
+                    nag = code
+                    comment = label
+                    if before.best_move and before.best_move != uci:
+                        best = position.move_to_san(
+                            position.parse_uci(before.best_move),
+                        )
+                        comment = f'{label}. Best was {best}.'
+                    break
+
+            position.make_move(move)
+            annotations.append(
+                PLY_ANNOTATION(
+                    san=san,
+                    eval_text=self._eval_text(after, position.turn),
+                    nag=nag,
+                    comment=comment,
+                )
+            )
+
+        return annotations
+
+    def _work(self, jobs, results):
+        engine = Engine(
+            engine_type=self._engine_type,
+            engine_params=self._engine_params,
+            cache=self._cache,
+        )
+        try:
+            while True:
+                job = jobs.get()
+                if job is None:
+                    break
+
+                index, header, moves, result = job
+                try:
+                    annotations = self.annotate_moves(engine, moves)
+                    text = self._game_text(header, annotations, result)
+                except Exception as e:
+                    text = e
+
+                results.put((index, text))
+        finally:
+            engine.quit()
+
+    def _value(self, result):
+        if result.mate is not None:
+            sign = 1 if result.mate > 0 else -1
+            return sign * (self.MATE_VALUE - abs(result.mate))
+        if result.score is None:
+            # No legal moves left and not mated, a stalemate
+            return 0
+        return result.score
+
+    @staticmethod
+    def _eval_text(result, turn):
+        # PGN evals are given from white's point of view, in pawns
+        sign = 1 if turn == WHITE else -1
+        if result.mate is not None:
+            return f'#{sign * result.mate}'
+        if result.score is None:
+            return '0.00'
+        return f'{sign * result.score / 100:.2f}'
+
+    @staticmethod
+    def _game_text(header, annotations, result):
+        tokens = []
+        for ply, annotation in enumerate(annotations):
+            if ply % 2 == 0:
+                tokens.append(f'{ply // 2 + 1}.')
+
+            tokens.append(annotation.san)
+            if annotation.nag is not None:
+                tokens.append(annotation.nag)
+
+            comment = f'[%eval {annotation.eval_text}]'
+            if annotation.comment is not None:
+                comment = f'{comment} {annotation.comment}'
+            tokens.append(f'{{ {comment} }}')
+
+            if ply % 2 == 0 and ply + 1 < len(annotations):
+                # Black's move after a comment needs its number repeated
+                tokens.append(f'{ply // 2 + 1}...')
+
+        tokens.append(result)
+        movetext = '\n'.join(textwrap.wrap(' '.join(tokens), width=79))
+
+        return f'{header}\n\n{movetext}'
+
+    @staticmethod
+    def _to_uci(src, dst, promotion):
+        uci = f'{src.address}{dst.address}'
+        if promotion is not None:
+            uci = f'{uci}{PROMOTION_CODES[promotion]}'
+        return uci
+
+    @staticmethod
+    def _read_checkpoint(checkpoint_path):
+        done = {}
+        if not os.path.exists(checkpoint_path):
+            return done
+
+        with open(checkpoint_path, 'r') as fp:
+            for line in fp:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                done[entry['index']] = entry['text']
+
+        return done
@@ -0,0 +1,357 @@
+import collections
+import concurrent.futures
+import functools
+import itertools
+import math
+import os
+import textwrap
+
+
+from .. import constant as c
+from ..element.boarder import Board
+from .annotator import PROMOTION_CODES
+from .bitbaser import Bitbases
+from .engineer import Engine
+from .gamer import Game
+from .positioner import Position, START_FEN, WHITE
+
+
+PLAYER = collections.namedtuple(
+    'PLAYER',
+    [
+        'name',
+        'engine_type',
+        'engine_params',
+        'depth',
+        'movetime',
+        'nodes',
+    ],
+)
+PLAYER.__new__.__defaults__ = (c.EngineType.stockfish, None, None, None, None)
+
+
+GAME_RECORD = collections.namedtuple(
+    'GAME_RECORD',
+    [
+        'index',
+        'white',
+        'black',
+        'result',
+        'termination',
+        'fen',
+        'moves',
+    ],
+)
+
+
+MATCH_STATS = collections.namedtuple(
+    'MATCH_STATS',
+    [
+        'wins',
+        'draws',
+        'losses',
+        'score',
+        'elo',
+        'elo_margin',
+        'los',
+    ],
+)
+
+
+PROMOTION_TYPES = {v: k for k, v in PROMOTION_CODES.items()}
+
+CHESS_960_PIECES = 'rnbqkbnr'
+
+
+class Tournament:
+    """
+    Round robin between engine configurations (PLAYER), every pair plays
+    nb_games games with alternating colors. Games are played on a Game in
+    worker processes, so that all the cores are used.
+
+    With chess960 each pair of games shares a random start position, one
+    game with each color.
+    """
+    DEFAULT_MAX_PLIES = 400
+
+    def __init__(
+            self,
+            players,
+            nb_games=2,
+            nb_workers=None,
+            chess960=False,
+            max_plies=DEFAULT_MAX_PLIES,
+            bitbase_dir=None,
+    ):
+        names = [player.name for player in players]
+        if len(players) < 2 or len(set(names)) != len(names):
+            error_msg = (
+                'A tournament needs at least two players with distinct '
+                f'names, got {names}'
+            )
+            raise ValueError(error_msg)
+
+        self._players = {player.name: player for player in players}
+        self._nb_games = nb_games
+        self._nb_workers = nb_workers or os.cpu_count() or 1
+        self._chess960 = chess960
+        self._max_plies = max_plies
+        self._bitbase_dir = bitbase_dir
+
+    @property
+    def players(self):
+        return list(self._players.values())
+
+    @property
+    def nb_workers(self):
+        return self._nb_workers
+
+    def play(self):
+        """
+        Plays all the games and yields a GAME_RECORD for each of them, in
+        the order they finish.
+        """
+        jobs = self._create_jobs()
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=self._nb_workers,
+        ) as executor:
+            futures = [executor.submit(_play_game, *job) for job in jobs]
+            for future in concurrent.futures.as_completed(futures):
+                yield future.result()
+
+    def run(self, pgn_path=None):
+        records = sorted(self.play(), key=lambda r: r.index)
+        if pgn_path is not None:
+            with open(pgn_path, 'w') as fp:
+                fp.write('\n\n'.join(game_pgn(r) for r in records))
+                fp.write('\n')
+
+        return records
+
+    @staticmethod
+    def match_stats(records, player, opponent):
+        """
+        Results of player against opponent, with the Elo difference, its
+        95% margin and the likelihood of superiority.
+        """
+        wins = draws = losses = 0
+        for record in records:
+            if {record.white, record.black} != {player, opponent}:
+                continue
+
+            if record.result == '1/2-1/2':
+                draws += 1
+            elif (record.result == '1-0') == (record.white == player):
+                wins += 1
+            else:
+                losses += 1
+
+        return MATCH_STATS(
+            wins,
+            draws,
+            losses,
+            wins + draws / 2,
+            *elo_estimate(wins, draws, losses),
+        )
+
+    def _create_jobs(self):
+        jobs = []
+        pairs = itertools.combinations(self._players.values(), 2)
+        for player, opponent in pairs:
+            order = None
+            for game_no in range(self._nb_games):
+                if self._chess960 and not game_no % 2:
+                    order = Board()._chess_960_order()
+
+                white, black = player, opponent
+                if game_no % 2:
+                    white, black = opponent, player
+
+                jobs.append(
+                    (
+                        len(jobs),
+                        white,
+                        black,
+                        order,
+                        self._max_plies,
+                        self._bitbase_dir,
+                    )
+                )
+
+        return jobs
+
+
+def elo_estimate(wins, draws, losses):
+    """
+    Returns the Elo difference implied by the score, the margin of its 95%
+    confidence interval and the likelihood of superiority.
+    """
+    nb_games = wins + draws + losses
+    if not nb_games:
+        return 0.0, math.inf, 0.5
+
+    score = (wins + draws / 2) / nb_games
+    deviation = math.sqrt(
+        (
+            wins * (1 - score) ** 2 +
+            draws * (0.5 - score) ** 2 +
+            losses * score ** 2
+        ) / nb_games
+    ) / math.sqrt(nb_games)
+
+    elo = _score_to_elo(score)
+    margin = math.inf
+    if math.isfinite(elo):
+        margin = (
+            _score_to_elo(score + 1.96 * deviation) -
+            _score_to_elo(score - 1.96 * deviation)
+        ) / 2
+
+    los = 0.5
+    if wins + losses:
+        los = 0.5 * (
+            1 + math.erf((wins - losses) / math.sqrt(2 * (wins + losses)))
+        )
+
+    return elo, margin, los
+
+
+def _score_to_elo(score):
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+    return -400 * math.log10(1 / score - 1)
+
+
+def game_pgn(record):
+    headers = [
+        ('Event', 'pychess tournament'),
+        ('Round', str(record.index + 1)),
+        ('White', record.white),
+        ('Black', record.black),
+        ('Result', record.result),
+        ('Termination', record.termination),
+    ]
+    if record.fen is not None:
+        headers += [
+            ('Variant', 'Chess960'),
+            ('SetUp', '1'),
+            ('FEN', record.fen),
+        ]
+
+    position = Position(record.fen or START_FEN)
+    tokens = []
+    for uci in record.moves:
+        if position.turn == WHITE:
+            tokens.append(f'{position.fullmove_number}.')
+        elif not tokens:
+            tokens.append(f'{position.fullmove_number}...')
+
+        move = position.parse_uci(uci)
+        tokens.append(position.move_to_san(move))
+        position.make_move(move)
+
+    tokens.append(record.result)
+    header_text = '\n'.join(f'[{k} "{v}"]' for k, v in headers)
+    movetext = '\n'.join(textwrap.wrap(' '.join(tokens), width=79))
+
+    return f'{header_text}\n\n{movetext}'
+
+
+def chess_960_fen(order):
+    # No castling rights, Game only castles a king on the e-file with the
+    # rook of a corner, chess960 castling is not supported
+    back_rank = [''] * 8
+    for piece, file_ in zip(CHESS_960_PIECES, order):
+        back_rank[file_] = piece
+    back_rank = ''.join(back_rank)
+
+    return (
+        f'{back_rank}/pppppppp/8/8/8/8/PPPPPPPP/{back_rank.upper()} '
+        'w - - 0 1'
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _load_bitbases(directory):
+    return Bitbases(directory=directory)
+
+
+def _play_game(index, white, black, order, max_plies, bitbase_dir):
+    bitbases = _load_bitbases(bitbase_dir) if bitbase_dir else None
+    game = Game(bitbases=bitbases)
+
+    fen = None
+    if order is not None:
+        fen = chess_960_fen(order)
+        game.set_fen(fen)
+
+    position = Position(fen or START_FEN)
+    players = {WHITE: white, -WHITE: black}
+    engines = {
+        color: Engine(
+            engine_type=player.engine_type,
+            engine_params=player.engine_params,
+            depth=player.depth,
+            movetime=player.movetime,
+            nodes=player.nodes,
+        )
+        for color, player in players.items()
+    }
+
+    moves = []
+    result = '1/2-1/2'
+    termination = 'max plies'
+    try:
+        while len(moves) < max_plies:
+            if game.is_game_over:
+                result, termination = _game_over_result(game, position)
+                break
+
+            turn = position.turn
+            uci = engines[turn].get_best_move(moves=moves, fen=fen)
+            promotion = PROMOTION_TYPES.get(uci[4:]) if uci else None
+            if uci is None or not game.move((uci[:4], promotion)):
+                # An illegal move loses the game
+                result = '0-1' if turn == WHITE else '1-0'
+                termination = f'illegal move {uci}'
+                break
+
+            moves.append(uci)
+            position.push_uci(uci)
+    finally:
+        for engine in engines.values():
+            engine.quit()
+
+    return GAME_RECORD(
+        index=index,
+        white=white.name,
+        black=black.name,
+        result=result,
+        termination=termination,
+        fen=fen,
+        moves=moves,
+    )
+
+
+def _game_over_result(game, position):
+    if game.winner is None:
+        result = '1/2-1/2'
+    elif game.winner == c.Color.white:
+        result = '1-0'
+    else:
+        result = '0-1'
+
+    if position.is_checkmate():
+        termination = 'checkmate'
+    elif position.is_stalemate():
+        termination = 'stalemate'
+    elif game.draw_reason not in (None, c.DrawReason.stalemate):
+        # Repetition, fifty moves, insufficient material or a drawn
+        # endgame of the bitbases
+        termination = game.draw_reason.name.replace('_', ' ')
+    else:
+        termination = 'adjudication'
+
+    return result, termination
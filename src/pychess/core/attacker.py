@@ -0,0 +1,344 @@
+from .. import constant as c
+from ..element.squarer import Square
+from .mover import Move
+
+
+DIAGONALS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+ORTHOGONALS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+KING_STEPS = DIAGONALS + ORTHOGONALS
+KNIGHT_JUMPS = (
+    (1, 2), (1, -2), (-1, 2), (-1, -2),
+    (2, 1), (2, -1), (-2, 1), (-2, -1),
+)
+
+DIAGONAL_SLIDERS = (c.PieceType.bishop, c.PieceType.queen)
+ORTHOGONAL_SLIDERS = (c.PieceType.rook, c.PieceType.queen)
+
+SQUARES = {(x, y): Square((x, y)) for x in range(8) for y in range(8)}
+
+# Stands for the moving piece on its destination, it blocks the lines but
+# does not attack anything
+_BLOCKER = object()
+
+
+def is_attacked(board, square, color, empty=(), filled=None):
+    """
+    Whether a piece of the given color attacks the square. Squares in empty
+    are seen as empty and filled as occupied, so that a move can be tested
+    without playing it.
+    """
+    for _ in _attackers(board, (square.x, square.y), color, empty, filled):
+        return True
+    return False
+
+
+def checkers(board, color):
+    """
+    Squares of the pieces giving check to the king of the given color.
+    """
+    king_square = board.king_square(color)
+    return [
+        SQUARES[xy]
+        for xy in _attackers(
+            board,
+            (king_square.x, king_square.y),
+            _opponent(color),
+        )
+    ]
+
+
+def pins(board, color):
+    """
+    Pinned pieces of the given color, mapped to the squares they can still
+    move to: the line between their king and the pinning piece, the pinning
+    piece included.
+    """
+    king_square = board.king_square(color)
+    king_x, king_y = king_square.x, king_square.y
+    pinned = {}
+    for directions, sliders in (
+            (DIAGONALS, DIAGONAL_SLIDERS),
+            (ORTHOGONALS, ORTHOGONAL_SLIDERS),
+    ):
+        for dx, dy in directions:
+            line = []
+            own = None
+            x, y = king_x + dx, king_y + dy
+            while 0 <= x < 8 and 0 <= y < 8:
+                line.append((x, y))
+                piece = board.data[SQUARES[(x, y)]]
+                if piece is not None:
+                    if piece.color == color:
+                        if own is not None:
+                            break
+                        own = (x, y)
+                    else:
+                        if own is not None and piece.type in sliders:
+                            pinned[own] = set(line)
+                        break
+                x, y = x + dx, y + dy
+
+    return pinned
+
+
+def leaves_king_attacked(board, src, dst, color):
+    """
+    Whether moving the piece on src to dst leaves the king of the given
+    color in check, the move is not played.
+    """
+    piece = board.get_piece(src)
+    if piece is None:
+        return False
+
+    if piece.type == c.PieceType.king:
+        king_square = dst
+    else:
+        king_square = board.king_square(color)
+
+    empty = [(src.x, src.y)]
+    if Move.is_en_passant(piece, board, src, dst):
+        empty.append((dst.x, src.y))
+
+    return is_attacked(
+        board,
+        king_square,
+        _opponent(color),
+        empty=empty,
+        filled=(dst.x, dst.y),
+    )
+
+
+def has_legal_move(board, color):
+    """
+    Whether the given color has at least one legal move, stops at the first
+    one found. Castling is not looked at, a king that can castle can also
+    step aside.
+    """
+    for _ in legal_moves(board, color):
+        return True
+    return False
+
+
+def can_take_en_passant(board, color):
+    """
+    Whether a pawn of the given color can legally take the pawn that has
+    just moved two squares.
+    """
+    two_square_dst = board.pawn_two_square_dst
+    if two_square_dst is None:
+        return False
+
+    x, y = two_square_dst.x, two_square_dst.y
+    direction = 1 if color == c.Color.white else -1
+    dst = (x, y + direction)
+    king_square = board.king_square(color)
+    king = (king_square.x, king_square.y)
+    for src in ((x - 1, y), (x + 1, y)):
+        if not 0 <= src[0] < 8:
+            continue
+
+        piece = board.data[SQUARES[src]]
+        if piece is None or piece.color != color:
+            continue
+        if piece.type != c.PieceType.pawn:
+            continue
+
+        # The two pawns leave the rank at once
+        empty = (src, (x, y))
+        if not any(_attackers(board, king, _opponent(color), empty, dst)):
+            return True
+
+    return False
+
+
+def legal_moves(board, color):
+    """
+    Yields the legal moves of the given color as (src, dst) pairs of (x, y)
+    tuples, king moves first. A pawn reaching the last rank is yielded once
+    for all its promotions, castling is left out.
+    """
+    opponent = _opponent(color)
+    king_square = board.king_square(color)
+    king = (king_square.x, king_square.y)
+
+    # The attacks on the king steps are looked at through the king
+    for dx, dy in KING_STEPS:
+        dst = (king[0] + dx, king[1] + dy)
+        if not (0 <= dst[0] < 8 and 0 <= dst[1] < 8):
+            continue
+
+        piece = board.data[SQUARES[dst]]
+        if piece is not None and piece.color == color:
+            continue
+
+        if not any(_attackers(board, dst, opponent, empty=(king,))):
+            yield king, dst
+
+    checking = list(_attackers(board, king, opponent))
+    if len(checking) > 1:
+        # Only the king can answer a double check
+        return
+
+    targets = None
+    if checking:
+        targets = _check_line(king, checking[0])
+
+    pinned = pins(board, color)
+    for piece, square in list(board.reverse.items()):
+        if piece.color != color or piece.type == c.PieceType.king:
+            continue
+
+        src = (square.x, square.y)
+        for dst, is_en_passant in _destinations(board, piece, src):
+            if is_en_passant:
+                # The two pawns leave the rank at once, tested on its own
+                empty = (src, (dst[0], src[1]))
+                if not any(
+                        _attackers(board, king, opponent, empty, dst)
+                ):
+                    yield src, dst
+                continue
+
+            if targets is not None and dst not in targets:
+                continue
+
+            if src in pinned and dst not in pinned[src]:
+                continue
+
+            yield src, dst
+
+
+def _opponent(color):
+    return c.Color.black if color == c.Color.white else c.Color.white
+
+
+def _occupant(board, xy, empty, filled):
+    if xy == filled:
+        return _BLOCKER
+    if xy in empty:
+        return None
+    return board.data[SQUARES[xy]]
+
+
+def _attackers(board, xy, color, empty=(), filled=None):
+    x, y = xy
+
+    # Pawns of color attack from the rank behind them
+    pawn_y = y - 1 if color == c.Color.white else y + 1
+    for dx in (-1, 1):
+        src = (x + dx, pawn_y)
+        if 0 <= src[0] < 8 and 0 <= src[1] < 8:
+            piece = _occupant(board, src, empty, filled)
+            if _is_piece(piece, color, (c.PieceType.pawn,)):
+                yield src
+
+    for steps, types in (
+            (KNIGHT_JUMPS, (c.PieceType.knight,)),
+            (KING_STEPS, (c.PieceType.king,)),
+    ):
+        for dx, dy in steps:
+            src = (x + dx, y + dy)
+            if 0 <= src[0] < 8 and 0 <= src[1] < 8:
+                piece = _occupant(board, src, empty, filled)
+                if _is_piece(piece, color, types):
+                    yield src
+
+    for directions, sliders in (
+            (DIAGONALS, DIAGONAL_SLIDERS),
+            (ORTHOGONALS, ORTHOGONAL_SLIDERS),
+    ):
+        for dx, dy in directions:
+            src_x, src_y = x + dx, y + dy
+            while 0 <= src_x < 8 and 0 <= src_y < 8:
+                piece = _occupant(board, (src_x, src_y), empty, filled)
+                if piece is not None:
+                    if _is_piece(piece, color, sliders):
+                        yield (src_x, src_y)
+                    break
+                src_x, src_y = src_x + dx, src_y + dy
+
+
+def _is_piece(piece, color, types):
+    return (
+        piece is not None and
+        piece is not _BLOCKER and
+        piece.color == color and
+        piece.type in types
+    )
+
+
+def _is_two_square_dst(board, xy):
+    two_square_dst = board.pawn_two_square_dst
+    return (
+        two_square_dst is not None and
+        (two_square_dst.x, two_square_dst.y) == xy
+    )
+
+
+def _check_line(king, checker):
+    # The checking piece and, for a slider, the squares a piece can block on
+    dx = checker[0] - king[0]
+    dy = checker[1] - king[1]
+    line = {checker}
+    if dx and dy and abs(dx) != abs(dy):
+        # Knight
+        return line
+
+    step_x = (dx > 0) - (dx < 0)
+    step_y = (dy > 0) - (dy < 0)
+    x, y = king[0] + step_x, king[1] + step_y
+    while (x, y) != checker:
+        line.add((x, y))
+        x, y = x + step_x, y + step_y
+
+    return line
+
+
+def _destinations(board, piece, src):
+    x, y = src
+    if piece.type == c.PieceType.pawn:
+        direction = 1 if piece.color == c.Color.white else -1
+        forward = (x, y + direction)
+        if 0 <= forward[1] < 8 and board.data[SQUARES[forward]] is None:
+            yield forward, False
+            double = (x, y + 2 * direction)
+            if y == piece.first_row and board.data[SQUARES[double]] is None:
+                yield double, False
+
+        for dx in (-1, 1):
+            dst = (x + dx, y + direction)
+            if not (0 <= dst[0] < 8 and 0 <= dst[1] < 8):
+                continue
+
+            target = board.data[SQUARES[dst]]
+            if target is not None:
+                if target.color != piece.color:
+                    yield dst, False
+            elif _is_two_square_dst(board, (dst[0], y)):
+                yield dst, True
+        return
+
+    if piece.type == c.PieceType.knight:
+        for dx, dy in KNIGHT_JUMPS:
+            dst = (x + dx, y + dy)
+            if 0 <= dst[0] < 8 and 0 <= dst[1] < 8:
+                target = board.data[SQUARES[dst]]
+                if target is None or target.color != piece.color:
+                    yield dst, False
+        return
+
+    directions = ()
+    if piece.type in DIAGONAL_SLIDERS:
+        directions += DIAGONALS
+    if piece.type in ORTHOGONAL_SLIDERS:
+        directions += ORTHOGONALS
+
+    for dx, dy in directions:
+        dst_x, dst_y = x + dx, y + dy
+        while 0 <= dst_x < 8 and 0 <= dst_y < 8:
+            target = board.data[SQUARES[(dst_x, dst_y)]]
+            if target is None or target.color != piece.color:
+                yield (dst_x, dst_y), False
+            if target is not None:
+                break
+            dst_x, dst_y = dst_x + dx, dst_y + dy
@@ -0,0 +1,563 @@
+import array
+import os
+
+
+import numpy as np
+
+
+from .. import constant as c
+from .positioner import SQUARES, CODE_PIECES, WHITE
+
+
+# Results are given from the point of view of the side to move
+DRAW = 0
+WIN = 1
+LOSS = 2
+ILLEGAL = 3
+
+# Tables a signature depends on must come before it
+SIGNATURES = ('KQK', 'KRK', 'KPK', 'KBNK')
+
+# Order of the pieces of the strong side in a signature
+PIECE_ORDER = 'QRBNP'
+
+FILE_EXTENSION = '.bb'
+
+
+def _build_leaper_masks(offsets):
+    masks = []
+    for sq in range(64):
+        rank, file = sq >> 3, sq & 7
+        mask = 0
+        for d_file, d_rank in offsets:
+            r, f = rank + d_rank, file + d_file
+            if 0 <= r < 8 and 0 <= f < 8:
+                mask |= 1 << (r * 8 + f)
+        masks.append(mask)
+    return masks
+
+
+def _build_rays(directions):
+    rays = []
+    for sq in range(64):
+        rank, file = sq >> 3, sq & 7
+        sq_rays = []
+        for d_file, d_rank in directions:
+            ray = []
+            r, f = rank + d_rank, file + d_file
+            while 0 <= r < 8 and 0 <= f < 8:
+                ray.append(r * 8 + f)
+                r, f = r + d_rank, f + d_file
+            sq_rays.append(ray)
+        rays.append(sq_rays)
+    return rays
+
+
+def _build_between(rays):
+    # Squares strictly between two squares on a common ray
+    between = {}
+    for sq in range(64):
+        for ray in rays[sq]:
+            mask = 0
+            for dst in ray:
+                between[(sq, dst)] = mask
+                mask |= 1 << dst
+    return between
+
+
+def _mask_squares(mask):
+    return [sq for sq in range(64) if mask >> sq & 1]
+
+
+KING_OFFSETS = (
+    (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1),
+)
+KNIGHT_OFFSETS = (
+    (1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2),
+)
+BISHOP_DIRECTIONS = ((1, 1), (-1, 1), (-1, -1), (1, -1))
+ROOK_DIRECTIONS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+
+KING_MASKS = _build_leaper_masks(KING_OFFSETS)
+KNIGHT_MASKS = _build_leaper_masks(KNIGHT_OFFSETS)
+# Squares attacked by a pawn of the strong side, it always moves up
+PAWN_MASKS = _build_leaper_masks(((-1, 1), (1, 1)))
+KING_TARGETS = [_mask_squares(m) for m in KING_MASKS]
+KNIGHT_TARGETS = [_mask_squares(m) for m in KNIGHT_MASKS]
+
+SLIDER_RAYS = {
+    'B': _build_rays(BISHOP_DIRECTIONS),
+    'R': _build_rays(ROOK_DIRECTIONS),
+}
+SLIDER_RAYS['Q'] = [
+    b + r for b, r in zip(SLIDER_RAYS['B'], SLIDER_RAYS['R'])
+]
+SLIDER_BETWEEN = {
+    kind: _build_between(rays)
+    for kind, rays in SLIDER_RAYS.items()
+}
+
+
+def _attacks(kind, src, dst, occupied):
+    if kind == 'N':
+        return KNIGHT_MASKS[src] >> dst & 1
+    elif kind == 'P':
+        return PAWN_MASKS[src] >> dst & 1
+    elif kind == 'K':
+        return KING_MASKS[src] >> dst & 1
+
+    between = SLIDER_BETWEEN[kind].get((src, dst))
+    return between is not None and not between & occupied
+
+
+def _is_insufficient(kinds):
+    return not kinds or (len(kinds) == 1 and kinds in 'BN')
+
+
+class Bitbases:
+    """
+    Win/draw/loss tables of endgames where one side only has its king,
+    two bits per position. A probe is a single lookup, the tables are made
+    by BitbaseGenerator.
+    """
+    def __init__(self, directory=None):
+        self._tables = {}
+        directory = directory or c.APP.BITBASE_DIR
+        if not os.path.isdir(directory):
+            return
+
+        for file_name in sorted(os.listdir(directory)):
+            signature, extension = os.path.splitext(file_name)
+            if extension != FILE_EXTENSION:
+                continue
+            with open(os.path.join(directory, file_name), 'rb') as fp:
+                self._tables[signature] = fp.read()
+
+    @property
+    def signatures(self):
+        return list(self._tables.keys())
+
+    def add(self, signature, data):
+        self._tables[signature] = bytes(data)
+
+    def probe_index(self, signature, index):
+        data = self._tables.get(signature)
+        if data is None:
+            return None
+        return data[index >> 2] >> ((index & 3) * 2) & 3
+
+    def probe_squares(self, signature, strong_to_move, squares):
+        """
+        squares holds the strong king, the lone king and then the pieces
+        of the strong side in signature order, as 0 to 63 square indices
+        with the strong side moving up the board.
+        """
+        index = 0 if strong_to_move else 1
+        for sq in squares:
+            index = index * 64 + sq
+        return self.probe_index(signature, index)
+
+    def probe_pieces(self, pieces, white_to_move):
+        """
+        Probes a position given as (is_white, code, square) tuples, with
+        upper case piece codes and 0 to 63 squares from a1. Returns the
+        result for the side to move, None when there is no table for it.
+        """
+        if not self._tables:
+            return None
+
+        white = [(code, sq) for is_white, code, sq in pieces if is_white]
+        black = [(code, sq) for is_white, code, sq in pieces if not is_white]
+        if len(black) == 1:
+            strong, weak, strong_is_white = white, black, True
+        elif len(white) == 1:
+            strong, weak, strong_is_white = black, white, False
+        else:
+            return None
+
+        # Tables are made for the strong side moving up
+        flip = 0 if strong_is_white else 56
+        kings = [sq ^ flip for code, sq in strong if code == 'K']
+        if len(kings) != 1 or weak[0][0] != 'K':
+            return None
+
+        others = sorted(
+            [(code, sq ^ flip) for code, sq in strong if code != 'K'],
+            key=lambda p: PIECE_ORDER.index(p[0]),
+        )
+        kinds = ''.join(code for code, _ in others)
+        if _is_insufficient(kinds):
+            return DRAW
+
+        signature = f'K{kinds}K'
+        if signature not in self._tables:
+            return None
+
+        squares = [kings[0], weak[0][1] ^ flip] + [sq for _, sq in others]
+        return self.probe_squares(
+            signature,
+            strong_to_move=white_to_move == strong_is_white,
+            squares=squares,
+        )
+
+    def probe(self, position):
+        # Castling rights are not part of the tables
+        if position.castling:
+            return None
+
+        pieces = []
+        for sq in SQUARES:
+            piece = position.piece_at(sq)
+            if piece:
+                pieces.append(
+                    (
+                        piece > 0,
+                        CODE_PIECES[abs(piece)].upper(),
+                        (sq >> 4) * 8 + (sq & 7),
+                    )
+                )
+
+        return self.probe_pieces(pieces, position.turn == WHITE)
+
+    def probe_board(self, board, color):
+        pieces = [
+            (
+                piece.color == c.Color.white,
+                piece.code.upper(),
+                square.y * 8 + square.x,
+            )
+            for piece, square in board.reverse.items()
+        ]
+        return self.probe_pieces(pieces, color == c.Color.white)
+
+
+class BitbaseGenerator:
+    """
+    Builds the table of a signature by retrograde analysis. Every position
+    first counts its moves, mates and exits to other tables (captures and
+    promotions) are resolved right away, then results are propagated
+    backwards through unmoves: the positions leading to a loss are won,
+    and a position whose every move leads to a win is lost. Whatever is
+    left unresolved is a draw.
+    """
+    def __init__(self, signature, bitbases=None):
+        is_valid = (
+            len(signature) >= 3 and
+            signature[0] == 'K' and
+            signature[-1] == 'K' and
+            all(code in PIECE_ORDER for code in signature[1:-1])
+        )
+        if not is_valid:
+            error_msg = (
+                f'Unsupported signature {signature}, it should be the pieces '
+                f'of the strong side (in the order K{PIECE_ORDER}) followed '
+                'by the lone king, e.g KBNK'
+            )
+            raise ValueError(error_msg)
+
+        self._signature = signature
+        self._kinds = signature[1:-1]
+        self._nb_squares = len(self._kinds) + 2
+        self._size = 2 * 64 ** self._nb_squares
+        self._bitbases = bitbases if bitbases is not None else Bitbases()
+
+    @property
+    def signature(self):
+        return self._signature
+
+    @property
+    def size(self):
+        return self._size
+
+    def generate(self):
+        results = bytearray(self._size)
+        counts = bytearray(self._size)
+        resolved = array.array('I')
+
+        for index in range(self._size):
+            strong_to_move, squares = self._decode(index)
+            if not self._is_legal(strong_to_move, squares):
+                results[index] = ILLEGAL
+                continue
+
+            nb_legal = 0
+            nb_open = 0
+            result = None
+            for successor, exit_result in self._moves(
+                    strong_to_move,
+                    squares,
+            ):
+                nb_legal += 1
+                if successor is not None or exit_result == DRAW:
+                    # Draws are never resolved and keep the count above 0
+                    nb_open += 1
+                elif exit_result == LOSS:
+                    result = WIN
+                    break
+
+            if result is None and not nb_open:
+                if nb_legal or self._in_check(strong_to_move, squares):
+                    result = LOSS
+                else:
+                    result = DRAW
+
+            if result in (WIN, LOSS):
+                results[index] = result
+                resolved.append(index)
+            else:
+                counts[index] = nb_open
+
+        position = 0
+        while position < len(resolved):
+            index = resolved[position]
+            position += 1
+            result = results[index]
+            strong_to_move, squares = self._decode(index)
+            for predecessor in self._unmoves(strong_to_move, squares):
+                if results[predecessor] != DRAW or not counts[predecessor]:
+                    continue
+
+                if result == LOSS:
+                    results[predecessor] = WIN
+                    resolved.append(predecessor)
+                else:
+                    counts[predecessor] -= 1
+                    if not counts[predecessor]:
+                        results[predecessor] = LOSS
+                        resolved.append(predecessor)
+
+        return self._pack(results)
+
+    def save(self, path, data=None):
+        data = data if data is not None else self.generate()
+        with open(path, 'wb') as fp:
+            fp.write(data)
+        return data
+
+    def _encode(self, strong_to_move, squares):
+        index = 0 if strong_to_move else 1
+        for sq in squares:
+            index = index * 64 + sq
+        return index
+
+    def _decode(self, index):
+        squares = []
+        for _ in range(self._nb_squares):
+            index, sq = divmod(index, 64)
+            squares.append(sq)
+        squares.reverse()
+        return index == 0, squares
+
+    def _is_legal(self, strong_to_move, squares):
+        if len(set(squares)) != len(squares):
+            return False
+
+        strong_king, weak_king = squares[0], squares[1]
+        if KING_MASKS[strong_king] >> weak_king & 1:
+            return False
+
+        for kind, sq in zip(self._kinds, squares[2:]):
+            if kind == 'P' and sq >> 3 in (0, 7):
+                return False
+
+        # The side that just moved cannot have left its king in check
+        return not strong_to_move or not self._is_weak_king_attacked(squares)
+
+    def _in_check(self, strong_to_move, squares):
+        # Only the lone king can be checked, the strong king would have to
+        # be next to the other king
+        return not strong_to_move and self._is_weak_king_attacked(squares)
+
+    def _is_weak_king_attacked(self, squares):
+        weak_king = squares[1]
+        occupied = self._occupied(squares)
+        return any(
+            _attacks(kind, sq, weak_king, occupied)
+            for kind, sq in zip(self._kinds, squares[2:])
+        )
+
+    def _moves(self, strong_to_move, squares):
+        """
+        Yields (successor index, None) for moves staying in the table and
+        (None, result for the opponent) for moves leaving it.
+        """
+        occupied = self._occupied(squares)
+        if strong_to_move:
+            yield from self._strong_moves(squares, occupied)
+        else:
+            yield from self._weak_moves(squares, occupied)
+
+    def _strong_moves(self, squares, occupied):
+        strong_king, weak_king = squares[0], squares[1]
+        for dst in KING_TARGETS[strong_king]:
+            if occupied >> dst & 1 or KING_MASKS[weak_king] >> dst & 1:
+                continue
+            yield self._encode(False, [dst] + squares[1:]), None
+
+        for i, kind in enumerate(self._kinds, 2):
+            src = squares[i]
+            for dst in self._piece_targets(kind, src, occupied):
+                if kind == 'P' and dst >> 3 == 7:
+                    for promotion in 'QRBN':
+                        yield None, self._exit_result(
+                            squares,
+                            i,
+                            dst,
+                            promotion,
+                        )
+                    continue
+
+                new_squares = list(squares)
+                new_squares[i] = dst
+                yield self._encode(False, new_squares), None
+
+    def _weak_moves(self, squares, occupied):
+        strong_king, weak_king = squares[0], squares[1]
+        for dst in KING_TARGETS[weak_king]:
+            if KING_MASKS[strong_king] >> dst & 1:
+                continue
+
+            captured = None
+            if occupied >> dst & 1:
+                captured = squares.index(dst, 2)
+
+            # Sliders see through the square the king leaves
+            new_occupied = occupied & ~(1 << weak_king) | 1 << dst
+            is_attacked = any(
+                _attacks(kind, sq, dst, new_occupied)
+                for i, (kind, sq) in enumerate(
+                    zip(self._kinds, squares[2:]),
+                    2,
+                )
+                if i != captured
+            )
+            if is_attacked:
+                continue
+
+            if captured is not None:
+                yield None, self._exit_result(squares, captured, dst)
+                continue
+
+            new_squares = list(squares)
+            new_squares[1] = dst
+            yield self._encode(True, new_squares), None
+
+    def _unmoves(self, strong_to_move, squares):
+        # The side that made the last move is the one not to move
+        occupied = self._occupied(squares)
+        if strong_to_move:
+            weak_king = squares[1]
+            for src in KING_TARGETS[weak_king]:
+                if occupied >> src & 1:
+                    continue
+                new_squares = list(squares)
+                new_squares[1] = src
+                yield self._encode(False, new_squares)
+            return
+
+        for i, kind in enumerate(('K', None) + tuple(self._kinds)):
+            if kind is None:
+                continue
+
+            dst = squares[i]
+            for src in self._piece_sources(kind, dst, occupied):
+                new_squares = list(squares)
+                new_squares[i] = src
+                yield self._encode(True, new_squares)
+
+    def _piece_targets(self, kind, src, occupied):
+        if kind == 'N':
+            return [
+                dst for dst in KNIGHT_TARGETS[src]
+                if not occupied >> dst & 1
+            ]
+        elif kind == 'P':
+            targets = []
+            dst = src + 8
+            if not occupied >> dst & 1:
+                targets.append(dst)
+                if src >> 3 == 1 and not occupied >> (dst + 8) & 1:
+                    targets.append(dst + 8)
+            return targets
+
+        return self._slide(kind, src, occupied)
+
+    def _piece_sources(self, kind, dst, occupied):
+        if kind == 'K':
+            return [
+                src for src in KING_TARGETS[dst]
+                if not occupied >> src & 1
+            ]
+        elif kind == 'P':
+            sources = []
+            src = dst - 8
+            if src >> 3 >= 1 and not occupied >> src & 1:
+                sources.append(src)
+                if dst >> 3 == 3 and not occupied >> (src - 8) & 1:
+                    sources.append(src - 8)
+            return sources
+
+        # Knights and sliders move the same way back and forth
+        return self._piece_targets(kind, dst, occupied)
+
+    @staticmethod
+    def _slide(kind, src, occupied):
+        targets = []
+        for ray in SLIDER_RAYS[kind][src]:
+            for dst in ray:
+                if occupied >> dst & 1:
+                    break
+                targets.append(dst)
+        return targets
+
+    def _exit_result(self, squares, i, dst, promotion=None):
+        # Result for the opponent of the side that captured or promoted
+        strong_to_move = promotion is None
+        pieces = [
+            (kind, sq)
+            for j, (kind, sq) in enumerate(zip(self._kinds, squares[2:]), 2)
+            if j != i
+        ]
+        kings = [squares[0], squares[1]]
+        if promotion is not None:
+            pieces.append((promotion, dst))
+        else:
+            kings[1] = dst
+
+        kinds = ''.join(kind for kind, _ in pieces)
+        if _is_insufficient(kinds):
+            return DRAW
+
+        pieces.sort(key=lambda p: PIECE_ORDER.index(p[0]))
+        signature = 'K' + ''.join(kind for kind, _ in pieces) + 'K'
+        result = self._bitbases.probe_squares(
+            signature,
+            strong_to_move=strong_to_move,
+            squares=kings + [sq for _, sq in pieces],
+        )
+        if result is None:
+            error_msg = (
+                f'The {signature} table is needed to generate '
+                f'{self._signature}, generate it first'
+            )
+            raise RuntimeError(error_msg)
+
+        return result
+
+    @staticmethod
+    def _occupied(squares):
+        occupied = 0
+        for sq in squares:
+            occupied |= 1 << sq
+        return occupied
+
+    @staticmethod
+    def _pack(results):
+        values = np.frombuffer(bytes(results), dtype=np.uint8)
+        packed = (
+            values[0::4] |
+            values[1::4] << 2 |
+            values[2::4] << 4 |
+            values[3::4] << 6
+        )
+        return packed.astype(np.uint8).tobytes()
@@ -0,0 +1,130 @@
+import collections
+import json
+import sqlite3
+import threading
+
+
+class EvalCache:
+    """
+    Two tier cache of search results. Recent entries live in an in-memory
+    LRU, every entry is also written to a SQLite file when a path is given
+    so that it survives across runs.
+
+    An entry is only served when it was searched at least as deep as
+    requested, and a deeper result always replaces a shallower one.
+
+    Writes are committed every COMMIT_EVERY entries, on flush and on close,
+    the entries not committed yet are lost if the cache is never closed.
+    """
+    DEFAULT_MAX_SIZE = 100000
+    COMMIT_EVERY = 256
+
+    def __init__(self, path=None, max_size=DEFAULT_MAX_SIZE):
+        self._max_size = max_size
+        self._memory = collections.OrderedDict()
+
+        # Engines of a pool share the cache from their own threads
+        self._lock = threading.Lock()
+
+        self._connection = None
+        self._nb_uncommitted = 0
+        if path is not None:
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS evals ('
+                'key TEXT PRIMARY KEY, '
+                'depth INTEGER NOT NULL, '
+                'value TEXT NOT NULL)'
+            )
+            self._connection.commit()
+
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    def get(self, key, depth):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                entry = self._load(key)
+                if entry is not None:
+                    self._remember(key, entry)
+            else:
+                self._memory.move_to_end(key)
+
+            if entry is None or entry[0] < depth:
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            return entry[1]
+
+    def put(self, key, depth, value):
+        with self._lock:
+            entry = self._memory.get(key) or self._load(key)
+            if entry is not None and entry[0] > depth:
+                return
+
+            self._remember(key, (depth, value))
+            if self._connection is not None:
+                self._connection.execute(
+                    'INSERT OR REPLACE INTO evals (key, depth, value) '
+                    'VALUES (?, ?, ?)',
+                    (key, depth, json.dumps(value)),
+                )
+                self._nb_uncommitted += 1
+                if self._nb_uncommitted >= self.COMMIT_EVERY:
+                    self._commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._connection is not None:
+                self._connection.execute('DELETE FROM evals')
+                self._commit()
+
+    def flush(self):
+        with self._lock:
+            if self._connection is not None:
+                self._commit()
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._commit()
+                self._connection.close()
+                self._connection = None
+
+    def _commit(self):
+        self._connection.commit()
+        self._nb_uncommitted = 0
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_size:
+            self._memory.popitem(last=False)
+
+    def _load(self, key):
+        if self._connection is None:
+            return None
+
+        row = self._connection.execute(
+            'SELECT depth, value FROM evals WHERE key = ?',
+            (key, ),
+        ).fetchone()
+        if row is None:
+            return None
+
+        depth, value = row
+        return depth, json.loads(value)
+
+    def __len__(self):
+        return len(self._memory)
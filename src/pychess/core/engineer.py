@@ -1,31 +1,727 @@
+import os
+import collections
+import json
+import queue
+import subprocess
+import threading
+
+
 from .. import constant as c
+from . import bitbaser
+from .booker import OpeningBook
 from .gamer import Game
+from .positioner import Position
+from .searcher import Searcher
+
+
+# Scores are reported by the engine from the point of view of the side
+# to move, `mate` is the number of moves to mate (negative when mated)
+SEARCH_RESULT = collections.namedtuple(
+    'SEARCH_RESULT',
+    [
+        'best_move',
+        'score',
+        'mate',
+        'depth',
+        'pv',
+        'nodes',
+        'nps',
+        'time',
+    ],
+)
+
+
+POSITION = collections.namedtuple(
+    'POSITION',
+    [
+        'moves',
+        'fen',
+    ],
+)
+
+
+# Engine settings that can be given by name, with their UCI option names
+OPTION_NAMES = {
+    'threads': 'Threads',
+    'hash_size': 'Hash',
+    'skill': 'Skill Level',
+}
+
+
+ANALYSIS = collections.namedtuple(
+    'ANALYSIS',
+    [
+        'index',
+        'position',
+        'result',
+    ],
+)
 
 
 class Engine:
-    def __init__(self, engine_type=c.EngineType.stockfish):
+    DEFAULT_DEPTH = 2
+
+    def __init__(
+            self,
+            engine_type=c.EngineType.stockfish,
+            engine_params=None,
+            cache=None,
+            depth=None,
+            movetime=None,
+            nodes=None,
+            threads=None,
+            hash_size=None,
+            skill=None,
+            book=None,
+            book_best=False,
+            bitbases=None,
+    ):
         self._engine_type = engine_type
-        self._engine = _get_engine(engine_type=engine_type)
 
-    def get_best_move(self, moves=None):
+        # Instance wide search limits and engine options, both can be
+        # overridden for a single call of analyse or get_best_move
+        self._limits = dict(depth=depth, movetime=movetime, nodes=nodes)
+        self._default_options = dict(engine_params or {})
+        self._default_options.update(
+            self._named_options(
+                threads=threads,
+                hash_size=hash_size,
+                skill=skill,
+            )
+        )
+        self._options = dict(self._default_options)
+        self._engine = _get_engine(
+            engine_type=engine_type,
+            engine_params=self._options,
+        )
+
+        self._cache = cache
+        self._last_result = None
+
+        # Book moves are played instantly, the engine only searches once
+        # the game is out of the book
+        self._book = book
+        self._owns_book = isinstance(book, str)
+        if self._owns_book:
+            self._book = OpeningBook(book)
+        self._book_best = book_best
+
+        # Inside the bitbases, the engine only chooses among the moves that
+        # keep the best result
+        self._bitbases = bitbases
+        self._init_session()
+
+    @property
+    def cache(self):
+        return self._cache
+
+    @property
+    def book(self):
+        return self._book
+
+    @property
+    def options(self):
+        return dict(self._options)
+
+    @property
+    def last_result(self):
+        # The SEARCH_RESULT of the last search, with its statistics
+        return self._last_result
+
+    @property
+    def fen(self):
+        return self._fen
+
+    def new_game(self, fen=None):
+        self._init_session(fen=fen)
+        self._engine.new_game()
+
+    def set_position(self, moves=None, fen=None):
         moves = moves or []
-        self._apply_moves(moves=moves)
-        return self._engine.get_best_move()
+        nb_known = self._nb_known_moves(moves)
+
+        # Anything else than the current game going forward (another game,
+        # a different start or a take back) starts a new engine session
+        is_new_game = fen != self._fen or nb_known < len(self._move_specs)
+        if is_new_game:
+            self.new_game(fen=fen)
+            nb_known = 0
+
+        new_moves = moves[nb_known:]
+        new_uci_moves = list(map(self._to_uci, new_moves))
+        self._uci_moves.extend(new_uci_moves)
+        self._move_specs.extend(new_moves)
+        if self._position is not None:
+            for uci_move in new_uci_moves:
+                self._position.push_uci(uci_move)
+
+        self._engine.set_position(moves=self._uci_moves, fen=self._fen)
+
+    def get_best_move(
+            self,
+            moves=None,
+            fen=None,
+            depth=None,
+            movetime=None,
+            nodes=None,
+            threads=None,
+            hash_size=None,
+            skill=None,
+    ):
+        if self._book is not None:
+            self.set_position(moves=moves, fen=fen)
+            book_move = self._book.get_move(
+                self._position,
+                best=self._book_best,
+            )
+            if book_move is not None:
+                return book_move
+
+        searchmoves = None
+        if self._bitbases is not None:
+            self.set_position(moves=moves, fen=fen)
+            searchmoves = self._bitbase_moves()
+            if searchmoves is not None and len(searchmoves) == 1:
+                return searchmoves[0]
+
+        result = self.analyse(
+            moves=moves,
+            fen=fen,
+            depth=depth,
+            movetime=movetime,
+            nodes=nodes,
+            threads=threads,
+            hash_size=hash_size,
+            skill=skill,
+            searchmoves=searchmoves,
+        )
+        return result.best_move
+
+    def analyse(
+            self,
+            moves=None,
+            fen=None,
+            depth=None,
+            movetime=None,
+            nodes=None,
+            threads=None,
+            hash_size=None,
+            skill=None,
+            searchmoves=None,
+    ):
+        limits = dict(self._limits)
+        call_limits = dict(depth=depth, movetime=movetime, nodes=nodes)
+        if any(v is not None for v in call_limits.values()):
+            limits = call_limits
+        if all(v is None for v in limits.values()):
+            limits['depth'] = self.DEFAULT_DEPTH
+
+        options = dict(self._default_options)
+        options.update(
+            self._named_options(
+                threads=threads,
+                hash_size=hash_size,
+                skill=skill,
+            )
+        )
+        self._set_options(options)
+
+        self.set_position(moves=moves, fen=fen)
+
+        # Without a depth to compare with, any cached result could be too
+        # shallow, so time or node bound searches are stored but never
+        # served. Searches restricted to some moves are not cached at all
+        cache_key = self._cache_key() if searchmoves is None else None
+        if cache_key is not None and limits['depth'] is not None:
+            cached = self._cache.get(cache_key, limits['depth'])
+            if cached is not None:
+                self._last_result = SEARCH_RESULT(*cached)
+                return self._last_result
+
+        result = self._engine.search(searchmoves=searchmoves, **limits)
+        if cache_key is not None and result.depth:
+            self._cache.put(cache_key, result.depth, list(result))
+
+        self._last_result = result
+        return result
+
+    def stop(self):
+        self._engine.stop()
+
+    def quit(self):
+        self._engine.quit()
+        if self._owns_book:
+            self._book.close()
+
+    def _init_session(self, fen=None):
+        self._fen = fen
+        self._move_specs = []
+        self._uci_moves = []
+
+        # Only tracked when caching or using a book or bitbases, to look up
+        # positions
+        self._position = None
+        is_tracked = (
+            self._cache is not None or
+            self._book is not None or
+            self._bitbases is not None
+        )
+        if is_tracked:
+            self._position = Position() if fen is None else Position(fen)
+
+    def _cache_key(self):
+        if self._cache is None:
+            return None
+
+        # Results depend on the position and on the engine settings. Move
+        # counters do not change the evaluation, they are left out so that
+        # transpositions share their entries
+        position_key = ' '.join(self._position.fen().split()[:4])
+        options_key = json.dumps(self._options, sort_keys=True)
+        return f'{self._engine_type.name}|{options_key}|{position_key}'
+
+    def _bitbase_moves(self):
+        position = self._position
+        results = {}
+        for move in position.legal_moves():
+            position.make_move(move)
+            result = self._bitbases.probe(position)
+            position.unmake_move()
+            if result is None or result == bitbaser.ILLEGAL:
+                return None
+            results[position.move_to_uci(move)] = result
+
+        # Results after a move are for the opponent
+        for wanted in (bitbaser.LOSS, bitbaser.DRAW, bitbaser.WIN):
+            moves = [m for m, result in results.items() if result == wanted]
+            if moves:
+                return moves
+
+        return None
+
+    def _set_options(self, options):
+        # Options given to an earlier call only go back to the default of
+        # the engine, they would otherwise stick to the next calls
+        for name in set(self._options) - set(options):
+            default = self._engine.defaults.get(name)
+            if default is not None:
+                self._engine.set_option(name, default)
+                del self._options[name]
+
+        for name, value in options.items():
+            if self._options.get(name) != value:
+                self._engine.set_option(name, value)
+                self._options[name] = value
+
+    @staticmethod
+    def _named_options(threads=None, hash_size=None, skill=None):
+        values = dict(threads=threads, hash_size=hash_size, skill=skill)
+        return {
+            OPTION_NAMES[name]: value
+            for name, value in values.items()
+            if value is not None
+        }
+
+    def _nb_known_moves(self, moves):
+        nb_known = 0
+        for known_move, move in zip(self._move_specs, moves):
+            if known_move != move:
+                break
+            nb_known += 1
+
+        return nb_known
+
+    @staticmethod
+    def _to_uci(move_spec):
+        # Uci strings may carry a promotion, e.g `e7e8q`
+        promotion = ''
+        is_promotion = (
+            isinstance(move_spec, str) and
+            len(move_spec) == 5 and
+            move_spec[4] in 'qrbn'
+        )
+        if is_promotion:
+            move_spec, promotion = move_spec[:4], move_spec[4]
+
+        src, dst = Game.parse_move_spec(move_spec)
+        return f'{src.address}{dst.address}{promotion}'
+
+
+class UCIEngine:
+    def __init__(self, path, options=None):
+        self._process = subprocess.Popen(
+            path,
+            universal_newlines=True,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+        # Commands like `stop` can be sent from another thread while a
+        # search is waiting for its result
+        self._write_lock = threading.Lock()
+
+        # Default values of the options, as announced by the engine
+        self._defaults = {}
+        self._put('uci')
+        while True:
+            tokens = self._read_line().split()
+            if tokens[:1] == ['uciok']:
+                break
+            if tokens[:1] == ['option']:
+                self._parse_option(tokens[1:])
+
+        for name, value in (options or {}).items():
+            self.set_option(name, value)
+
+        self.new_game()
+
+    @property
+    def defaults(self):
+        return dict(self._defaults)
+
+    def set_option(self, name, value):
+        if isinstance(value, bool):
+            value = str(value).lower()
+
+        self._put(f'setoption name {name} value {value}')
+        self.is_ready()
 
-    def _apply_moves(self, moves):
-        moves = list(map(Game.parse_move_spec, moves))
-        moves = list(map(lambda x: f'{x[0].address}{x[1].address}', moves))
-        self._engine.set_position(moves)
+    def is_ready(self):
+        self._put('isready')
+        self._read_until('readyok')
+
+    def new_game(self):
+        self._put('ucinewgame')
+        self.is_ready()
+
+    def set_position(self, moves=None, fen=None):
+        position = 'startpos' if fen is None else f'fen {fen}'
+        command = f'position {position}'
+        if moves:
+            command = f'{command} moves {" ".join(moves)}'
+
+        self._put(command)
+
+    def go(self, depth=None, movetime=None, nodes=None):
+        result = self.search(depth=depth, movetime=movetime, nodes=nodes)
+        return result.best_move
+
+    def search(self, depth=None, movetime=None, nodes=None, searchmoves=None):
+        command = 'go'
+        if depth is not None:
+            command = f'{command} depth {depth}'
+        if movetime is not None:
+            command = f'{command} movetime {movetime}'
+        if nodes is not None:
+            command = f'{command} nodes {nodes}'
+        if searchmoves:
+            command = f'{command} searchmoves {" ".join(searchmoves)}'
+
+        self._put(command)
+
+        info = {}
+        while True:
+            line = self._read_line()
+            tokens = line.split()
+            if not tokens:
+                continue
+
+            if tokens[0] == 'info':
+                info.update(self._parse_info(tokens[1:]))
+            elif tokens[0] == 'bestmove':
+                break
+
+        best_move = tokens[1] if len(tokens) > 1 else None
+        if best_move == '(none)':
+            best_move = None
+
+        return SEARCH_RESULT(
+            best_move=best_move,
+            score=info.get('score'),
+            mate=info.get('mate'),
+            depth=info.get('depth'),
+            pv=info.get('pv', []),
+            nodes=info.get('nodes'),
+            nps=info.get('nps'),
+            time=info.get('time'),
+        )
+
+    def stop(self):
+        self._put('stop')
+
+    def quit(self):
+        if self._process.poll() is not None:
+            return
+
+        self._put('quit')
+        self._process.wait()
+
+    def _put(self, command):
+        with self._write_lock:
+            self._process.stdin.write(f'{command}\n')
+            self._process.stdin.flush()
+
+    def _read_line(self):
+        line = self._process.stdout.readline()
+        if not line:
+            error_msg = 'Engine process exited unexpectedly'
+            raise RuntimeError(error_msg)
+
+        return line.strip()
+
+    def _read_until(self, token):
+        while True:
+            line = self._read_line()
+            if line.split(' ', 1)[0] == token:
+                return line
+
+    def _parse_option(self, tokens):
+        # name <name> type <type> [default <value>] [min ..] [max ..]
+        # [var ..], names and values can hold spaces
+        fields = {}
+        field = None
+        for token in tokens:
+            if token in ('name', 'type', 'default', 'min', 'max', 'var'):
+                field = token
+                fields.setdefault(field, [])
+            elif field is not None:
+                fields[field].append(token)
+
+        if 'name' in fields and 'default' in fields:
+            name = ' '.join(fields['name'])
+            self._defaults[name] = ' '.join(fields['default'])
+
+    @staticmethod
+    def _parse_info(tokens):
+        info = {}
+        int_fields = ['depth', 'nodes', 'nps', 'time']
+        index = 0
+        while index < len(tokens):
+            token = tokens[index]
+            if token == 'string':
+                # Free text until the end of the line
+                break
+            elif token == 'pv':
+                info['pv'] = tokens[index + 1:]
+                break
+            elif token == 'score':
+                kind, value = tokens[index + 1], int(tokens[index + 2])
+                info['score'] = value if kind == 'cp' else None
+                info['mate'] = value if kind == 'mate' else None
+                index += 3
+            elif token in int_fields:
+                info[token] = int(tokens[index + 1])
+                index += 2
+            else:
+                index += 1
+
+        return info
+
+    def __del__(self):
+        process = getattr(self, '_process', None)
+        if process is not None and process.poll() is None:
+            process.kill()
+
+
+class NativeEngine:
+    # Rough size of a transposition table entry, used to turn the `Hash`
+    # option (in MB) into a number of entries
+    TT_ENTRY_SIZE = 200
+
+    # Skill levels below the maximum cap the search depth
+    MAX_SKILL = 20
+
+    DEFAULTS = {
+        'Threads': 1,
+        'Hash': Searcher.DEFAULT_TT_SIZE * TT_ENTRY_SIZE // (1024 * 1024),
+        'Skill Level': MAX_SKILL,
+    }
+
+    def __init__(self, options=None):
+        self._options = {}
+        self._searcher = Searcher()
+        self._position = Position()
+        self._max_depth = None
+
+        for name, value in (options or {}).items():
+            self.set_option(name, value)
+
+    @property
+    def defaults(self):
+        return dict(self.DEFAULTS)
+
+    def set_option(self, name, value):
+        self._options[name] = value
+        if name == 'Hash':
+            mb = int(value)
+            self._searcher.tt_size = mb * 1024 * 1024 // self.TT_ENTRY_SIZE
+        elif name == 'Skill Level':
+            skill = int(value)
+            self._max_depth = None
+            if skill < self.MAX_SKILL:
+                self._max_depth = 1 + max(skill, 0) // 4
+
+    def is_ready(self):
+        pass
+
+    def new_game(self):
+        self._searcher.clear()
+        self._position = Position()
+
+    def set_position(self, moves=None, fen=None):
+        position = Position() if fen is None else Position(fen)
+        for move in moves or []:
+            position.push_uci(move)
+
+        self._position = position
+
+    def go(self, depth=None, movetime=None, nodes=None):
+        result = self.search(depth=depth, movetime=movetime, nodes=nodes)
+        return result.best_move
+
+    def search(self, depth=None, movetime=None, nodes=None, searchmoves=None):
+        if self._max_depth is not None:
+            depth = min(depth or self._max_depth, self._max_depth)
+
+        moves = None
+        if searchmoves:
+            moves = [self._position.parse_uci(m) for m in searchmoves]
+
+        info = self._searcher.search(
+            self._position,
+            depth=depth,
+            movetime=movetime,
+            nodes=nodes,
+            moves=moves,
+        )
+        return SEARCH_RESULT(*info)
+
+    def stop(self):
+        self._searcher.stop()
+
+    def quit(self):
+        pass
+
+
+class EnginePool:
+    def __init__(
+            self,
+            nb_engines=None,
+            engine_type=c.EngineType.stockfish,
+            engine_params=None,
+            depth=None,
+            movetime=None,
+            nodes=None,
+            cache=None,
+    ):
+        self._nb_engines = nb_engines or os.cpu_count() or 1
+        self._depth = depth
+        self._movetime = movetime
+        self._nodes = nodes
+        self._jobs = queue.Queue()
+
+        # A UCI engine runs in its own process, the threads only feed it
+        # and wait on its output. The native engine searches on the threads
+        # themselves, so its searches share the interpreter lock
+        self._engines = [
+            Engine(
+                engine_type=engine_type,
+                engine_params=engine_params,
+                cache=cache,
+            )
+            for _ in range(self._nb_engines)
+        ]
+        self._workers = [
+            threading.Thread(target=self._work, args=(engine, ), daemon=True)
+            for engine in self._engines
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    @property
+    def nb_engines(self):
+        return self._nb_engines
+
+    def analyse(self, positions):
+        """
+        Analyses the given positions on all the engines of the pool and
+        yields an ANALYSIS for each of them in the order they complete.
+
+        A position is either a list of move specs from the start position
+        or a POSITION(moves, fen).
+        """
+        # Each call gets its results on its own queue, so that calls from
+        # several threads do not mix. The jobs left behind by an error or
+        # by a caller that stopped iterating are skipped
+        results = queue.Queue()
+        cancelled = threading.Event()
+        try:
+            nb_jobs = 0
+            for index, position in enumerate(positions):
+                if not isinstance(position, POSITION):
+                    position = POSITION(moves=list(position), fen=None)
+                self._jobs.put((cancelled, results, index, position))
+                nb_jobs += 1
+
+            while nb_jobs:
+                index, position, result = results.get()
+                nb_jobs -= 1
+                if isinstance(result, Exception):
+                    raise result
+                yield ANALYSIS(index=index, position=position, result=result)
+        finally:
+            cancelled.set()
+
+    def close(self):
+        for _ in self._workers:
+            self._jobs.put(None)
+
+        for worker in self._workers:
+            worker.join()
+
+        for engine in self._engines:
+            engine.quit()
+
+    def _work(self, engine):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+
+            cancelled, results, index, position = job
+            if cancelled.is_set():
+                continue
+
+            try:
+                result = engine.analyse(
+                    moves=position.moves,
+                    fen=position.fen,
+                    depth=self._depth,
+                    movetime=self._movetime,
+                    nodes=self._nodes,
+                )
+            except Exception as e:
+                result = e
+
+            results.put((index, position, result))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
 
 def _get_engine(engine_type, engine_params=None):
     if engine_type == c.EngineType.stockfish:
-        from stockfish import Stockfish
-        # TODO: Added parameter for the engine here
-        if engine_params is not None:
-            pass
-
-        return Stockfish()
+        # Engine params are passed as UCI options, e.g
+        # {'Threads': 1, 'Hash': 16}
+        return UCIEngine(
+            path=c.APP.STOCKFISH_EXE_NAME,
+            options=engine_params,
+        )
+    elif engine_type == c.EngineType.native:
+        return NativeEngine(options=engine_params)
     elif engine_type == c.EngineType.leela:
         raise NotImplementedError('Leela chess engine is not implelemented')
     else:
@@ -1,8 +1,6 @@
 import collections
-import itertools
 import re
 import contextlib
-import copy
 
 
 from .. import constant as c
@@ -11,15 +9,79 @@ from ..element.boarder import Board
 from ..element.squarer import Square
 from ..element.piecer import Piece
 from .mover import Move
+from . import attacker, bitbaser, positioner
 
 
-GAME_DATA = collections.namedtuple(
-    'GAME_DATA',
-    [
-        'src', 'dst', 'captured_white', 'captured_black',
-        'leader', 'lead', 'move_history', 'capturables',
-    ]
+class GameData:
+    """
+    Sent with MOVE_SIGNAL. src, dst and move, the PLAYED_MOVE just made,
+    come with it, the other fields are read from the game the first time
+    they are asked for, so that listeners only pay for what they use. They
+    give the state of the game at that time.
+    """
+    __slots__ = ('_game', '_src', '_dst', '_move', '_values')
+
+    def __init__(self, game, src, dst, move):
+        self._game = game
+        self._src = src
+        self._dst = dst
+        self._move = move
+        self._values = {}
+
+    @property
+    def src(self):
+        return self._src
+
+    @property
+    def dst(self):
+        return self._dst
+
+    @property
+    def move(self):
+        return self._move
+
+    @property
+    def captured_white(self):
+        return self._get('captured_white')
+
+    @property
+    def captured_black(self):
+        return self._get('captured_black')
+
+    @property
+    def leader(self):
+        return self._get('leader')
+
+    @property
+    def lead(self):
+        return self._get('lead')
+
+    @property
+    def move_history(self):
+        return self._get('move_history')
+
+    @property
+    def capturables(self):
+        return self._get('capturables')
+
+    @property
+    def evaluation(self):
+        return self._get('evaluation')
+
+    def _get(self, name):
+        if name not in self._values:
+            self._values[name] = getattr(self._game, name)
+        return self._values[name]
+
+
+# Castling rights with their FEN code, color and the file of their rook
+CASTLING_RIGHTS = (
+    (positioner.WHITE_KING_SIDE, 'K', c.Color.white, 7),
+    (positioner.WHITE_QUEEN_SIDE, 'Q', c.Color.white, 0),
+    (positioner.BLACK_KING_SIDE, 'k', c.Color.black, 7),
+    (positioner.BLACK_QUEEN_SIDE, 'q', c.Color.black, 0),
 )
+ALL_CASTLING_RIGHTS = sum(right for right, _, _, _ in CASTLING_RIGHTS)
 
 
 PLAYED_MOVE = collections.namedtuple(
@@ -63,20 +125,24 @@ class Game:
         ]
     )
 
-    MOVE_SIGNAL = Signal(GAME_DATA)
+    MOVE_SIGNAL = Signal(GameData)
     INVALID_MOVE_SIGNAL = Signal()
     MATE_SIGNAL = Signal(c.Color)
     PLAYER_CHANGED_SIGNAL = Signal(c.Color)
     NON_STANDARD_BOARD_SET_SIGNAL = Signal()
     STALEMATE_SIGNAL = Signal()
+    DRAW_SIGNAL = Signal(c.DrawReason)
     PROMOTION_REQUIRED_SIGNAL = Signal(str)
 
-    def __init__(self):
+    def __init__(self, bitbases=None):
+        self._bitbases = bitbases
         self._move_no = 1
         self._signals_blocked = False
         self._board = Board()
         self._captured_white = []
         self._captured_black = []
+        self._white_points = 0
+        self._black_points = 0
 
         self._move_history = []
         self._game_started = False
@@ -88,17 +154,26 @@ class Game:
         self._next_player = c.Color.black
         self._winner = None
         self._is_game_over = False
+        self._draw_reason = None
         self._description = []
 
         self._black_king_moved = False
-        self._black_rook_moved = False
+        self._black_king_rook_moved = False
+        self._black_queen_rook_moved = False
         self._white_king_moved = False
-        self._white_rook_moved = False
+        self._white_king_rook_moved = False
+        self._white_queen_rook_moved = False
 
         self._black_promotion_piece_type = None
         self._white_promotion_piece_type = None
         self._is_standard_type = True
 
+        # Hashes of the positions since the start and the number of half
+        # moves since the last pawn move or capture
+        self._position_hashes = []
+        self._halfmove_clock = 0
+        self._reset_position_hashes()
+
     @contextlib.contextmanager
     def block_signals(self):
         current_state = self._signals_blocked
@@ -116,6 +191,14 @@ class Game:
     def board(self, val):
         self._board = val
 
+    @property
+    def bitbases(self):
+        return self._bitbases
+
+    @bitbases.setter
+    def bitbases(self, val):
+        self._bitbases = val
+
     @property
     def description(self):
         return '\n'.join(self._description)
@@ -130,28 +213,40 @@ class Game:
 
     @property
     def white_points(self):
-        return sum([p.worth for p in self.captured_black])
+        return self._white_points
 
     @property
     def black_points(self):
-        return sum([p.worth for p in self.captured_white])
+        return self._black_points
+
+    @property
+    def evaluation(self):
+        return self._board.evaluation
 
     @property
     def winner(self):
         return self._winner
 
+    @property
+    def draw_reason(self):
+        return self._draw_reason
+
+    @property
+    def halfmove_clock(self):
+        return self._halfmove_clock
+
     @property
     def leader(self):
-        if self.black_points == self.white_points:
+        if self._black_points == self._white_points:
             return
-        elif self.black_points > self.white_points:
+        elif self._black_points > self._white_points:
             return c.Color.black
         else:
             return c.Color.white
 
     @property
     def lead(self):
-        return abs(self.black_points - self.white_points)
+        return abs(self._black_points - self._white_points)
 
     @property
     def pieces_checking_black(self):
@@ -178,6 +273,8 @@ class Game:
         self._is_standard_type = options.is_standard
 
         self._board.set_pieces(self._is_standard_type)
+        self._set_castling_rights()
+        self._reset_position_hashes()
 
         if not self._signals_blocked:
             self.NON_STANDARD_BOARD_SET_SIGNAL.emit()
@@ -188,6 +285,8 @@ class Game:
         self._board.reset()
         self._captured_white = []
         self._captured_black = []
+        self._white_points = 0
+        self._black_points = 0
 
         self._move_history = []
 
@@ -199,21 +298,117 @@ class Game:
         self._next_player = c.Color.black
         self._winner = None
         self._is_game_over = False
+        self._draw_reason = None
         self._description = []
 
         self._black_king_moved = False
-        self._black_rook_moved = False
+        self._black_king_rook_moved = False
+        self._black_queen_rook_moved = False
         self._white_king_moved = False
-        self._white_rook_moved = False
+        self._white_king_rook_moved = False
+        self._white_queen_rook_moved = False
 
         self._black_promotion_piece_type = None
         self._white_promotion_piece_type = None
         self._is_standard_type = True
+        self._reset_position_hashes()
 
     @property
     def is_game_over(self):
         return self._is_game_over
 
+    @property
+    def fen(self):
+        rights = self._rights_in_place(self._castling_rights())
+        castling = ''.join(
+            code
+            for right, code, _, _ in CASTLING_RIGHTS
+            if rights & right
+        )
+
+        en_passant = '-'
+        two_square_dst = self._board.pawn_two_square_dst
+        if two_square_dst is not None:
+            target_y = 2 if two_square_dst.y == 3 else 5
+            en_passant = Square((two_square_dst.x, target_y)).address
+
+        # The move that ends a game does not hand the turn over
+        side_to_move = self._current_player
+        if (
+                self._is_game_over and
+                self._move_history and
+                self._move_history[-1].piece.color == side_to_move
+        ):
+            side_to_move = self._next_player
+
+        side = 'w' if side_to_move == c.Color.white else 'b'
+        return (
+            f'{self._board.fen} {side} {castling or "-"} {en_passant} '
+            f'{self._halfmove_clock} {self._move_no}'
+        )
+
+    def set_fen(self, fen):
+        """
+        Sets the game up at the position of the FEN, without any history.
+        Castling rights are only kept when their king and rook are in place.
+        """
+        fields = fen.split()
+        if len(fields) < 4:
+            error_msg = f'Malformed FEN {fen}, expected at least 4 fields'
+            raise ValueError(error_msg)
+
+        placement, side, castling, en_passant = fields[:4]
+        if side not in ('w', 'b'):
+            error_msg = f'Malformed FEN {fen}, bad side to move {side}'
+            raise ValueError(error_msg)
+
+        if castling != '-' and not set(castling) <= set('KQkq'):
+            error_msg = f'Malformed FEN {fen}, bad castling {castling}'
+            raise ValueError(error_msg)
+
+        counters = fields[4:6]
+        if not all(counter.isdigit() for counter in counters):
+            error_msg = f'Malformed FEN {fen}, bad move counters {counters}'
+            raise ValueError(error_msg)
+        halfmove_clock = int(fields[4]) if len(fields) > 4 else 0
+        move_no = int(fields[5]) if len(fields) > 5 else 1
+
+        signals_blocked = self._signals_blocked
+        self.reset()
+        self._signals_blocked = signals_blocked
+
+        player = c.Color.white if side == 'w' else c.Color.black
+        self._board.set_fen(placement, en_passant, player)
+        if side == 'b':
+            self._current_player = c.Color.black
+            self._next_player = c.Color.white
+        self._move_no = move_no
+
+        self._set_castling_rights(
+            sum(
+                right
+                for right, code, _, _ in CASTLING_RIGHTS
+                if code in castling
+            )
+        )
+
+        self._update_capturables()
+        self._reset_position_hashes()
+        self._halfmove_clock = halfmove_clock
+
+        if not self._signals_blocked:
+            self.NON_STANDARD_BOARD_SET_SIGNAL.emit()
+            self.PLAYER_CHANGED_SIGNAL.emit(self._current_player)
+
+        # Puzzles can start from a finished game
+        if not attacker.has_legal_move(self._board, self._current_player):
+            if attacker.checkers(self._board, self._current_player):
+                self.game_over(
+                    white_wins=self._current_player == c.Color.black,
+                )
+            else:
+                self._stalemate()
+
     @staticmethod
     def parse_move_spec(move_spec):
         src = None
@@ -292,9 +487,19 @@ class Game:
 
         return src, dst
 
-    def apply_moves(self, moves):
+    def apply_moves(self, moves, trusted=False):
+        """
+        Plays the moves, only the last one is signaled. Trusted moves are put
+        straight on the board without validating them or looking for mates,
+        only the last move goes through the full rules. Only moves made by
+        pychess itself can be trusted, never the ones of a loaded file.
+        """
         with self.block_signals():
             for move, promotion in moves[:-1]:
+                if trusted:
+                    self._apply_trusted_move(move, promotion)
+                    continue
+
                 result = self.move((move, promotion))
                 if not result:
                     error_msg = (
@@ -304,13 +509,16 @@ class Game:
                     )
                     raise RuntimeError(error_msg)
 
+            if trusted:
+                self._update_capturables()
+
         # This will send the final signal to update the UI
         last_move, last_promotion = moves[-1]
         result = self.move((last_move, last_promotion))
         if not result:
             error_msg = (
                 'Error happened while trying to apply the move: '
-                f'move {self._move_no}({self.current_player.name}): '
+                f'move {self._move_no}({self._current_player.name}): '
                 f'{last_move}'
             )
             raise RuntimeError(error_msg)
@@ -354,19 +562,8 @@ class Game:
             return
 
         move = self._record_move(result, src, dst)
-        game_data = GAME_DATA(
-            src=src,
-            dst=dst,
-            captured_white=self.captured_white,
-            captured_black=self.captured_black,
-            leader=self.leader,
-            lead=self.lead,
-            move_history=self.move_history,
-            capturables=self.capturables
-        )
-
         if not self._signals_blocked:
-            self.MOVE_SIGNAL.emit(game_data)
+            self.MOVE_SIGNAL.emit(GameData(self, src, dst, move))
 
         if self._current_player == c.Color.black:
             self._move_no += 1
@@ -387,16 +584,265 @@ class Game:
             self._stalemate()
             return True
 
+        draw_reason = self._get_draw_reason()
+        if draw_reason is not None:
+            self._draw(draw_reason)
+            return True
+
+        if self._adjudicate(player=opponent):
+            return True
+
         self._toggle_player()
         return True
 
+    def _apply_trusted_move(self, move_spec, promotion):
+        src, dst = self.parse_move_spec(move_spec)
+        if promotion is not None:
+            if self._current_player == c.Color.white:
+                self._white_promotion_piece_type = promotion
+            else:
+                self._black_promotion_piece_type = promotion
+
+        piece = self._board.get_piece(src)
+        is_castling = (
+            piece.type == c.PieceType.king and
+            abs(dst.x - src.x) == c.GAME.KING_CASTLE_DISTANCE
+        )
+        captured_piece = None
+        disambiguation = None
+        king_side_castle = False
+        if is_castling:
+            king_side_castle = dst.x == 6
+            self._board.castle(
+                player=piece.color,
+                is_short_castle=king_side_castle,
+            )
+        else:
+            piece, captured_piece, disambiguation = self._move_piece(src, dst)
+
+        result = self.MOVE_RESULT(
+            success=True,
+            moved_piece=piece,
+            is_castling=is_castling,
+            captured_piece=captured_piece,
+            king_side_castle=king_side_castle,
+            disambiguation=disambiguation,
+            promoted_piece=self._handle_promotion(piece, dst),
+        )
+
+        # A game going on after this move means that it was not a mate,
+        # a check is found from the king instead of trying every piece
+        opponent = (
+            c.Color.black
+            if self._current_player == c.Color.white
+            else c.Color.white
+        )
+        check_mate_result = self.CHECK_MATE_RESULT(
+            is_check=bool(attacker.checkers(self._board, opponent)),
+            is_mate=False,
+        )
+        self._record_move(result, src, dst, check_mate_result)
+
+        if self._current_player == c.Color.black:
+            self._move_no += 1
+        self._toggle_player()
+
     def _stalemate(self):
         self._winner = None
         self._is_game_over = True
+        self._draw_reason = c.DrawReason.stalemate
 
         if not self._signals_blocked:
             self.STALEMATE_SIGNAL.emit()
 
+    def _draw(self, reason):
+        self._winner = None
+        self._is_game_over = True
+        self._draw_reason = reason
+
+        if not self._signals_blocked:
+            self.DRAW_SIGNAL.emit(reason)
+
+    def _get_draw_reason(self):
+        if self._is_insufficient_material():
+            return c.DrawReason.insufficient_material
+
+        if self._halfmove_clock >= c.GAME.FIFTY_MOVES_HALFMOVES:
+            return c.DrawReason.fifty_moves
+
+        if self._is_repetition():
+            return c.DrawReason.repetition
+
+        return None
+
+    def _is_repetition(self):
+        # Only positions since the last pawn move or capture, with the same
+        # side to move, can repeat the current one
+        hashes = self._position_hashes
+        last = len(hashes) - 1
+        first = max(last - self._halfmove_clock, 0)
+        nb_repetitions = 1
+        for index in range(last - 2, first - 1, -2):
+            if hashes[index] == hashes[last]:
+                nb_repetitions += 1
+                if nb_repetitions == c.GAME.REPETITIONS_FOR_DRAW:
+                    return True
+
+        return False
+
+    def _is_insufficient_material(self):
+        board = self._board
+        material = (
+            board.material(c.Color.white) +
+            board.material(c.Color.black)
+        )
+        if material > c.GAME.MAX_INSUFFICIENT_MATERIAL:
+            return False
+
+        knights = []
+        bishops = []
+        for color in c.Color:
+            for piece_type in (
+                    c.PieceType.pawn,
+                    c.PieceType.rook,
+                    c.PieceType.queen,
+            ):
+                if board.get_pieces(color, piece_type):
+                    return False
+
+            knights += board.get_pieces(color, c.PieceType.knight)
+            bishops += board.get_pieces(color, c.PieceType.bishop)
+
+        # A lone minor piece, or bishops all on squares of one color
+        if len(knights) + len(bishops) <= 1:
+            return True
+
+        if knights:
+            return False
+
+        square_colors = {
+            (square.x + square.y) % 2
+            for square in map(board.get_square, bishops)
+        }
+        return len(square_colors) == 1
+
+    def _reset_position_hashes(self):
+        self._halfmove_clock = 0
+        self._position_hashes = [self._position_hash(self._current_player)]
+
+    def _castling_rights(self):
+        rights = 0
+        for right, king_moved, rook_moved in (
+                (
+                    positioner.WHITE_KING_SIDE,
+                    self._white_king_moved,
+                    self._white_king_rook_moved,
+                ),
+                (
+                    positioner.WHITE_QUEEN_SIDE,
+                    self._white_king_moved,
+                    self._white_queen_rook_moved,
+                ),
+                (
+                    positioner.BLACK_KING_SIDE,
+                    self._black_king_moved,
+                    self._black_king_rook_moved,
+                ),
+                (
+                    positioner.BLACK_QUEEN_SIDE,
+                    self._black_king_moved,
+                    self._black_queen_rook_moved,
+                ),
+        ):
+            if not (king_moved or rook_moved):
+                rights |= right
+
+        return rights
+
+    def _rights_in_place(self, rights):
+        # The rights whose king and rook are on their squares
+        kept = 0
+        for right, _, color, rook_x in CASTLING_RIGHTS:
+            y = 0 if color == c.Color.white else 7
+            rook = self._board.get_piece(Square((rook_x, y)))
+            is_in_place = (
+                self._board.king_square(color) == Square((4, y)) and
+                rook is not None and
+                rook.type == c.PieceType.rook and
+                rook.color == color
+            )
+            if rights & right and is_in_place:
+                kept |= right
+
+        return kept
+
+    def _set_castling_rights(self, rights=ALL_CASTLING_RIGHTS):
+        kept = self._rights_in_place(rights)
+        self._white_king_moved = not (kept & (
+            positioner.WHITE_KING_SIDE | positioner.WHITE_QUEEN_SIDE
+        ))
+        self._white_king_rook_moved = not (kept & positioner.WHITE_KING_SIDE)
+        self._white_queen_rook_moved = (
+            not (kept & positioner.WHITE_QUEEN_SIDE)
+        )
+        self._black_king_moved = not (kept & (
+            positioner.BLACK_KING_SIDE | positioner.BLACK_QUEEN_SIDE
+        ))
+        self._black_king_rook_moved = not (kept & positioner.BLACK_KING_SIDE)
+        self._black_queen_rook_moved = (
+            not (kept & positioner.BLACK_QUEEN_SIDE)
+        )
+
+    def _clear_castling_right(self, square, color):
+        y = 0 if color == c.Color.white else 7
+        if square == Square((7, y)):
+            if color == c.Color.white:
+                self._white_king_rook_moved = True
+            else:
+                self._black_king_rook_moved = True
+        elif square == Square((0, y)):
+            if color == c.Color.white:
+                self._white_queen_rook_moved = True
+            else:
+                self._black_queen_rook_moved = True
+
+    def _position_hash(self, player):
+        position_hash = self._board.hash
+        if player == c.Color.black:
+            position_hash ^= positioner.ZOBRIST_BLACK
+
+        castling = self._castling_rights()
+        position_hash ^= positioner.ZOBRIST_CASTLING[castling]
+
+        # The en passant file only counts when a pawn can actually take
+        if attacker.can_take_en_passant(self._board, player):
+            two_square_dst = self._board.pawn_two_square_dst
+            position_hash ^= positioner.ZOBRIST_EN_PASSANT[two_square_dst.x]
+
+        return position_hash
+
+    def _adjudicate(self, player):
+        # Endgames covered by the bitbases are decided as soon as they are
+        # reached, instead of being played out
+        if self._bitbases is None:
+            return False
+
+        # Castling rights are not part of the tables
+        if self._castling_rights():
+            return False
+
+        result = self._bitbases.probe_board(self._board, player)
+        if result == bitbaser.DRAW:
+            self._draw(c.DrawReason.adjudication)
+        elif result == bitbaser.WIN:
+            self.game_over(white_wins=player == c.Color.white)
+        elif result == bitbaser.LOSS:
+            self.game_over(white_wins=player != c.Color.white)
+        else:
+            return False
+
+        return True
+
     def game_over(self, white_wins):
         winner = c.Color.white
         if not white_wins:
@@ -408,65 +854,15 @@ class Game:
             self.MATE_SIGNAL.emit(self._winner)
 
     def move_causes_discovered_check(self, src, dst, player):
-        with self._try_move(src, dst):
-            king = Piece(c.PieceType.king, color=player)
-            return self._is_capturable(king)
+        return attacker.leaves_king_attacked(self._board, src, dst, player)
 
     def _is_stalemate(self, player):
-        for piece in self._get_pieces(player):
-            if self._piece_can_move(piece, player):
-                return False
-
-        return True
-
-    def _piece_can_move(self, piece, color):
-        src = self._board.get_square(piece)
-        dst_incr = None
-        if piece.type == c.PieceType.pawn:
-            y_incr = -1 if color == c.Color.black else 1
-            dst_incr = list(itertools.product((1, 0, -1), (y_incr,)))
-        elif piece.type == c.PieceType.knight:
-            dst_incr = (
-                list(itertools.product((-1, 1), (-2, 2))) +
-                list(itertools.product((-2, 2), (-1, 1)))
-            )
-        elif piece.type == c.PieceType.bishop:
-            dst_incr = list(itertools.product((-1, 1), (-1, 1)))
-        elif piece.type == c.PieceType.rook:
-            dst_incr = [(0, 1), (0, -1), (-1, 0), (1, 0)]
-        elif piece.type == c.PieceType.queen:
-            dst_incr = (
-                [(0, 1), (0, -1), (-1, 0), (1, 0)] +
-                list(itertools.product((-1, 1), (-1, 1)))
-            )
-        elif piece.type == c.PieceType.king:
-            dst_incr = [
-                (-1, 1), (0, 1), (1, 1), (1, 0),
-                (1, -1), (0, -1), (-1, -1), (-1, 0)
-            ]
-
-        for x_incr, y_incr in dst_incr:
-            if not 0 <= src.x + x_incr <= 7 or not 0 <= src.y + y_incr <= 7:
-                continue
+        return not attacker.has_legal_move(self._board, player)
 
-            dst = Square((src.x + x_incr, src.y + y_incr))
-            if self.move_causes_discovered_check(src, dst, color):
-                continue
-
-            if Move.is_board_move_legal(
-                self._board, src, dst, piece
-            ):
-                self._description.append(
-                    f'Not a stalemate as {piece} '
-                    f'can move from {src} to {dst}'
-                )
-                return True
-
-        return False
-
-    def _record_move(self, result, src, dst):
+    def _record_move(self, result, src, dst, check_mate_result=None):
         piece = result.moved_piece
-        check_mate_result = self._detect_check_mate()
+        if check_mate_result is None:
+            check_mate_result = self._detect_check_mate()
 
         winner = None
         if check_mate_result.is_mate:
@@ -497,11 +893,22 @@ class Game:
             else:
                 self._white_king_moved = True
 
-        if piece.type == c.PieceType.rook:
-            if piece.color == c.Color.black:
-                self._black_rook_moved = True
-            else:
-                self._white_rook_moved = True
+        opponent = (
+            c.Color.black
+            if piece.color == c.Color.white
+            else c.Color.white
+        )
+
+        # A rook leaving or taken on its corner loses its castling
+        self._clear_castling_right(src, piece.color)
+        self._clear_castling_right(dst, opponent)
+
+        if piece.type == c.PieceType.pawn or result.captured_piece:
+            self._halfmove_clock = 0
+        else:
+            self._halfmove_clock += 1
+
+        self._position_hashes.append(self._position_hash(opponent))
 
         return move
 
@@ -608,8 +1015,7 @@ class Game:
         return promoted_piece
 
     def _create_promoted_piece(self, piece_type, color):
-        pieces = self._get_pieces(color)
-        existing_pieces = [p for p in pieces if p.type == piece_type]
+        existing_pieces = self._board.get_pieces(color, piece_type)
         if not existing_pieces:
             highest_order = -1
         else:
@@ -624,8 +1030,10 @@ class Game:
         if captured_piece is not None:
             if captured_piece.color == c.Color.black:
                 self._captured_black.append(captured_piece)
+                self._white_points += captured_piece.worth
             else:
                 self._captured_white.append(captured_piece)
+                self._black_points += captured_piece.worth
 
         return src_piece, captured_piece, disambiguation
 
@@ -634,10 +1042,9 @@ class Game:
             return
 
         src = self._board.get_square(piece)
-        same_color_pieces = self._get_pieces(color=piece.color)
         identical_pieces = [
-            p for p in same_color_pieces
-            if p.type == piece.type and p != piece
+            p for p in self._board.get_pieces(piece.color, piece.type)
+            if p != piece
         ]
 
         disambiguation = []
@@ -668,13 +1075,16 @@ class Game:
         if king.type != c.PieceType.king:
             return False
 
-        prev_moves = (
-            [self._black_king_moved, self._black_rook_moved]
-            if king.color == c.Color.black
-            else [self._white_king_moved, self._white_rook_moved]
-        )
+        if king.color == c.Color.white:
+            right = positioner.WHITE_KING_SIDE
+            if dst.x < src.x:
+                right = positioner.WHITE_QUEEN_SIDE
+        else:
+            right = positioner.BLACK_KING_SIDE
+            if dst.x < src.x:
+                right = positioner.BLACK_QUEEN_SIDE
 
-        if any(prev_moves):
+        if not self._castling_rights() & right:
             return False
 
         if self._is_capturable(king):
@@ -690,17 +1100,11 @@ class Game:
         return True
 
     def _in_betweens_under_attack(self, in_betweens):
-        src_y = in_betweens[0].y
-        src_x = None
-        if len(in_betweens) == 3:
-            # Long castle, rook at 'a'
-            src_x = 0
-        elif len(in_betweens) == 2:
-            # Short castle rook at 'h'
-            src_x = 7
-
-        src = Square((src_x, src_y))
-        rook_for_testing = self.board.get_piece(src)
+        opponent = (
+            c.Color.black
+            if self._current_player == c.Color.white
+            else c.Color.white
+        )
         for dst in in_betweens:
             # Skip over 'b' file as this is not needed to be checked
             # although a in between square but only squares where king
@@ -708,9 +1112,8 @@ class Game:
             if dst.x == 1:
                 continue
 
-            with self._try_move(src, dst):
-                if self._is_capturable(rook_for_testing):
-                    return True
+            if attacker.is_attacked(self._board, dst, opponent):
+                return True
 
         return False
 
@@ -793,55 +1196,25 @@ class Game:
                 is_check=False,
                 is_mate=False,
             )
-        elif len(checking_pieces) == 1:
-            checking_piece = checking_pieces[0]
-            self._description.append(
-                f'The {king_under_check} is under check by {checking_piece}'
-            )
-            if self._is_checking_piece_capturable(
-                    checking_piece, king_under_check
-            ):
-                return self.CHECK_MATE_RESULT(
-                    is_check=True,
-                    is_mate=False,
-                )
-
-            elif self._is_check_blockable(checking_piece, king_under_check):
-                return self.CHECK_MATE_RESULT(
-                    is_check=True,
-                    is_mate=False,
-                )
 
-            elif self._escape_square_exists(king_under_check):
-                return self.CHECK_MATE_RESULT(
-                    is_check=True,
-                    is_mate=False,
-                )
+        self._description.append(
+            f'The {king_under_check} is under check by {checking_pieces}'
+        )
 
-            else:
-                return self.CHECK_MATE_RESULT(
-                    is_check=True,
-                    is_mate=True,
-                )
-        else:
+        # Any legal reply, a capture, a block or a king step, averts the mate
+        is_mate = not attacker.has_legal_move(
+            self._board,
+            king_under_check.color,
+        )
+        if is_mate:
             self._description.append(
-                f'The {king_under_check} is being checked by the following - '
-                f'{checking_pieces}'
-            )
-            no_escape_available = not self._escape_square_exists(
-                king_under_check
+                f'There is no legal move for {king_under_check.color.name}'
             )
 
-            if no_escape_available:
-                return self.CHECK_MATE_RESULT(
-                    is_check=True,
-                    is_mate=True,
-                )
-            else:
-                return self.CHECK_MATE_RESULT(
-                    is_check=True,
-                    is_mate=False,
-                )
+        return self.CHECK_MATE_RESULT(
+            is_check=True,
+            is_mate=is_mate,
+        )
 
     def _is_capturable(self, piece):
         if not self._capturables:
@@ -854,170 +1227,8 @@ class Game:
 
         return False
 
-    def _is_check_blockable(self, piece, king):
-        src = self.board.get_square(piece)
-        dst = self.board.get_square(king)
-        checking_move = Move(piece, src, dst)
-        path = checking_move.path[1:-1]
-        blocking_pieces = [
-            bp
-            for bp in self.board.pieces
-            if bp.color == king.color and
-            bp != king
-        ]
-        for checking_path_square in path:
-            for blocking_piece in blocking_pieces:
-                blocking_origin = self.board.get_square(blocking_piece)
-                with self._try_move(blocking_origin, checking_path_square):
-                    self._description.append(
-                        f'\nTrying blocking move by blocking piece '
-                        f'{blocking_piece}, from {blocking_origin} to '
-                        f'{checking_path_square}\n'
-                        'After this move, the caturables are: '
-                        f'{self._capturables[king.color]}\n\n'
-                    )
-                    capturing_pieces = self._get_threatening_pieces(king)
-                    if not capturing_pieces:
-                        self._description.append(
-                            'The check on {king} can be averted by blocking '
-                            f'the cheking piece {piece} by moving '
-                            f'{blocking_piece} from {blocking_origin} '
-                            f'to {checking_path_square}.'
-                        )
-                        return True
-
-        self._description.append(
-            f'There is no way to block {piece} from giving check '
-            f'to {king}'
-        )
-        return False
-
-    def _is_checking_piece_capturable(self, checking_piece, checked_king):
-        pieces_threatening_checking_piece = self._get_threatening_pieces(
-            piece=checking_piece,
-        )
-
-        pieces_that_can_capture_safely = []
-        for threatening_piece in pieces_threatening_checking_piece:
-            src = self._board.get_square(threatening_piece)
-            dst = self._board.get_square(checking_piece)
-            with self._try_move(src, dst):
-                pieces_checking_after_move = (
-                    self._pieces_checking_black
-                    if checked_king.color == c.Color.black
-                    else self._pieces_checking_white
-                )
-                if not pieces_checking_after_move:
-                    pieces_that_can_capture_safely.append(threatening_piece)
-
-        if pieces_that_can_capture_safely:
-            self._description.append(
-                f'{checking_piece} checking {checked_king} can be captured'
-                f'by the following pieces - {pieces_that_can_capture_safely}.'
-            )
-            return True
-        else:
-            self._description.append(
-                f'{checking_piece} checking {checked_king} cannot be'
-                f'captured by any of the {checked_king.color.name} pieces.'
-            )
-            return False
-
-    def _get_threatening_pieces(self, piece):
-        threatening_pieces = []
-        capturables = self._capturables[piece.color]
-        for threatening_piece, threatened_pieces in capturables.items():
-            if piece in threatened_pieces:
-                threatening_pieces.append(threatening_piece)
-
-        return threatening_pieces
-
     def _get_pieces(self, color):
-        return [
-            piece
-            for piece in self.board.pieces
-            if piece.color == color
-        ]
-
-    def _escape_square_exists(self, king):
-        def filter_self_color(square):
-            if self.board.is_empty(square):
-                return True
-            piece = self.board.get_piece(square)
-            return piece.color != king.color
-
-        king_square = self.board.get_square(king)
-
-        # All squares surrounding the king
-        surrounding = [
-            Square((king_square.x + incr_x, king_square.y + incr_y))
-            for incr_x, incr_y in itertools.product([1, -1, 0], [1, -1, 0])
-            if 0 <= king_square.x + incr_x < 8 and
-            0 <= king_square.y + incr_y < 8 and
-            (incr_x, incr_y) != (0, 0)
-        ]
-
-        # Remove those squares from surrounding that are occupied by the pieces
-        # of the same color as the king. The remaining squares are either
-        # empty or are covered by opponent pieces that the king can potentially
-        # capture.
-        surrounding = list(filter(filter_self_color, surrounding))
-
-        # Now remove the sqaures where king cannot move due to threat from
-        # other pieces
-        escape_squares = []
-        for surr_square in surrounding:
-            with self._try_move(king_square, surr_square):
-                capturing_pieces = self._get_threatening_pieces(king)
-                if not capturing_pieces:
-                    escape_squares.append(surr_square)
-
-        # If there are still squares left in surrounding, these are the ones
-        # where the king can safely move to escape the check
-        if len(escape_squares) != 0:
-            self._description.append(
-                f'{king} can safely escape to these squares -  '
-                f'{escape_squares}'
-            )
-            return True
-        else:
-            self._description.append(
-                f'There are no squares where {king} can safely escape to'
-            )
-            return False
-
-    @contextlib.contextmanager
-    def _try_move(self, src, dst):
-        pawn_two_square_dst = self._board.pawn_two_square_dst
-        board_copy = self._board.data.copy()
-        reverse_copy = self._board.reverse.copy()
-        captured_black_copy = copy.copy(self._captured_black)
-        captured_white_copy = copy.copy(self._captured_white)
-        capturables_copy = self._capturables.copy()
-        pieces_checking_black_copy = copy.copy(self._pieces_checking_black)
-        pieces_checking_white_copy = copy.copy(self._pieces_checking_white)
-        move_history_copy = copy.copy(self._move_history)
-
-        self._perform_move(src, dst)
-        try:
-            yield
-        finally:
-            self._board.pawn_two_square_dst = pawn_two_square_dst
-            self._board.data = board_copy.copy()
-            self._board.reverse = reverse_copy.copy()
-            self._captured_black = copy.copy(captured_black_copy)
-            self._captured_white = copy.copy(captured_white_copy)
-            self._capturables = capturables_copy.copy()
-
-            self._pieces_checking_black = copy.copy(
-                pieces_checking_black_copy
-            )
-
-            self._pieces_checking_white = copy.copy(
-                pieces_checking_white_copy
-            )
-
-            self._move_history = copy.copy(move_history_copy)
+        return self._board.get_pieces(color)
 
     def _promotion_required(self, src, dst):
         if self._board.get_piece(src).type != c.PieceType.pawn:
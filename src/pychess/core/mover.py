@@ -68,8 +68,7 @@ class Move:
                 if piece.color == c.Color.white
                 else c.Color.white
             )
-            opposing_king = Piece(c.PieceType.king, opposing_color)
-            opposing_king_square = board.get_square(opposing_king)
+            opposing_king_square = board.king_square(opposing_color)
             is_destination_attacked = (
                 abs(dst.x - opposing_king_square.x) <= 1 and
                 abs(dst.y - opposing_king_square.y) <= 1
@@ -13,7 +13,7 @@ from ..element.piecer import Piece
 from ..element.boarder import Board
 from ..gui.imager import BoardImage
 from .mover import Move
-from .gamer import Game
+from . import attacker
 
 
 class NAMEDTUPLES:
@@ -265,6 +265,7 @@ class PGN2MOVES:
 
     def create_movie(self, game_index, movie_file_path, fps=1, thread=None):
         self._thread = thread
+        self._board.reset()
         with self._movie_folder() as folder:
             self._emit_total_movie_images(game_index)
             self._generate_movie_title(game_index, folder)
@@ -349,6 +350,9 @@ class PGN2MOVES:
         ]
 
     def _get_moves(self, game_index, image_folder=None):
+        # Moves are resolved by playing them on the board, which has to
+        # start from the initial position for every game
+        self._board.reset()
         game = self._games[game_index]
         return self._get_game_moves(game, image_folder=image_folder)
 
@@ -548,11 +552,7 @@ class PGN2MOVES:
         )
 
     def _get_existing_pieces(self, piece_type, color):
-        return [
-            piece
-            for piece in self._board.pieces
-            if piece.type == piece_type and piece.color == color
-        ]
+        return self._board.get_pieces(color, piece_type)
 
     def _pgn_move_to_src_dst(self, move, player):
         if player == c.Color.white:
@@ -612,11 +612,7 @@ class PGN2MOVES:
     ):
         tried_moves = []
         is_x = partial_addr in list('abcdefgh')
-        possible_pieces = [
-            piece
-            for piece in self._board.pieces
-            if piece.type == piece_type and piece.color == player
-        ]
+        possible_pieces = self._board.get_pieces(player, piece_type)
         for piece in possible_pieces:
             if piece.type != piece_type or piece.color != player:
                 continue
@@ -673,12 +669,11 @@ class PGN2MOVES:
                 dst=dst,
                 piece=piece,
             )
-            game_obj = Game()
-            game_obj.board = self._board
-            check = game_obj.move_causes_discovered_check(
+            check = attacker.leaves_king_attacked(
+                self._board,
                 src,
                 dst,
-                player=player,
+                player,
             )
             if is_move_legal and not check:
                 return src.address
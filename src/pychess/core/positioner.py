@@ -0,0 +1,738 @@
+import random
+
+
+# A compact 0x88 board used where the full Game machinery is too slow
+# (engine search, bulk hashing). Pieces are signed ints, positive for white
+# and negative for black, and squares are `rank * 16 + file`.
+EMPTY = 0
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(1, 7)
+WHITE = 1
+BLACK = -1
+
+START_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+
+PIECE_CODES = {
+    'p': PAWN,
+    'n': KNIGHT,
+    'b': BISHOP,
+    'r': ROOK,
+    'q': QUEEN,
+    'k': KING,
+}
+CODE_PIECES = {v: k for k, v in PIECE_CODES.items()}
+
+PIECE_VALUES = {
+    PAWN: 100,
+    KNIGHT: 320,
+    BISHOP: 330,
+    ROOK: 500,
+    QUEEN: 900,
+    KING: 20000,
+}
+
+SQUARES = [rank * 16 + file for rank in range(8) for file in range(8)]
+
+KNIGHT_OFFSETS = (33, 31, 18, 14, -14, -18, -31, -33)
+BISHOP_OFFSETS = (17, 15, -15, -17)
+ROOK_OFFSETS = (16, 1, -1, -16)
+KING_OFFSETS = BISHOP_OFFSETS + ROOK_OFFSETS
+PROMOTIONS = (QUEEN, ROOK, BISHOP, KNIGHT)
+
+WHITE_KING_SIDE = 1
+WHITE_QUEEN_SIDE = 2
+BLACK_KING_SIDE = 4
+BLACK_QUEEN_SIDE = 8
+CASTLING_CODES = {
+    'K': WHITE_KING_SIDE,
+    'Q': WHITE_QUEEN_SIDE,
+    'k': BLACK_KING_SIDE,
+    'q': BLACK_QUEEN_SIDE,
+}
+
+# Castling rights that survive a move from or to a given square
+CASTLING_KEEP = [15] * 128
+CASTLING_KEEP[0x04] = 15 & ~(WHITE_KING_SIDE | WHITE_QUEEN_SIDE)
+CASTLING_KEEP[0x07] = 15 & ~WHITE_KING_SIDE
+CASTLING_KEEP[0x00] = 15 & ~WHITE_QUEEN_SIDE
+CASTLING_KEEP[0x74] = 15 & ~(BLACK_KING_SIDE | BLACK_QUEEN_SIDE)
+CASTLING_KEEP[0x77] = 15 & ~BLACK_KING_SIDE
+CASTLING_KEEP[0x70] = 15 & ~BLACK_QUEEN_SIDE
+
+
+# Piece square tables from white's point of view, rank 8 first
+_PST = {
+    PAWN: (
+        0, 0, 0, 0, 0, 0, 0, 0,
+        50, 50, 50, 50, 50, 50, 50, 50,
+        10, 10, 20, 30, 30, 20, 10, 10,
+        5, 5, 10, 25, 25, 10, 5, 5,
+        0, 0, 0, 20, 20, 0, 0, 0,
+        5, -5, -10, 0, 0, -10, -5, 5,
+        5, 10, 10, -20, -20, 10, 10, 5,
+        0, 0, 0, 0, 0, 0, 0, 0,
+    ),
+    KNIGHT: (
+        -50, -40, -30, -30, -30, -30, -40, -50,
+        -40, -20, 0, 0, 0, 0, -20, -40,
+        -30, 0, 10, 15, 15, 10, 0, -30,
+        -30, 5, 15, 20, 20, 15, 5, -30,
+        -30, 0, 15, 20, 20, 15, 0, -30,
+        -30, 5, 10, 15, 15, 10, 5, -30,
+        -40, -20, 0, 5, 5, 0, -20, -40,
+        -50, -40, -30, -30, -30, -30, -40, -50,
+    ),
+    BISHOP: (
+        -20, -10, -10, -10, -10, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 10, 10, 5, 0, -10,
+        -10, 5, 5, 10, 10, 5, 5, -10,
+        -10, 0, 10, 10, 10, 10, 0, -10,
+        -10, 10, 10, 10, 10, 10, 10, -10,
+        -10, 5, 0, 0, 0, 0, 5, -10,
+        -20, -10, -10, -10, -10, -10, -10, -20,
+    ),
+    ROOK: (
+        0, 0, 0, 0, 0, 0, 0, 0,
+        5, 10, 10, 10, 10, 10, 10, 5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        0, 0, 0, 5, 5, 0, 0, 0,
+    ),
+    QUEEN: (
+        -20, -10, -10, -5, -5, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 5, 5, 5, 0, -10,
+        -5, 0, 5, 5, 5, 5, 0, -5,
+        0, 0, 5, 5, 5, 5, 0, -5,
+        -10, 5, 5, 5, 5, 5, 0, -10,
+        -10, 0, 5, 0, 0, 0, 0, -10,
+        -20, -10, -10, -5, -5, -10, -10, -20,
+    ),
+    KING: (
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -20, -30, -30, -40, -40, -30, -30, -20,
+        -10, -20, -20, -20, -20, -20, -20, -10,
+        20, 20, 0, 0, 0, 0, 20, 20,
+        20, 30, 10, 0, 0, 10, 30, 20,
+    ),
+}
+
+
+def _build_square_values():
+    # Material plus piece square value, from white's point of view, for
+    # every signed piece on every 0x88 square
+    values = {}
+    for kind, table in _PST.items():
+        material = PIECE_VALUES[kind] if kind != KING else 0
+        white = [0] * 128
+        black = [0] * 128
+        for sq in SQUARES:
+            rank, file = sq >> 4, sq & 7
+            white[sq] = material + table[(7 - rank) * 8 + file]
+            black[sq] = -(material + table[rank * 8 + file])
+        values[kind] = white
+        values[-kind] = black
+
+    return values
+
+
+def _build_zobrist_keys():
+    rng = random.Random(0x70C4E55)
+    pieces = {
+        piece: [rng.getrandbits(64) for _ in range(128)]
+        for kind in range(PAWN, KING + 1)
+        for piece in (kind, -kind)
+    }
+    castling = [rng.getrandbits(64) for _ in range(16)]
+    en_passant = [rng.getrandbits(64) for _ in range(8)]
+    black = rng.getrandbits(64)
+
+    return pieces, castling, en_passant, black
+
+
+SQUARE_VALUES = _build_square_values()
+(
+    ZOBRIST_PIECES,
+    ZOBRIST_CASTLING,
+    ZOBRIST_EN_PASSANT,
+    ZOBRIST_BLACK,
+) = _build_zobrist_keys()
+
+
+def square_name(sq):
+    return f'{"abcdefgh"[sq & 7]}{(sq >> 4) + 1}'
+
+
+def parse_square(name):
+    return (int(name[1]) - 1) * 16 + 'abcdefgh'.index(name[0])
+
+
+class Position:
+    def __init__(self, fen=START_FEN):
+        self._board = [EMPTY] * 128
+        self._kings = {WHITE: None, BLACK: None}
+        self._undo = []
+        self._set_fen(fen)
+
+    @property
+    def turn(self):
+        return self._turn
+
+    @property
+    def castling(self):
+        return self._castling
+
+    @property
+    def ep_square(self):
+        return self._ep
+
+    @property
+    def halfmove_clock(self):
+        return self._halfmove
+
+    @property
+    def fullmove_number(self):
+        return self._fullmove
+
+    @property
+    def hash(self):
+        return self._hash
+
+    @property
+    def score(self):
+        # Material and piece square value from white's point of view
+        return self._score
+
+    @property
+    def ply_count(self):
+        return len(self._undo)
+
+    def evaluate(self):
+        # Static evaluation from the point of view of the side to move
+        return self._score * self._turn
+
+    def piece_at(self, sq):
+        return self._board[sq]
+
+    def king_square(self, color):
+        return self._kings[color]
+
+    def copy(self):
+        position = Position.__new__(Position)
+        position._board = self._board[:]
+        position._kings = dict(self._kings)
+        position._undo = []
+        position._turn = self._turn
+        position._castling = self._castling
+        position._ep = self._ep
+        position._halfmove = self._halfmove
+        position._fullmove = self._fullmove
+        position._hash = self._hash
+        position._score = self._score
+        position._hashes = [self._hash]
+        return position
+
+    def fen(self):
+        rows = []
+        for rank in range(7, -1, -1):
+            row = ''
+            nb_empty = 0
+            for file in range(8):
+                piece = self._board[rank * 16 + file]
+                if piece == EMPTY:
+                    nb_empty += 1
+                    continue
+
+                if nb_empty:
+                    row += str(nb_empty)
+                    nb_empty = 0
+
+                code = CODE_PIECES[abs(piece)]
+                row += code.upper() if piece > 0 else code
+
+            if nb_empty:
+                row += str(nb_empty)
+            rows.append(row)
+
+        castling = ''.join(
+            code
+            for code, right in CASTLING_CODES.items()
+            if self._castling & right
+        ) or '-'
+        ep = square_name(self._ep) if self._ep is not None else '-'
+        turn = 'w' if self._turn == WHITE else 'b'
+
+        return (
+            f'{"/".join(rows)} {turn} {castling} {ep} '
+            f'{self._halfmove} {self._fullmove}'
+        )
+
+    def is_attacked(self, sq, by):
+        board = self._board
+
+        pawn = PAWN * by
+        for offset in ((-15, -17) if by == WHITE else (15, 17)):
+            s = sq + offset
+            if not s & 0x88 and board[s] == pawn:
+                return True
+
+        knight = KNIGHT * by
+        for offset in KNIGHT_OFFSETS:
+            s = sq + offset
+            if not s & 0x88 and board[s] == knight:
+                return True
+
+        king = KING * by
+        for offset in KING_OFFSETS:
+            s = sq + offset
+            if not s & 0x88 and board[s] == king:
+                return True
+
+        queen = QUEEN * by
+        for sliders, offsets in (
+                ((BISHOP * by, queen), BISHOP_OFFSETS),
+                ((ROOK * by, queen), ROOK_OFFSETS),
+        ):
+            for offset in offsets:
+                s = sq + offset
+                while not s & 0x88:
+                    piece = board[s]
+                    if piece != EMPTY:
+                        if piece in sliders:
+                            return True
+                        break
+                    s += offset
+
+        return False
+
+    def in_check(self):
+        return self.is_attacked(self._kings[self._turn], -self._turn)
+
+    def left_king_in_check(self):
+        # To be called right after make_move, tells if the move that was
+        # just made was illegal
+        mover = -self._turn
+        return self.is_attacked(self._kings[mover], self._turn)
+
+    def is_capture(self, move):
+        src, dst, _ = move
+        if self._board[dst] != EMPTY:
+            return True
+
+        return dst == self._ep and abs(self._board[src]) == PAWN
+
+    def generate_moves(self, captures_only=False):
+        moves = []
+        add = moves.append
+        board = self._board
+        stm = self._turn
+        ep = self._ep
+
+        for src in SQUARES:
+            piece = board[src]
+            if piece * stm <= 0:
+                continue
+
+            kind = piece * stm
+            if kind == PAWN:
+                forward = 16 * stm
+                dst = src + forward
+                is_promotion = (dst >> 4) in (0, 7)
+                if board[dst] == EMPTY:
+                    if is_promotion:
+                        for promotion in PROMOTIONS:
+                            add((src, dst, promotion))
+                    elif not captures_only:
+                        add((src, dst, 0))
+                        start_rank = 1 if stm == WHITE else 6
+                        double = dst + forward
+                        if src >> 4 == start_rank and board[double] == EMPTY:
+                            add((src, double, 0))
+
+                for dst in (src + forward - 1, src + forward + 1):
+                    if dst & 0x88:
+                        continue
+                    if board[dst] * stm < 0 or dst == ep:
+                        if is_promotion:
+                            for promotion in PROMOTIONS:
+                                add((src, dst, promotion))
+                        else:
+                            add((src, dst, 0))
+
+            elif kind == KNIGHT or kind == KING:
+                offsets = KNIGHT_OFFSETS if kind == KNIGHT else KING_OFFSETS
+                for offset in offsets:
+                    dst = src + offset
+                    if dst & 0x88:
+                        continue
+                    target = board[dst]
+                    if target * stm > 0:
+                        continue
+                    if captures_only and target == EMPTY:
+                        continue
+                    add((src, dst, 0))
+
+            else:
+                if kind == BISHOP:
+                    offsets = BISHOP_OFFSETS
+                elif kind == ROOK:
+                    offsets = ROOK_OFFSETS
+                else:
+                    offsets = KING_OFFSETS
+
+                for offset in offsets:
+                    dst = src + offset
+                    while not dst & 0x88:
+                        target = board[dst]
+                        if target == EMPTY:
+                            if not captures_only:
+                                add((src, dst, 0))
+                        else:
+                            if target * stm < 0:
+                                add((src, dst, 0))
+                            break
+                        dst += offset
+
+        if not captures_only and self._castling:
+            self._generate_castling(add)
+
+        return moves
+
+    def legal_moves(self):
+        legal = []
+        for move in self.generate_moves():
+            self.make_move(move)
+            if not self.left_king_in_check():
+                legal.append(move)
+            self.unmake_move()
+
+        return legal
+
+    def is_checkmate(self):
+        return self.in_check() and not self.legal_moves()
+
+    def is_stalemate(self):
+        return not self.in_check() and not self.legal_moves()
+
+    def is_repetition(self):
+        # Only positions since the last irreversible move, with the same
+        # side to move, can repeat the current one
+        hashes = self._hashes
+        last = len(hashes) - 1
+        first = max(last - self._halfmove, 0)
+        for index in range(last - 2, first - 1, -2):
+            if hashes[index] == self._hash:
+                return True
+
+        return False
+
+    def make_move(self, move):
+        src, dst, promotion = move
+        board = self._board
+        stm = self._turn
+        piece = board[src]
+        captured = board[dst]
+        kind = piece * stm
+
+        self._undo.append(
+            (
+                move,
+                piece,
+                captured,
+                self._castling,
+                self._ep,
+                self._halfmove,
+                self._hash,
+                self._score,
+            )
+        )
+
+        h = self._hash ^ ZOBRIST_PIECES[piece][src]
+        score = self._score - SQUARE_VALUES[piece][src]
+        board[src] = EMPTY
+
+        if captured != EMPTY:
+            h ^= ZOBRIST_PIECES[captured][dst]
+            score -= SQUARE_VALUES[captured][dst]
+
+        if kind == PAWN:
+            if dst == self._ep:
+                captured_sq = dst - 16 * stm
+                captured_pawn = board[captured_sq]
+                board[captured_sq] = EMPTY
+                h ^= ZOBRIST_PIECES[captured_pawn][captured_sq]
+                score -= SQUARE_VALUES[captured_pawn][captured_sq]
+            if promotion:
+                piece = promotion * stm
+        elif kind == KING:
+            self._kings[stm] = dst
+            if dst - src == 2 or src - dst == 2:
+                rook_src, rook_dst = (
+                    (src + 3, src + 1) if dst > src else (src - 4, src - 1)
+                )
+                rook = board[rook_src]
+                board[rook_src] = EMPTY
+                board[rook_dst] = rook
+                h ^= ZOBRIST_PIECES[rook][rook_src]
+                h ^= ZOBRIST_PIECES[rook][rook_dst]
+                score += SQUARE_VALUES[rook][rook_dst]
+                score -= SQUARE_VALUES[rook][rook_src]
+
+        board[dst] = piece
+        h ^= ZOBRIST_PIECES[piece][dst]
+        score += SQUARE_VALUES[piece][dst]
+
+        castling = self._castling & CASTLING_KEEP[src] & CASTLING_KEEP[dst]
+        h ^= ZOBRIST_CASTLING[self._castling] ^ ZOBRIST_CASTLING[castling]
+        self._castling = castling
+
+        if self._ep is not None:
+            h ^= ZOBRIST_EN_PASSANT[self._ep & 7]
+        self._ep = None
+        if kind == PAWN and (dst - src == 32 or src - dst == 32):
+            self._ep = src + 16 * stm
+            h ^= ZOBRIST_EN_PASSANT[self._ep & 7]
+
+        if kind == PAWN or captured != EMPTY:
+            self._halfmove = 0
+        else:
+            self._halfmove += 1
+
+        if stm == BLACK:
+            self._fullmove += 1
+
+        self._turn = -stm
+        self._hash = h ^ ZOBRIST_BLACK
+        self._score = score
+        self._hashes.append(self._hash)
+
+    def unmake_move(self):
+        (
+            move,
+            piece,
+            captured,
+            self._castling,
+            self._ep,
+            self._halfmove,
+            self._hash,
+            self._score,
+        ) = self._undo.pop()
+        self._hashes.pop()
+
+        src, dst, _ = move
+        board = self._board
+        stm = -self._turn
+        self._turn = stm
+        if stm == BLACK:
+            self._fullmove -= 1
+
+        board[src] = piece
+        board[dst] = captured
+
+        kind = piece * stm
+        if kind == PAWN and dst == self._ep:
+            board[dst - 16 * stm] = -PAWN * stm
+        elif kind == KING:
+            self._kings[stm] = src
+            if dst - src == 2 or src - dst == 2:
+                rook_src, rook_dst = (
+                    (src + 3, src + 1) if dst > src else (src - 4, src - 1)
+                )
+                board[rook_src] = board[rook_dst]
+                board[rook_dst] = EMPTY
+
+    def move_to_uci(self, move):
+        src, dst, promotion = move
+        uci = f'{square_name(src)}{square_name(dst)}'
+        if promotion:
+            uci = f'{uci}{CODE_PIECES[promotion]}'
+
+        return uci
+
+    def parse_uci(self, uci):
+        src = parse_square(uci[:2])
+        dst = parse_square(uci[2:4])
+
+        # Promotions without a piece are taken as queen promotions
+        promotion = PIECE_CODES[uci[4]] if len(uci) > 4 else QUEEN
+
+        for move in self.legal_moves():
+            if move[0] != src or move[1] != dst:
+                continue
+            if move[2] and move[2] != promotion:
+                continue
+            return move
+
+        error_msg = f'Illegal move {uci} in position {self.fen()}'
+        raise ValueError(error_msg)
+
+    def move_to_san(self, move):
+        src, dst, promotion = move
+        piece = self._board[src]
+        kind = abs(piece)
+
+        if kind == KING and abs(dst - src) == 2:
+            san = 'O-O' if dst > src else 'O-O-O'
+        elif kind == PAWN:
+            san = square_name(dst)
+            if self.is_capture(move):
+                san = f'{square_name(src)[0]}x{san}'
+            if promotion:
+                san = f'{san}={CODE_PIECES[promotion].upper()}'
+        else:
+            others = [
+                m[0]
+                for m in self.legal_moves()
+                if m[1] == dst and m[0] != src and self._board[m[0]] == piece
+            ]
+            disambiguation = ''
+            if others:
+                src_name = square_name(src)
+                if all((o & 7) != (src & 7) for o in others):
+                    disambiguation = src_name[0]
+                elif all((o >> 4) != (src >> 4) for o in others):
+                    disambiguation = src_name[1]
+                else:
+                    disambiguation = src_name
+
+            capture = 'x' if self.is_capture(move) else ''
+            san = (
+                f'{CODE_PIECES[kind].upper()}{disambiguation}'
+                f'{capture}{square_name(dst)}'
+            )
+
+        self.make_move(move)
+        if self.in_check():
+            san += '+' if self.legal_moves() else '#'
+        self.unmake_move()
+
+        return san
+
+    def push_uci(self, uci):
+        move = self.parse_uci(uci)
+        self.make_move(move)
+        return move
+
+    def _generate_castling(self, add):
+        board = self._board
+        stm = self._turn
+        if stm == WHITE:
+            king_side, queen_side = WHITE_KING_SIDE, WHITE_QUEEN_SIDE
+            base = 0
+        else:
+            king_side, queen_side = BLACK_KING_SIDE, BLACK_QUEEN_SIDE
+            base = 112
+
+        king_sq = base + 4
+        if board[king_sq] != KING * stm:
+            return
+
+        enemy = -stm
+        rook = ROOK * stm
+        if (
+                self._castling & king_side and
+                board[base + 7] == rook and
+                board[base + 5] == EMPTY and
+                board[base + 6] == EMPTY and
+                not self.is_attacked(king_sq, enemy) and
+                not self.is_attacked(base + 5, enemy)
+        ):
+            add((king_sq, base + 6, 0))
+
+        if (
+                self._castling & queen_side and
+                board[base] == rook and
+                board[base + 1] == EMPTY and
+                board[base + 2] == EMPTY and
+                board[base + 3] == EMPTY and
+                not self.is_attacked(king_sq, enemy) and
+                not self.is_attacked(base + 3, enemy)
+        ):
+            add((king_sq, base + 2, 0))
+
+    def _set_fen(self, fen):
+        fields = fen.split()
+        if len(fields) < 4:
+            error_msg = f'Malformed FEN {fen}, expected at least 4 fields'
+            raise ValueError(error_msg)
+
+        placement, turn, castling, ep = fields[:4]
+        self._halfmove = int(fields[4]) if len(fields) > 4 else 0
+        self._fullmove = int(fields[5]) if len(fields) > 5 else 1
+
+        rows = placement.split('/')
+        if len(rows) != 8:
+            error_msg = f'Malformed FEN {fen}, expected 8 ranks'
+            raise ValueError(error_msg)
+
+        for row_index, row in enumerate(rows):
+            rank = 7 - row_index
+            file = 0
+            for char in row:
+                if char.isdigit():
+                    file += int(char)
+                    continue
+
+                kind = PIECE_CODES.get(char.lower())
+                if kind is None or file > 7:
+                    error_msg = f'Malformed FEN {fen}, bad rank {row}'
+                    raise ValueError(error_msg)
+
+                color = WHITE if char.isupper() else BLACK
+                sq = rank * 16 + file
+                self._board[sq] = kind * color
+                if kind == KING:
+                    self._kings[color] = sq
+                file += 1
+
+            if file != 8:
+                error_msg = f'Malformed FEN {fen}, bad rank {row}'
+                raise ValueError(error_msg)
+
+        if None in self._kings.values():
+            error_msg = f'FEN {fen} needs exactly one king per side'
+            raise ValueError(error_msg)
+
+        if turn not in ('w', 'b'):
+            error_msg = f'Malformed FEN {fen}, bad side to move {turn}'
+            raise ValueError(error_msg)
+        self._turn = WHITE if turn == 'w' else BLACK
+
+        self._castling = 0
+        if castling != '-':
+            for char in castling:
+                if char not in CASTLING_CODES:
+                    error_msg = f'Malformed FEN {fen}, bad castling {castling}'
+                    raise ValueError(error_msg)
+                self._castling |= CASTLING_CODES[char]
+
+        self._ep = parse_square(ep) if ep != '-' else None
+
+        self._hash = self._compute_hash()
+        self._score = sum(
+            SQUARE_VALUES[self._board[sq]][sq]
+            for sq in SQUARES
+            if self._board[sq] != EMPTY
+        )
+        self._hashes = [self._hash]
+
+    def _compute_hash(self):
+        h = 0
+        for sq in SQUARES:
+            piece = self._board[sq]
+            if piece != EMPTY:
+                h ^= ZOBRIST_PIECES[piece][sq]
+
+        h ^= ZOBRIST_CASTLING[self._castling]
+        if self._ep is not None:
+            h ^= ZOBRIST_EN_PASSANT[self._ep & 7]
+        if self._turn == BLACK:
+            h ^= ZOBRIST_BLACK
+
+        return h
@@ -0,0 +1,390 @@
+import collections
+import concurrent.futures
+import csv
+import itertools
+import json
+import os
+import shlex
+import time
+
+
+from .. import constant as c
+from . import attacker
+from .engineer import Engine
+from .gamer import Game
+from .positioner import Position
+from .solver import MateSolver
+
+
+EPD = collections.namedtuple(
+    'EPD',
+    [
+        'fen',
+        'operations',
+    ],
+)
+
+
+# status is 'ok', 'failed' when a check did not pass, 'invalid' when the
+# position could not be set up or 'error' when a check broke down, the
+# reason is given by error
+EPD_RESULT = collections.namedtuple(
+    'EPD_RESULT',
+    [
+        'index',
+        'id',
+        'fen',
+        'status',
+        'nb_legal_moves',
+        'mate_move',
+        'engine_move',
+        'expected',
+        'error',
+        'time_ms',
+    ],
+)
+
+
+ENGINE_SETTINGS = collections.namedtuple(
+    'ENGINE_SETTINGS',
+    [
+        'engine_type',
+        'engine_params',
+        'depth',
+        'movetime',
+        'nodes',
+    ],
+)
+
+
+# Per process state of the workers, the engine is only started when a
+# line asks for it
+_WORKER = {}
+
+
+def parse_epd(line):
+    """
+    Returns the EPD of a line holding an EPD record or a FEN. The half move
+    clock and move number are taken from the hmvc and fmvn operations when
+    the line has none.
+    """
+    fields = line.split(maxsplit=4)
+    if len(fields) < 4:
+        error_msg = f'Malformed EPD {line!r}, expected at least 4 fields'
+        raise ValueError(error_msg)
+
+    rest = fields[4] if len(fields) > 4 else ''
+    clocks = rest.split(maxsplit=2)
+    if len(clocks) >= 2 and clocks[0].isdigit() and clocks[1].isdigit():
+        fen = ' '.join(fields[:4] + clocks[:2])
+        rest = clocks[2] if len(clocks) > 2 else ''
+        return EPD(fen=fen, operations=_parse_operations(rest))
+
+    operations = _parse_operations(rest)
+    halfmove_clock = _number_operation(operations, 'hmvc', 0)
+    move_no = _number_operation(operations, 'fmvn', 1)
+    fen = ' '.join(fields[:4] + [str(halfmove_clock), str(move_no)])
+
+    return EPD(fen=fen, operations=operations)
+
+
+def _parse_operations(text):
+    operations = {}
+    for operation in text.split(';'):
+        tokens = shlex.split(operation)
+        if tokens:
+            operations[tokens[0]] = tokens[1:]
+
+    return operations
+
+
+def _number_operation(operations, name, default=None):
+    if name not in operations:
+        return default
+
+    values = operations[name]
+    if len(values) != 1 or not values[0].isdigit():
+        error_msg = f'Expected a number for the {name} operation, got {values}'
+        raise ValueError(error_msg)
+
+    return int(values[0])
+
+
+class PuzzleChecker:
+    """
+    Checks EPD records (or FENs) in worker processes. Every position is set
+    up on a Game, which refuses malformed and illegal positions, then:
+
+        legal   counts the legal moves
+        mate    proves a mate in `dm` moves with a MateSolver (or in
+                mate_depth moves when the record has no dm operation)
+        bm      lets the engine search and compares its move with the bm
+                and am operations
+
+    Lines are sent to the workers in chunks, with a bounded number of chunks
+    in flight so that large files are streamed.
+    """
+    LEGAL = 'legal'
+    MATE = 'mate'
+    BEST_MOVE = 'bm'
+    CHECKS = (LEGAL, MATE, BEST_MOVE)
+
+    DEFAULT_CHUNK_SIZE = 64
+    OUTPUT_FORMATS = ('.csv', '.jsonl')
+
+    def __init__(
+            self,
+            checks=CHECKS,
+            nb_workers=None,
+            mate_depth=None,
+            engine_type=c.EngineType.stockfish,
+            engine_params=None,
+            depth=None,
+            movetime=None,
+            nodes=None,
+            chunk_size=DEFAULT_CHUNK_SIZE,
+    ):
+        unknown_checks = set(checks) - set(self.CHECKS)
+        if unknown_checks:
+            error_msg = (
+                f'Unknown checks {sorted(unknown_checks)}, expected some '
+                f'of {list(self.CHECKS)}'
+            )
+            raise ValueError(error_msg)
+
+        self._checks = tuple(checks)
+        self._nb_workers = nb_workers or os.cpu_count() or 1
+        self._mate_depth = mate_depth
+        self._engine_settings = ENGINE_SETTINGS(
+            engine_type=engine_type,
+            engine_params=engine_params,
+            depth=depth,
+            movetime=movetime,
+            nodes=nodes,
+        )
+        self._chunk_size = chunk_size
+
+    @property
+    def checks(self):
+        return self._checks
+
+    @property
+    def nb_workers(self):
+        return self._nb_workers
+
+    def process(self, lines):
+        """
+        Yields an EPD_RESULT for every non blank line, in the order they
+        finish. Lines starting with # are skipped.
+        """
+        numbered = (
+            (index, line.strip())
+            for index, line in enumerate(lines)
+            if line.strip() and not line.lstrip().startswith('#')
+        )
+        chunks = iter(
+            lambda: list(itertools.islice(numbered, self._chunk_size)),
+            [],
+        )
+
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=self._nb_workers,
+                initializer=_init_worker,
+                initargs=(
+                    self._checks,
+                    self._mate_depth,
+                    self._engine_settings,
+                ),
+        ) as executor:
+            pending = set()
+            for chunk in chunks:
+                pending.add(executor.submit(_check_lines, chunk))
+                if len(pending) < 2 * self._nb_workers:
+                    continue
+
+                done, pending = concurrent.futures.wait(
+                    pending,
+                    return_when=concurrent.futures.FIRST_COMPLETED,
+                )
+                for future in done:
+                    yield from future.result()
+
+            for future in concurrent.futures.as_completed(pending):
+                yield from future.result()
+
+    def run(self, epd_path, output_path):
+        """
+        Checks the lines of epd_path and writes the results to output_path
+        as they come, in CSV or JSON lines depending on its extension.
+        Returns the number of results per status.
+        """
+        extension = os.path.splitext(output_path)[1].lower()
+        if extension not in self.OUTPUT_FORMATS:
+            error_msg = (
+                f'Unsupported output {output_path}, expected one of '
+                f'{list(self.OUTPUT_FORMATS)}'
+            )
+            raise ValueError(error_msg)
+
+        statuses = collections.Counter()
+        with open(epd_path) as epd_fp, open(output_path, 'w') as fp:
+            if extension == '.csv':
+                writer = csv.writer(fp)
+                writer.writerow(EPD_RESULT._fields)
+                write = writer.writerow
+            else:
+                def write(result):
+                    fp.write(json.dumps(result._asdict()))
+                    fp.write('\n')
+
+            for result in self.process(epd_fp):
+                write(result)
+                statuses[result.status] += 1
+
+        return statuses
+
+
+def _init_worker(checks, mate_depth, engine_settings):
+    _WORKER.clear()
+    _WORKER.update(
+        checks=checks,
+        mate_depth=mate_depth,
+        engine_settings=engine_settings,
+        engine=None,
+        game=Game(),
+        solver=MateSolver(),
+    )
+
+
+def _get_engine():
+    if _WORKER['engine'] is None:
+        settings = _WORKER['engine_settings']
+        _WORKER['engine'] = Engine(
+            engine_type=settings.engine_type,
+            engine_params=settings.engine_params,
+            depth=settings.depth,
+            movetime=settings.movetime,
+            nodes=settings.nodes,
+        )
+
+    return _WORKER['engine']
+
+
+def _check_lines(chunk):
+    return [_check_line(index, line) for index, line in chunk]
+
+
+def _check_line(index, line):
+    start = time.perf_counter()
+    result = dict(
+        index=index,
+        id=None,
+        fen=line,
+        status='ok',
+        nb_legal_moves=None,
+        mate_move=None,
+        engine_move=None,
+        expected=None,
+        error=None,
+    )
+
+    try:
+        epd = parse_epd(line)
+        result['fen'] = epd.fen
+        result['id'] = ' '.join(epd.operations.get('id', [])) or None
+        position = _set_up(epd.fen)
+        _run_checks(epd, position, result)
+    except ValueError as e:
+        result['status'] = 'invalid'
+        result['error'] = str(e)
+    except Exception as e:
+        # A broken engine or bug must not stop the rest of the file
+        result['status'] = 'error'
+        result['error'] = f'{type(e).__name__}: {e}'
+
+    result['time_ms'] = round((time.perf_counter() - start) * 1000, 3)
+    return EPD_RESULT(**result)
+
+
+def _set_up(fen):
+    game = _WORKER['game']
+    with game.block_signals():
+        game.set_fen(fen)
+
+    board = game.board
+    for pawn in itertools.chain(
+            board.get_pieces(c.Color.white, c.PieceType.pawn),
+            board.get_pieces(c.Color.black, c.PieceType.pawn),
+    ):
+        if board.reverse[pawn].y in (0, 7):
+            error_msg = f'Pawn on the first or last rank in {fen}'
+            raise ValueError(error_msg)
+
+    # The side that just moved cannot have left its king in check
+    waiting = c.Color.black if fen.split()[1] == 'w' else c.Color.white
+    if attacker.checkers(board, waiting):
+        error_msg = f'The side not to move is in check in {fen}'
+        raise ValueError(error_msg)
+
+    return Position(fen)
+
+
+def _run_checks(epd, position, result):
+    checks = _WORKER['checks']
+    legal_moves = position.legal_moves()
+    if PuzzleChecker.LEGAL in checks:
+        result['nb_legal_moves'] = len(legal_moves)
+
+    errors = []
+    operations = epd.operations
+    mate_depth = _number_operation(operations, 'dm', _WORKER['mate_depth'])
+    if PuzzleChecker.MATE in checks and mate_depth is not None:
+        # The table is dropped with every line to bound the memory of the
+        # workers on large files
+        solver = _WORKER['solver']
+        mate = solver.solve(epd.fen, mate_depth)
+        solver.clear()
+        if mate.mate_in is None:
+            errors.append(f'no mate in {mate_depth}')
+        else:
+            result['mate_move'] = mate.pv[0]
+
+    if PuzzleChecker.BEST_MOVE in checks and (
+            'bm' in operations or 'am' in operations
+    ):
+        san_moves = {
+            position.move_to_san(move).rstrip('+#'): position.move_to_uci(
+                move,
+            )
+            for move in legal_moves
+        }
+        best_moves = _to_uci(operations.get('bm', []), san_moves)
+        avoid_moves = _to_uci(operations.get('am', []), san_moves)
+        result['expected'] = ' '.join(best_moves) or None
+
+        engine_move = _get_engine().get_best_move(fen=epd.fen)
+        result['engine_move'] = engine_move
+        if best_moves and engine_move not in best_moves:
+            errors.append(f'engine played {engine_move}')
+        if engine_move in avoid_moves:
+            errors.append(f'engine played the avoided {engine_move}')
+
+    if errors:
+        result['status'] = 'failed'
+        result['error'] = ', '.join(errors)
+
+
+def _to_uci(moves, san_moves):
+    # EPD moves are in SAN, with optional annotations
+    uci_moves = []
+    for move in moves:
+        san = move.rstrip('+#!?')
+        if san in san_moves:
+            uci_moves.append(san_moves[san])
+        elif move in san_moves.values():
+            uci_moves.append(move)
+        else:
+            error_msg = f'Illegal move {move} in the EPD operations'
+            raise ValueError(error_msg)
+
+    return uci_moves
@@ -0,0 +1,380 @@
+import collections
+import time
+
+
+from .positioner import PIECE_VALUES, PAWN
+
+
+SEARCH_INFO = collections.namedtuple(
+    'SEARCH_INFO',
+    [
+        'best_move',
+        'score',
+        'mate',
+        'depth',
+        'pv',
+        'nodes',
+        'nps',
+        'time',
+    ],
+)
+
+
+TT_EXACT = 0
+TT_LOWER = 1
+TT_UPPER = 2
+
+
+class _SearchAborted(Exception):
+    pass
+
+
+class Searcher:
+    MATE_SCORE = 100000
+    INFINITY = 1000000
+    MAX_PLY = 128
+    MAX_DEPTH = 64
+    DEFAULT_TT_SIZE = 1 << 20
+
+    # The budget (time, nodes, stop request) is checked every so many nodes
+    CHECK_EVERY = 1024
+
+    def __init__(self, tt_size=None):
+        self._tt = {}
+        self._tt_size = tt_size or self.DEFAULT_TT_SIZE
+        self._stop_requested = False
+        self._init_search_params()
+
+    @property
+    def tt_size(self):
+        return self._tt_size
+
+    @tt_size.setter
+    def tt_size(self, val):
+        self._tt_size = val
+
+    def clear(self):
+        self._tt.clear()
+
+    def stop(self):
+        self._stop_requested = True
+
+    def search(
+            self,
+            position,
+            depth=None,
+            movetime=None,
+            nodes=None,
+            moves=None,
+    ):
+        """
+        Iterative deepening alpha-beta from the given position, bounded by
+        depth, movetime (in milliseconds) and/or number of nodes. When moves
+        are given only those are searched at the root. The position is left
+        untouched.
+        """
+        self._init_search_params(movetime=movetime, nodes=nodes)
+        self._root_moves = set(moves) if moves else None
+        max_depth = min(depth or self.MAX_DEPTH, self.MAX_DEPTH)
+        base_ply = position.ply_count
+
+        best_move = None
+        best_score = 0
+        completed_depth = 0
+        pv = []
+
+        legal_moves = position.legal_moves()
+        if self._root_moves is not None:
+            legal_moves = [m for m in legal_moves if m in self._root_moves]
+        if not legal_moves:
+            score = -self.MATE_SCORE if position.in_check() else 0
+            return self._search_info(
+                position=position,
+                best_move=None,
+                score=score,
+                depth=0,
+                pv=[],
+            )
+
+        for current_depth in range(1, max_depth + 1):
+            try:
+                score = self._negamax(
+                    position,
+                    current_depth,
+                    -self.INFINITY,
+                    self.INFINITY,
+                    0,
+                )
+            except _SearchAborted:
+                while position.ply_count > base_ply:
+                    position.unmake_move()
+                break
+
+            completed_depth = current_depth
+            best_score = score
+            best_move = self._root_best_move
+            pv = self._extract_pv(position, best_move, current_depth)
+
+            if abs(score) >= self.MATE_SCORE - self.MAX_PLY:
+                break
+
+        if best_move is None:
+            # Not even the first iteration finished within the budget
+            best_move = self._root_best_move or legal_moves[0]
+            pv = [best_move]
+
+        return self._search_info(
+            position=position,
+            best_move=best_move,
+            score=best_score,
+            depth=completed_depth,
+            pv=pv,
+        )
+
+    def _init_search_params(self, movetime=None, nodes=None):
+        self._stop_requested = False
+        self._nodes = 0
+        self._start_time = time.perf_counter()
+        self._deadline = None
+        if movetime is not None:
+            self._deadline = self._start_time + (movetime / 1000)
+        self._node_limit = nodes
+        self._killers = [[None, None] for _ in range(self.MAX_PLY + 1)]
+        self._history = {}
+        self._root_best_move = None
+        self._root_moves = None
+
+    def _check_budget(self):
+        aborted = (
+            self._stop_requested or
+            (
+                self._deadline is not None and
+                time.perf_counter() >= self._deadline
+            ) or
+            (
+                self._node_limit is not None and
+                self._nodes >= self._node_limit
+            )
+        )
+        if aborted:
+            raise _SearchAborted()
+
+    def _negamax(self, position, depth, alpha, beta, ply):
+        self._nodes += 1
+        if self._nodes % self.CHECK_EVERY == 0:
+            self._check_budget()
+
+        is_draw = (
+            position.halfmove_clock >= 100 or
+            position.is_repetition()
+        )
+        if ply and is_draw:
+            return 0
+
+        in_check = position.in_check()
+        if in_check:
+            depth += 1
+
+        if depth <= 0 or ply >= self.MAX_PLY:
+            return self._quiesce(position, alpha, beta, ply)
+
+        key = position.hash
+        tt_move = None
+        entry = self._tt.get(key)
+        if entry is not None:
+            tt_depth, tt_score, tt_flag, tt_move = entry
+            if ply and tt_depth >= depth:
+                tt_score = self._score_from_tt(tt_score, ply)
+                if tt_flag == TT_EXACT:
+                    return tt_score
+                elif tt_flag == TT_LOWER and tt_score >= beta:
+                    return tt_score
+                elif tt_flag == TT_UPPER and tt_score <= alpha:
+                    return tt_score
+
+        original_alpha = alpha
+        best_score = -self.INFINITY
+        best_move = None
+        nb_legal = 0
+        for move in self._ordered_moves(position, tt_move, ply):
+            is_capture = position.is_capture(move)
+            position.make_move(move)
+            if position.left_king_in_check():
+                position.unmake_move()
+                continue
+
+            nb_legal += 1
+            score = -self._negamax(position, depth - 1, -beta, -alpha, ply + 1)
+            position.unmake_move()
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if not ply:
+                    self._root_best_move = move
+
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        if not is_capture:
+                            self._store_killer(move, ply)
+                            self._history[move] = (
+                                self._history.get(move, 0) + depth * depth
+                            )
+                        break
+
+        if not nb_legal:
+            return -self.MATE_SCORE + ply if in_check else 0
+
+        if best_score <= original_alpha:
+            flag = TT_UPPER
+        elif best_score >= beta:
+            flag = TT_LOWER
+        else:
+            flag = TT_EXACT
+
+        if len(self._tt) >= self._tt_size:
+            self._tt.clear()
+        self._tt[key] = (
+            depth,
+            self._score_to_tt(best_score, ply),
+            flag,
+            best_move,
+        )
+
+        return best_score
+
+    def _quiesce(self, position, alpha, beta, ply):
+        self._nodes += 1
+        if self._nodes % self.CHECK_EVERY == 0:
+            self._check_budget()
+
+        stand_pat = position.evaluate()
+        if stand_pat >= beta or ply >= self.MAX_PLY:
+            return stand_pat
+
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+        moves = position.generate_moves(captures_only=True)
+        moves.sort(key=lambda m: self._mvv_lva(position, m), reverse=True)
+        for move in moves:
+            position.make_move(move)
+            if position.left_king_in_check():
+                position.unmake_move()
+                continue
+
+            score = -self._quiesce(position, -beta, -alpha, ply + 1)
+            position.unmake_move()
+
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+
+        return alpha
+
+    def _ordered_moves(self, position, tt_move, ply):
+        killers = self._killers[ply]
+        history = self._history
+
+        def _move_order(move):
+            if move == tt_move:
+                return 3000000
+            if position.is_capture(move) or move[2]:
+                return 2000000 + self._mvv_lva(position, move)
+            if move in killers:
+                return 1000000
+            return history.get(move, 0)
+
+        moves = position.generate_moves()
+        if not ply and self._root_moves is not None:
+            moves = [m for m in moves if m in self._root_moves]
+        moves.sort(key=_move_order, reverse=True)
+        return moves
+
+    @staticmethod
+    def _mvv_lva(position, move):
+        src, dst, promotion = move
+        victim = abs(position.piece_at(dst)) or PAWN
+        attacker = abs(position.piece_at(src))
+        score = PIECE_VALUES[victim] * 10 - PIECE_VALUES[attacker]
+        if promotion:
+            score += PIECE_VALUES[promotion]
+
+        return score
+
+    def _store_killer(self, move, ply):
+        killers = self._killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+
+    def _extract_pv(self, position, best_move, depth):
+        pv = []
+        move = best_move
+        seen = set()
+        while move is not None and len(pv) < depth:
+            if position.hash in seen or move not in position.legal_moves():
+                break
+
+            seen.add(position.hash)
+            pv.append(move)
+            position.make_move(move)
+            entry = self._tt.get(position.hash)
+            move = entry[3] if entry is not None else None
+
+        for _ in pv:
+            position.unmake_move()
+
+        return pv
+
+    def _score_to_tt(self, score, ply):
+        # Mate scores are stored relative to the node, not to the root
+        if score >= self.MATE_SCORE - self.MAX_PLY:
+            return score + ply
+        elif score <= -self.MATE_SCORE + self.MAX_PLY:
+            return score - ply
+        return score
+
+    def _score_from_tt(self, score, ply):
+        if score >= self.MATE_SCORE - self.MAX_PLY:
+            return score - ply
+        elif score <= -self.MATE_SCORE + self.MAX_PLY:
+            return score + ply
+        return score
+
+    def _search_info(self, position, best_move, score, depth, pv):
+        elapsed = time.perf_counter() - self._start_time
+        mate = None
+        if abs(score) >= self.MATE_SCORE - self.MAX_PLY:
+            mate_plies = self.MATE_SCORE - abs(score)
+            mate = (mate_plies + 1) // 2
+            mate = mate if score > 0 else -mate
+
+        return SEARCH_INFO(
+            best_move=(
+                position.move_to_uci(best_move)
+                if best_move is not None
+                else None
+            ),
+            score=score if mate is None else None,
+            mate=mate,
+            depth=depth,
+            pv=self._pv_to_uci(position, pv),
+            nodes=self._nodes,
+            nps=int(self._nodes / elapsed) if elapsed else 0,
+            time=int(elapsed * 1000),
+        )
+
+    @staticmethod
+    def _pv_to_uci(position, pv):
+        ucis = []
+        for move in pv:
+            ucis.append(position.move_to_uci(move))
+            position.make_move(move)
+
+        for _ in pv:
+            position.unmake_move()
+
+        return ucis
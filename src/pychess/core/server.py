@@ -0,0 +1,505 @@
+import asyncio
+import collections
+import concurrent.futures
+import itertools
+import logging
+import os
+import random
+import time
+
+
+from .. import constant as c
+from .annotator import PROMOTION_CODES
+from .gamer import Game
+from .positioner import Position
+
+
+PROMOTION_TYPES = {v: k for k, v in PROMOTION_CODES.items()}
+
+
+logger = logging.getLogger(__name__)
+
+
+BENCH_RESULT = collections.namedtuple(
+    'BENCH_RESULT',
+    [
+        'nb_moves',
+        'nb_refused',
+        'seconds',
+        'moves_per_second',
+        'p50_latency',
+        'p99_latency',
+    ],
+)
+
+
+# Games of a worker process, a game always goes to the same worker
+_GAMES = {}
+
+
+def _create_game(game_id):
+    _GAMES[game_id] = Game()
+
+
+def _drop_game(game_id):
+    _GAMES.pop(game_id, None)
+
+
+def _play_move(game_id, uci):
+    game = _GAMES[game_id]
+    if game.is_game_over:
+        return False, 'game over'
+
+    # Game refuses illegal moves by returning None, an error is a bug in
+    # the rules and not the fault of the client
+    promotion = PROMOTION_TYPES.get(uci[4:])
+    try:
+        is_valid = game.move((uci[:4], promotion))
+    except Exception:
+        logger.exception(f'Move {uci} failed in game {game_id}')
+        return False, 'internal error'
+
+    if not is_valid:
+        return False, 'illegal move'
+
+    return True, _game_result(game)
+
+
+def _game_result(game):
+    if not game.is_game_over:
+        return None
+    if game.winner is None:
+        return '1/2-1/2'
+    return '1-0' if game.winner == c.Color.white else '0-1'
+
+
+class Clock:
+    """
+    Remaining time of both players in milliseconds, the clock of the side
+    to move starts running with the first move.
+    """
+    def __init__(self, minutes, bonus):
+        self._remaining = {
+            c.Color.white: minutes * 60000,
+            c.Color.black: minutes * 60000,
+        }
+        self._bonus = bonus * 1000
+        self._turn = c.Color.white
+        self._turn_started = None
+
+    @property
+    def turn(self):
+        return self._turn
+
+    def remaining(self, color):
+        remaining = self._remaining[color]
+        if color == self._turn and self._turn_started is not None:
+            elapsed = (time.perf_counter() - self._turn_started) * 1000
+            remaining -= elapsed
+        return max(int(remaining), 0)
+
+    def flagged(self):
+        if self.remaining(self._turn) > 0:
+            return None
+        return self._turn
+
+    def press(self):
+        self._remaining[self._turn] = (
+            self.remaining(self._turn) + self._bonus
+        )
+        self._turn = (
+            c.Color.black
+            if self._turn == c.Color.white
+            else c.Color.white
+        )
+        self._turn_started = time.perf_counter()
+
+
+class _Session:
+    def __init__(self, game_id, executor, clock):
+        self.game_id = game_id
+        self.executor = executor
+        self.clock = clock
+        self.moves = []
+        self.result = None
+        self.subscribers = set()
+
+        # Moves of a game are applied one at a time, in arrival order
+        self.lock = asyncio.Lock()
+
+
+class _Connection:
+    def __init__(self, writer, max_pending):
+        self.writer = writer
+        self.outbox = asyncio.Queue(maxsize=max_pending)
+        self.games = set()
+        self.handler = None
+
+
+class GameServer:
+    """
+    Hosts many games behind an asyncio line protocol. Requests and their
+    replies are single lines of text:
+
+        new [minutes] [bonus]   -> ok <game_id>
+        move <game_id> <uci>    -> ok <game_id> <uci> [result]
+        subscribe <game_id>     -> ok <game_id>
+        unsubscribe <game_id>   -> ok <game_id>
+        clock <game_id>         -> clock <game_id> <white_ms> <black_ms> <turn>
+        result <game_id>        -> result <game_id> <result or *>
+        quit
+
+    Failures reply `error <message>`. Subscribers get
+    `event <game_id> move <uci> <white_ms> <black_ms>` after every move and
+    `event <game_id> result <result>` when the game ends.
+
+    Rules run in worker processes, a game lives in one of them for its
+    whole life. Each connection has a bounded outbox, a client that does
+    not read its replies stops being read from, and a subscriber that
+    falls too far behind is disconnected.
+    """
+    DEFAULT_HOST = '127.0.0.1'
+    DEFAULT_PORT = 8765
+    MAX_PENDING = 256
+
+    def __init__(
+            self,
+            host=DEFAULT_HOST,
+            port=DEFAULT_PORT,
+            nb_workers=None,
+            max_pending=MAX_PENDING,
+    ):
+        self._host = host
+        self._port = port
+        self._max_pending = max_pending
+        self._game_ids = itertools.count(1)
+        self._sessions = {}
+        self._connections = set()
+        self._server = None
+
+        # One process per executor, so that a game is always sent to the
+        # process holding it
+        nb_workers = nb_workers or os.cpu_count() or 1
+        self._executors = [
+            concurrent.futures.ProcessPoolExecutor(max_workers=1)
+            for _ in range(nb_workers)
+        ]
+
+        self._commands = {
+            'new': self._new,
+            'move': self._move,
+            'subscribe': self._subscribe,
+            'unsubscribe': self._unsubscribe,
+            'clock': self._clock,
+            'result': self._result,
+        }
+
+    @property
+    def port(self):
+        return self._port
+
+    @property
+    def nb_games(self):
+        return len(self._sessions)
+
+    async def start(self):
+        self._server = await asyncio.start_server(
+            self._handle_connection,
+            self._host,
+            self._port,
+        )
+        # Port 0 picks a free port
+        self._port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+        # Closed connections end their handlers, which are waited for so
+        # that none is left running
+        handlers = []
+        for connection in self._connections:
+            handlers.append(connection.handler)
+            connection.writer.close()
+        if handlers:
+            await asyncio.wait(handlers)
+
+        for executor in self._executors:
+            executor.shutdown()
+
+    async def _handle_connection(self, reader, writer):
+        connection = _Connection(writer, self._max_pending)
+        connection.handler = asyncio.current_task()
+        self._connections.add(connection)
+        sender = asyncio.ensure_future(self._send(connection))
+        try:
+            while not writer.is_closing():
+                line = await reader.readline()
+                if not line:
+                    break
+
+                tokens = line.decode().split()
+                if tokens == ['quit']:
+                    break
+
+                reply = await self._dispatch(connection, tokens)
+
+                # Waits when the client does not read its replies
+                await connection.outbox.put(reply)
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.discard(connection)
+            for game_id in connection.games:
+                session = self._sessions.get(game_id)
+                if session is not None:
+                    session.subscribers.discard(connection)
+            sender.cancel()
+            writer.close()
+
+    async def _send(self, connection):
+        writer = connection.writer
+        try:
+            while True:
+                line = await connection.outbox.get()
+                writer.write(f'{line}\n'.encode())
+                await writer.drain()
+        except ConnectionError:
+            writer.close()
+
+    async def _dispatch(self, connection, tokens):
+        if not tokens:
+            return 'error empty request'
+
+        command = self._commands.get(tokens[0])
+        if command is None:
+            return f'error unknown command {tokens[0]}'
+
+        try:
+            return await command(connection, *tokens[1:])
+        except (TypeError, ValueError):
+            return f'error malformed request {" ".join(tokens)}'
+        except KeyError as e:
+            return f'error unknown game {e.args[0]}'
+
+    async def _new(self, connection, minutes=None, bonus=None):
+        minutes = int(minutes or c.GAME.DEFAULT_PLAY_TIME)
+        bonus = int(bonus or c.GAME.DEFAULT_BONUS_TIME)
+
+        game_id = next(self._game_ids)
+        executor = self._executors[game_id % len(self._executors)]
+        session = _Session(game_id, executor, Clock(minutes, bonus))
+        await self._run(session, _create_game, game_id)
+        self._sessions[game_id] = session
+
+        return f'ok {game_id}'
+
+    async def _move(self, connection, game_id, uci):
+        session = self._get_session(game_id)
+        async with session.lock:
+            if session.result is None:
+                self._check_flag(session)
+            if session.result is not None:
+                return f'error game over {session.result}'
+
+            is_valid, info = await self._run(
+                session,
+                _play_move,
+                session.game_id,
+                uci,
+            )
+            if not is_valid:
+                return f'error {info}'
+
+            session.clock.press()
+            session.moves.append(uci)
+            clock = session.clock
+            self._publish(
+                session,
+                f'event {game_id} move {uci} '
+                f'{clock.remaining(c.Color.white)} '
+                f'{clock.remaining(c.Color.black)}',
+            )
+            if info is not None:
+                self._finish(session, info)
+
+        reply = f'ok {game_id} {uci}'
+        return reply if info is None else f'{reply} {info}'
+
+    async def _subscribe(self, connection, game_id):
+        session = self._get_session(game_id)
+        session.subscribers.add(connection)
+        connection.games.add(session.game_id)
+        return f'ok {game_id}'
+
+    async def _unsubscribe(self, connection, game_id):
+        session = self._get_session(game_id)
+        session.subscribers.discard(connection)
+        connection.games.discard(session.game_id)
+        return f'ok {game_id}'
+
+    async def _clock(self, connection, game_id):
+        session = self._get_session(game_id)
+        clock = session.clock
+        return (
+            f'clock {game_id} '
+            f'{clock.remaining(c.Color.white)} '
+            f'{clock.remaining(c.Color.black)} '
+            f'{clock.turn.name}'
+        )
+
+    async def _result(self, connection, game_id):
+        session = self._get_session(game_id)
+        if session.result is None:
+            self._check_flag(session)
+        return f'result {game_id} {session.result or "*"}'
+
+    def _get_session(self, game_id):
+        return self._sessions[int(game_id)]
+
+    def _check_flag(self, session):
+        flagged = session.clock.flagged()
+        if flagged is not None:
+            self._finish(
+                session,
+                '0-1' if flagged == c.Color.white else '1-0',
+            )
+
+    def _finish(self, session, result):
+        session.result = result
+        self._publish(session, f'event {session.game_id} result {result}')
+
+        # Finished games only keep their result here
+        session.executor.submit(_drop_game, session.game_id)
+
+    def _publish(self, session, line):
+        for connection in list(session.subscribers):
+            try:
+                connection.outbox.put_nowait(line)
+            except asyncio.QueueFull:
+                session.subscribers.discard(connection)
+                connection.writer.close()
+
+    async def _run(self, session, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(session.executor, func, *args)
+
+
+class GameClient:
+    """
+    Client of GameServer, events of subscribed games are put on the
+    events queue.
+    """
+    def __init__(self):
+        self._reader = None
+        self._writer = None
+        self._replies = collections.deque()
+        self._receiver = None
+        self.events = asyncio.Queue()
+
+    async def connect(
+            self,
+            host=GameServer.DEFAULT_HOST,
+            port=GameServer.DEFAULT_PORT,
+    ):
+        self._reader, self._writer = await asyncio.open_connection(
+            host,
+            port,
+        )
+        self._receiver = asyncio.ensure_future(self._receive())
+
+    async def request(self, line):
+        reply = asyncio.get_running_loop().create_future()
+        self._replies.append(reply)
+        self._writer.write(f'{line}\n'.encode())
+        await self._writer.drain()
+        return await reply
+
+    async def close(self):
+        self._writer.write(b'quit\n')
+        self._writer.close()
+        if self._receiver is not None:
+            self._receiver.cancel()
+
+    async def _receive(self):
+        while True:
+            line = await self._reader.readline()
+            if not line:
+                break
+
+            line = line.decode().strip()
+            if line.startswith('event '):
+                await self.events.put(line)
+            elif self._replies:
+                self._replies.popleft().set_result(line)
+
+        while self._replies:
+            self._replies.popleft().set_exception(
+                ConnectionError('Connection closed by the server'),
+            )
+
+
+async def benchmark(
+        host=GameServer.DEFAULT_HOST,
+        port=GameServer.DEFAULT_PORT,
+        nb_clients=8,
+        nb_moves=50,
+):
+    """
+    Each client plays a game of random legal moves on the server, returns
+    the throughput and the latencies of the played moves in milliseconds.
+    Moves refused by the server are only counted.
+    """
+    async def _play(latencies, refused):
+        client = GameClient()
+        await client.connect(host, port)
+        _, game_id = (await client.request('new')).split()
+        position = Position()
+        for _ in range(nb_moves):
+            moves = position.legal_moves()
+            if not moves:
+                break
+
+            uci = position.move_to_uci(random.choice(moves))
+            start = time.perf_counter()
+            reply = await client.request(f'move {game_id} {uci}')
+            latency = (time.perf_counter() - start) * 1000
+            if not reply.startswith('ok'):
+                refused.append(uci)
+                continue
+
+            latencies.append(latency)
+            position.push_uci(uci)
+            if len(reply.split()) > 3:
+                break
+
+        await client.close()
+
+    latencies = []
+    refused = []
+    start = time.perf_counter()
+    await asyncio.gather(
+        *[_play(latencies, refused) for _ in range(nb_clients)]
+    )
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    return BENCH_RESULT(
+        nb_moves=len(latencies),
+        nb_refused=len(refused),
+        seconds=seconds,
+        moves_per_second=len(latencies) / seconds,
+        p50_latency=latencies[len(latencies) // 2],
+        p99_latency=latencies[min(
+            int(len(latencies) * 0.99),
+            len(latencies) - 1,
+        )],
+    )
@@ -0,0 +1,399 @@
+import collections
+import time
+
+
+from .. import constant as c
+from ..element.piecer import Piece
+from ..element.squarer import Square
+from . import attacker
+from . import positioner
+from .gamer import Game
+
+
+MATE_RESULT = collections.namedtuple(
+    'MATE_RESULT',
+    [
+        'mate_in',
+        'pv',
+        'nodes',
+        'tt_hits',
+        'seconds',
+    ],
+)
+
+
+# Everything needed to take a move back
+_UNDO = collections.namedtuple(
+    '_UNDO',
+    [
+        'piece',
+        'captured',
+        'captured_square',
+        'rook_move',
+        'two_square_dst',
+        'castling',
+    ],
+)
+
+
+PROMOTION_TYPES = (
+    c.PieceType.queen,
+    c.PieceType.knight,
+    c.PieceType.rook,
+    c.PieceType.bishop,
+)
+
+PROMOTION_CODES = {
+    c.PieceType.queen: 'q',
+    c.PieceType.knight: 'n',
+    c.PieceType.rook: 'r',
+    c.PieceType.bishop: 'b',
+}
+
+
+class MateSolver:
+    """
+    Proves or disproves a forced mate in at most max_moves moves for the
+    side to move, on the board and the rules of Game. The depth goes up one
+    move at a time, so the first mate found is the shortest one.
+
+    The attacking side tries its checks first. With checks_only it only
+    tries checks at all, which is much faster but misses the mates that
+    start with a quiet move. On the last move only checks are tried anyway,
+    as nothing else can mate.
+
+    Proven and disproven depths are kept in a transposition table keyed by
+    the zobrist hash of the position, for the life of the solver.
+    """
+    def __init__(self, checks_only=False):
+        self._checks_only = checks_only
+        self._table = {}
+        self._board = None
+        self._castling = 0
+        self._nodes = 0
+        self._tt_hits = 0
+
+    @property
+    def checks_only(self):
+        return self._checks_only
+
+    @property
+    def tt_size(self):
+        return len(self._table)
+
+    def clear(self):
+        self._table.clear()
+
+    def solve(self, fen, max_moves):
+        """
+        Returns a MATE_RESULT, mate_in is None when there is no mate in
+        max_moves moves. The principal variation is a list of UCI moves,
+        the defending side playing its longest resistance.
+        """
+        start = time.perf_counter()
+        game = Game()
+        with game.block_signals():
+            game.set_fen(fen)
+
+        # Castling rights as a mask of the positioner bits, the game only
+        # keeps the ones whose king and rook are in place
+        self._board = game.board
+        self._castling = sum(
+            positioner.CASTLING_CODES.get(code, 0)
+            for code in game.fen.split()[2]
+        )
+        self._nodes = 0
+        self._tt_hits = 0
+
+        color = c.Color.white if fen.split()[1] == 'w' else c.Color.black
+        mate_in = None
+        pv = []
+        for depth in range(1, max_moves + 1):
+            if self._attack(color, depth):
+                mate_in = depth
+                pv = self._principal_variation(color, depth)
+                break
+
+        return MATE_RESULT(
+            mate_in=mate_in,
+            pv=pv,
+            nodes=self._nodes,
+            tt_hits=self._tt_hits,
+            seconds=time.perf_counter() - start,
+        )
+
+    def _attack(self, color, depth):
+        # Whether color, to move, mates in at most depth moves
+        self._nodes += 1
+        key = self._key(color)
+        entry = self._table.get(key)
+        if entry is not None:
+            proven, disproven, _ = entry
+            if proven is not None and proven <= depth:
+                self._tt_hits += 1
+                return True
+            if disproven >= depth:
+                self._tt_hits += 1
+                return False
+
+        checks, others = self._ordered_moves(color)
+        moves = checks
+        if depth > 1 and not self._checks_only:
+            moves = checks + others
+
+        opponent = _opponent(color)
+        for move in moves:
+            undo = self._make(move)
+            try:
+                is_mate = self._defend(opponent, depth)
+            finally:
+                self._unmake(move, undo)
+
+            if is_mate:
+                self._store(key, proven=depth, best_move=move)
+                return True
+
+        self._store(key, disproven=depth)
+        return False
+
+    def _defend(self, color, depth):
+        # Whether color, to move, gets mated within depth moves of the
+        # opponent, the move that led here included
+        self._nodes += 1
+        moves = self._legal_moves(color)
+        if not moves:
+            return bool(attacker.checkers(self._board, color))
+        if depth == 1:
+            return False
+
+        opponent = _opponent(color)
+        for move in moves:
+            undo = self._make(move)
+            try:
+                is_mate = self._attack(opponent, depth - 1)
+            finally:
+                self._unmake(move, undo)
+
+            if not is_mate:
+                return False
+
+        return True
+
+    def _principal_variation(self, color, depth):
+        pv = []
+        while depth:
+            key = self._key(color)
+            best_move = self._table[key][2]
+            pv.append(best_move)
+            self._make(best_move)
+
+            opponent = _opponent(color)
+            replies = self._legal_moves(opponent)
+            if not replies:
+                break
+
+            # The reply that holds out the longest
+            longest = None
+            for reply in replies:
+                undo = self._make(reply)
+                mate_in = next(
+                    d for d in range(1, depth) if self._attack(color, d)
+                )
+                self._unmake(reply, undo)
+                if longest is None or mate_in > longest[0]:
+                    longest = (mate_in, reply)
+
+            depth, reply = longest
+            pv.append(reply)
+            self._make(reply)
+
+        return [_to_uci(move) for move in pv]
+
+    def _store(self, key, proven=None, disproven=0, best_move=None):
+        entry = self._table.get(key, (None, 0, None))
+        if proven is not None:
+            entry = (proven, entry[1], best_move)
+        else:
+            entry = (entry[0], max(disproven, entry[1]), entry[2])
+        self._table[key] = entry
+
+    def _key(self, color):
+        key = self._board.hash
+        if color == c.Color.black:
+            key ^= positioner.ZOBRIST_BLACK
+
+        key ^= positioner.ZOBRIST_CASTLING[self._castling]
+
+        # The en passant file only counts when a pawn can actually take
+        if attacker.can_take_en_passant(self._board, color):
+            two_square_dst = self._board.pawn_two_square_dst
+            key ^= positioner.ZOBRIST_EN_PASSANT[two_square_dst.x]
+
+        return key
+
+    def _ordered_moves(self, color):
+        checks = []
+        others = []
+        opponent = _opponent(color)
+        for move in self._legal_moves(color):
+            undo = self._make(move)
+            gives_check = bool(attacker.checkers(self._board, opponent))
+            self._unmake(move, undo)
+            if gives_check:
+                checks.append(move)
+            else:
+                others.append(move)
+
+        return checks, others
+
+    def _legal_moves(self, color):
+        moves = []
+        last_y = 7 if color == c.Color.white else 0
+        for src, dst in attacker.legal_moves(self._board, color):
+            piece = self._board.data[attacker.SQUARES[src]]
+            if piece.type == c.PieceType.pawn and dst[1] == last_y:
+                moves.extend((src, dst, p) for p in PROMOTION_TYPES)
+            else:
+                moves.append((src, dst, None))
+
+        moves.extend(self._castling_moves(color))
+        return moves
+
+    def _castling_moves(self, color):
+        if color == c.Color.white:
+            y = 0
+            king_side = positioner.WHITE_KING_SIDE
+            queen_side = positioner.WHITE_QUEEN_SIDE
+        else:
+            y = 7
+            king_side = positioner.BLACK_KING_SIDE
+            queen_side = positioner.BLACK_QUEEN_SIDE
+
+        if not self._castling & (king_side | queen_side):
+            return []
+
+        board = self._board
+        if board.king_square(color) != Square((4, y)):
+            return []
+
+        opponent = _opponent(color)
+        if attacker.is_attacked(board, Square((4, y)), opponent):
+            return []
+
+        moves = []
+        for right, rook_x, in_betweens, king_x in (
+                (king_side, 7, (5, 6), 6),
+                (queen_side, 0, (1, 2, 3), 2),
+        ):
+            if not self._castling & right:
+                continue
+
+            rook = board.data[Square((rook_x, y))]
+            if (
+                    rook is None or
+                    rook.type != c.PieceType.rook or
+                    rook.color != color
+            ):
+                continue
+
+            if any(
+                    board.data[Square((x, y))] is not None
+                    for x in in_betweens
+            ):
+                continue
+
+            # The king does not go through b1 or b8
+            if any(
+                    attacker.is_attacked(board, Square((x, y)), opponent)
+                    for x in in_betweens
+                    if x != 1
+            ):
+                continue
+
+            moves.append(((4, y), (king_x, y), None))
+
+        return moves
+
+    def _make(self, move):
+        src, dst, promotion = move
+        board = self._board
+        src_square = attacker.SQUARES[src]
+        dst_square = attacker.SQUARES[dst]
+
+        piece = board.clear_square(src_square)
+        captured_square = dst_square
+        if (
+                piece.type == c.PieceType.pawn and
+                src[0] != dst[0] and
+                board.data[dst_square] is None
+        ):
+            captured_square = attacker.SQUARES[(dst[0], src[1])]
+        captured = board.clear_square(captured_square)
+
+        rook_move = None
+        if piece.type == c.PieceType.king and abs(dst[0] - src[0]) == 2:
+            rook_x, rook_dst_x = (7, 5) if dst[0] > src[0] else (0, 3)
+            rook_move = (
+                attacker.SQUARES[(rook_x, src[1])],
+                attacker.SQUARES[(rook_dst_x, src[1])],
+            )
+            board.add_piece(board.clear_square(rook_move[0]), rook_move[1])
+
+        if promotion is not None:
+            orders = [p.order for p in board.get_pieces(piece.color)]
+            board.add_piece(
+                Piece(promotion, piece.color, max(orders) + 1),
+                dst_square,
+            )
+        else:
+            board.add_piece(piece, dst_square)
+
+        undo = _UNDO(
+            piece=piece,
+            captured=captured,
+            captured_square=captured_square,
+            rook_move=rook_move,
+            two_square_dst=board.pawn_two_square_dst,
+            castling=self._castling,
+        )
+
+        board.pawn_two_square_dst = None
+        if piece.type == c.PieceType.pawn and abs(dst[1] - src[1]) == 2:
+            board.pawn_two_square_dst = dst_square
+
+        # Rights are lost when the king or a rook leaves its square, or a
+        # rook is taken on it. The table is indexed by 0x88 squares
+        self._castling &= (
+            positioner.CASTLING_KEEP[src[1] * 16 + src[0]] &
+            positioner.CASTLING_KEEP[dst[1] * 16 + dst[0]]
+        )
+
+        return undo
+
+    def _unmake(self, move, undo):
+        src, dst, _ = move
+        board = self._board
+        board.clear_square(attacker.SQUARES[dst])
+        board.add_piece(undo.piece, attacker.SQUARES[src])
+        if undo.captured is not None:
+            board.add_piece(undo.captured, undo.captured_square)
+
+        if undo.rook_move is not None:
+            rook_src, rook_dst = undo.rook_move
+            board.add_piece(board.clear_square(rook_dst), rook_src)
+
+        board.pawn_two_square_dst = undo.two_square_dst
+        self._castling = undo.castling
+
+
+def _opponent(color):
+    return c.Color.black if color == c.Color.white else c.Color.white
+
+
+def _to_uci(move):
+    src, dst, promotion = move
+    uci = f'{attacker.SQUARES[src].address}{attacker.SQUARES[dst].address}'
+    if promotion is not None:
+        uci += PROMOTION_CODES[promotion]
+
+    return uci
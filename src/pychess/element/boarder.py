@@ -1,17 +1,64 @@
+import collections
 import itertools
 import random
 
 
 from .. import constant as c
 from ..core.mover import Move
+from ..core import positioner
 from .squarer import Square
 from .piecer import Piece
 
 
+EVALUATION = collections.namedtuple(
+    'EVALUATION',
+    [
+        'white_material',
+        'black_material',
+        'score',
+    ],
+)
+
+
+# Codes of the compact board of the engine, whose piece square values give
+# the score of the board
+PIECE_CODES = {
+    c.PieceType.pawn: positioner.PAWN,
+    c.PieceType.knight: positioner.KNIGHT,
+    c.PieceType.bishop: positioner.BISHOP,
+    c.PieceType.rook: positioner.ROOK,
+    c.PieceType.queen: positioner.QUEEN,
+    c.PieceType.king: positioner.KING,
+}
+
+
+FEN_PIECE_TYPES = {
+    'p': c.PieceType.pawn,
+    'n': c.PieceType.knight,
+    'b': c.PieceType.bishop,
+    'r': c.PieceType.rook,
+    'q': c.PieceType.queen,
+    'k': c.PieceType.king,
+}
+
+
 class Board:
     def __init__(self):
         self._data = None
         self._reverse = None
+
+        # Pieces by color and by (color, type) and the squares of the
+        # kings, kept up to date by every change made through the board
+        self._color_index = None
+        self._index = None
+        self._king_squares = None
+
+        # Worth of the pieces of each color, kings left out, the material
+        # plus piece square score in centipawns, white positive, and the
+        # zobrist hash of the placement of the pieces
+        self._material = None
+        self._score = None
+        self._hash = None
         self.reset()
 
     @property
@@ -29,6 +76,7 @@ class Board:
     @reverse.setter
     def reverse(self, val):
         self._reverse = val
+        self._build_index()
 
     @property
     def pieces(self):
@@ -46,6 +94,64 @@ class Board:
     def pawn_two_square_dst(self, val):
         self._pawn_two_square_dst = val
 
+    def get_pieces(self, color, piece_type=None):
+        if piece_type is not None:
+            return list(self._index[(color, piece_type)])
+
+        return list(self._color_index[color])
+
+    def king_square(self, color):
+        return self._king_squares[color]
+
+    def material(self, color):
+        return self._material[color]
+
+    @property
+    def score(self):
+        return self._score
+
+    @property
+    def hash(self):
+        return self._hash
+
+    @property
+    def fen(self):
+        """
+        Placement field of the FEN of the board, rank 8 first.
+        """
+        rows = []
+        for y in range(7, -1, -1):
+            row = ''
+            nb_empty = 0
+            for x in range(8):
+                piece = self._data[Square((x, y))]
+                if piece is None:
+                    nb_empty += 1
+                    continue
+
+                if nb_empty:
+                    row += str(nb_empty)
+                    nb_empty = 0
+
+                if piece.color == c.Color.white:
+                    row += piece.code.upper()
+                else:
+                    row += piece.code
+
+            if nb_empty:
+                row += str(nb_empty)
+            rows.append(row)
+
+        return '/'.join(rows)
+
+    @property
+    def evaluation(self):
+        return EVALUATION(
+            white_material=self._material[c.Color.white],
+            black_material=self._material[c.Color.black],
+            score=self._score,
+        )
+
     def move_hint(self, square):
         if self.is_empty(square):
             return []
@@ -108,6 +214,11 @@ class Board:
             raise RuntimeError(error_msg)
         self.data[square] = piece
         self.reverse[piece] = square
+        self._color_index[piece.color][piece] = square
+        self._index[(piece.color, piece.type)].append(piece)
+        if piece.type == c.PieceType.king:
+            self._king_squares[piece.color] = square
+        self._count(piece, square, 1)
 
     def get_square(self, piece):
         self._validate_piece(piece)
@@ -119,6 +230,13 @@ class Board:
 
         if existing_piece is not None:
             self.reverse.pop(existing_piece)
+            self._color_index[existing_piece.color].pop(existing_piece)
+            self._index[
+                (existing_piece.color, existing_piece.type)
+            ].remove(existing_piece)
+            if existing_piece.type == c.PieceType.king:
+                self._king_squares[existing_piece.color] = None
+            self._count(existing_piece, square, -1)
 
         return existing_piece
 
@@ -184,8 +302,87 @@ class Board:
         self._clear()
         self._set_pieces()
 
-    def set_pieces(self, is_standard):
-        self._set_pieces(is_standard=is_standard)
+    def set_pieces(self, is_standard, order=None):
+        self._set_pieces(is_standard=is_standard, order=order)
+
+    def set_fen(self, placement, en_passant='-', player=c.Color.white):
+        """
+        Replaces the pieces by the ones of the placement field of a FEN,
+        en_passant is the en passant target square field and player the
+        side to move.
+        """
+        rows = placement.split('/')
+        if len(rows) != 8:
+            error_msg = (
+                f'Malformed FEN placement {placement}, expected 8 ranks'
+            )
+            raise ValueError(error_msg)
+
+        pieces = {}
+        for row_index, row in enumerate(rows):
+            y = 7 - row_index
+            x = 0
+            for char in row:
+                if char.isdigit():
+                    x += int(char)
+                    continue
+
+                piece_type = FEN_PIECE_TYPES.get(char.lower())
+                if piece_type is None or x > 7:
+                    error_msg = (
+                        f'Malformed FEN placement {placement}, bad rank {row}'
+                    )
+                    raise ValueError(error_msg)
+
+                color = c.Color.white if char.isupper() else c.Color.black
+                pieces[(x, y)] = (piece_type, color)
+                x += 1
+
+            if x != 8:
+                error_msg = (
+                    f'Malformed FEN placement {placement}, bad rank {row}'
+                )
+                raise ValueError(error_msg)
+
+        kings = [p for p in pieces.values() if p[0] == c.PieceType.king]
+        if sorted(color.value for _, color in kings) != [0, 1]:
+            error_msg = (
+                f'FEN placement {placement} needs exactly one king per side'
+            )
+            raise ValueError(error_msg)
+
+        two_square_dst = None
+        if en_passant != '-':
+            # The opponent has just pushed a pawn two squares over the target
+            target = Square(en_passant)
+            if player == c.Color.white:
+                rank, opponent, direction = 5, c.Color.black, -1
+            else:
+                rank, opponent, direction = 2, c.Color.white, 1
+            dst = (target.x, target.y + direction)
+            src = (target.x, target.y - direction)
+            if (
+                    target.y != rank or
+                    pieces.get(dst) != (c.PieceType.pawn, opponent) or
+                    (target.x, target.y) in pieces or
+                    src in pieces
+            ):
+                error_msg = f'Bad en passant square {en_passant} in FEN'
+                raise ValueError(error_msg)
+            two_square_dst = Square(dst)
+
+        self._clear()
+        self._pawn_two_square_dst = two_square_dst
+
+        # Orders follow the squares from a1, as on the start board
+        orders = collections.Counter()
+        for (x, y), (piece_type, color) in sorted(
+                pieces.items(),
+                key=lambda item: (item[0][1], item[0][0]),
+        ):
+            piece = Piece(piece_type, color, orders[(color, piece_type)])
+            orders[(color, piece_type)] += 1
+            self.add_piece(piece, Square((x, y)))
 
     def _update_pawn_two_square_dst(self, moved_piece, src, dst):
         if moved_piece.type != c.PieceType.pawn or abs(dst.y - src.y) != 2:
@@ -203,10 +400,11 @@ class Board:
 
         self.reverse = {}
 
-    def _set_pieces(self, is_standard=True):
-        order = list(range(8))
-        if not is_standard:
-            order = self._chess_960_order()
+    def _set_pieces(self, is_standard=True, order=None):
+        if order is None:
+            order = list(range(8))
+            if not is_standard:
+                order = self._chess_960_order()
 
         self._set_color_pieces(color=c.Color.white, order=order)
         self._set_color_pieces(color=c.Color.black, order=order)
@@ -342,6 +540,36 @@ class Board:
         self.reverse.update(
             {v: k for k, v in self._data.items() if v is not None}
         )
+        self._build_index()
+
+    def _build_index(self):
+        self._color_index = {color: {} for color in c.Color}
+        self._index = {
+            (color, piece_type): []
+            for color in c.Color
+            for piece_type in c.PieceType
+        }
+        self._king_squares = dict.fromkeys(c.Color)
+        self._material = dict.fromkeys(c.Color, 0)
+        self._score = 0
+        self._hash = 0
+        for piece, square in self._reverse.items():
+            self._color_index[piece.color][piece] = square
+            self._index[(piece.color, piece.type)].append(piece)
+            if piece.type == c.PieceType.king:
+                self._king_squares[piece.color] = square
+            self._count(piece, square, 1)
+
+    def _count(self, piece, square, sign):
+        if piece.type != c.PieceType.king:
+            self._material[piece.color] += sign * piece.worth
+
+        code = PIECE_CODES[piece.type]
+        if piece.color == c.Color.black:
+            code = -code
+        index = square.y * 16 + square.x
+        self._score += sign * positioner.SQUARE_VALUES[code][index]
+        self._hash ^= positioner.ZOBRIST_PIECES[code][index]
 
     def _validate_piece(self, piece):
         if piece not in self.reverse:
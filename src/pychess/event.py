@@ -1,35 +1,104 @@
 class Signal:
+    """
+    Declared as a class attribute, like the Qt signals. Reached through an
+    instance it gives a BoundSignal holding the callbacks of that instance
+    only, they are stored on the instance the first time something is
+    connected. Callbacks connected on the class receive the signals of all
+    the instances.
+    """
     def __init__(self, arg_type=None):
         self._arg_type = arg_type or type(None)
         self._connected_callbacks = []
+        self._attr_name = None
+
+    @property
+    def arg_type(self):
+        return self._arg_type
+
+    @property
+    def attr_name(self):
+        return self._attr_name
+
+    @property
+    def connected_callbacks(self):
+        return self._connected_callbacks
 
     def connect(self, callback):
         self._validate_callback(callback)
         self._connected_callbacks.append(callback)
 
     def emit(self, arg=None):
-        if not isinstance(arg, self._arg_type):
-            error_msg = (
-                f'{self} cannot emit value of type {type(arg)}'
-            )
-            raise TypeError(error_msg)
-
-        for callback in self._connected_callbacks:
-            if callback is not None:
-                if arg is not None:
-                    callback(arg)
-                else:
-                    callback()
+        self.validate_arg(arg)
+        _call_callbacks(self._connected_callbacks, arg)
 
     def disconnect(self, callback):
         self._validate_callback(callback)
         if callback in self._connected_callbacks:
             self._connected_callbacks.remove(callback)
 
+    def validate_arg(self, arg):
+        if not isinstance(arg, self._arg_type):
+            error_msg = (
+                f'{self} cannot emit value of type {type(arg)}'
+            )
+            raise TypeError(error_msg)
+
     def _validate_callback(self, callback):
         if not callable(callback):
             error_msg = f'Callback {callback} is not a callable!'
             raise TypeError(error_msg)
 
+    def __set_name__(self, owner, name):
+        self._attr_name = f'_{name.lower()}_callbacks'
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return BoundSignal(self, instance)
+
     def __repr__(self):
         return f'{self.__class__.__name__}'
+
+
+class BoundSignal:
+    __slots__ = ('_signal', '_instance')
+
+    def __init__(self, signal, instance):
+        self._signal = signal
+        self._instance = instance
+
+    def connect(self, callback):
+        self._signal._validate_callback(callback)
+        callbacks = self._instance.__dict__.setdefault(
+            self._signal.attr_name,
+            [],
+        )
+        callbacks.append(callback)
+
+    def emit(self, arg=None):
+        self._signal.validate_arg(arg)
+        callbacks = self._instance.__dict__.get(self._signal.attr_name)
+        _call_callbacks(callbacks, arg)
+        _call_callbacks(self._signal.connected_callbacks, arg)
+
+    def disconnect(self, callback):
+        self._signal._validate_callback(callback)
+        callbacks = self._instance.__dict__.get(self._signal.attr_name)
+        if callbacks and callback in callbacks:
+            callbacks.remove(callback)
+
+    def __repr__(self):
+        return f'{self._signal}'
+
+
+def _call_callbacks(callbacks, arg):
+    if not callbacks:
+        return
+
+    # Iterating over a copy lets callbacks disconnect themselves
+    for callback in list(callbacks):
+        if callback is not None:
+            if arg is not None:
+                callback(arg)
+            else:
+                callback()
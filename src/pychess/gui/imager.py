@@ -1,16 +1,25 @@
 import os
 import collections
+import functools
 import itertools
 import random
+import time
 
 
+import numpy
 from PIL import Image, ImageQt, ImageDraw, ImageFont, ImageColor
-from PySide2 import QtCore
+from PySide2 import QtCore, QtGui
 
 from .. import constant as c
 from ..element.squarer import Square
 
 
+FLIP_STATE = collections.namedtuple(
+    'FLIP_STATE',
+    ['scale', 'angle', 'haze_alpha'],
+)
+
+
 class Coordinates:
     """
     The image is assumed to be composed as following,
@@ -116,6 +125,7 @@ class Coordinates:
 
 class BoardImage(QtCore.QObject):
     FRAME_UPDATED_SIGNAL = QtCore.Signal()
+    FLIP_UPDATED_SIGNAL = QtCore.Signal()
     ANIM_FINISHED_SIGNAL = QtCore.Signal()
 
     COLOR_MOVE_HINT_CAPTURE = (255, 42, 14, 255)
@@ -124,6 +134,8 @@ class BoardImage(QtCore.QObject):
     FPS = 60
     MIN_DURATION = 0.06  # seconds
     MAX_DURATION = 0.15  # seconds
+    FLIP_DURATION = 0.35  # seconds
+    MIN_FLIP_SCALE = 0.002
 
     def __init__(self, board, parent=None):
         super().__init__(parent=parent)
@@ -140,50 +152,71 @@ class BoardImage(QtCore.QObject):
 
         # Flip timer
         self._flip_timer = QtCore.QTimer()
+        self._flip_timer.setInterval(interval)
         self._flip_timer.timeout.connect(self._update_flip)
+        self._init_flip_params()
 
     @classmethod
     def get_grid_color_map(cls):
+        # Callers are free to mutate the result, the cached map is shared
+        return dict(cls._compute_grid_color_map())
+
+    @classmethod
+    def get_active_pixels(cls, piece_type, dart_size=2):
+        # Callers pop the center from the result, the cached list is shared
+        return list(cls._compute_active_pixels(piece_type, dart_size))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _compute_grid_color_map():
         n = c.IMAGE.NB_SQUARES
-        image = Image.open(c.IMAGE.GRID_IMAGE_FILE_PATH)
+        image = Image.open(c.IMAGE.GRID_IMAGE_FILE_PATH).convert('RGBA')
         square_size = int(c.IMAGE.BASE_IMAGE_SIZE / n)
         coords = Coordinates(
             border_size=0,
             square_size=square_size,
         )
-        colors = {}
-        for row, column in itertools.product(range(n), range(n)):
-            pixel_pos = coords.square_to_pixel(row, column)
-            colors[(row, column)] = image.getpixel(pixel_pos)
+        squares = list(itertools.product(range(n), range(n)))
+        xs, ys = zip(*[coords.square_to_pixel(r, col) for r, col in squares])
 
-        return colors
+        # Sample all the squares in one go, numpy indexes as (y, x)
+        pixels = numpy.asarray(image)[list(ys), list(xs)].tolist()
 
-    @classmethod
-    def get_active_pixels(cls, piece_type, dart_size=2):
+        return {
+            square: tuple(pixel)
+            for square, pixel in zip(squares, pixels)
+        }
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _compute_active_pixels(piece_type, dart_size):
         piece_name = piece_type.name
         piece_images = getattr(c.IMAGE.PROMOTION_IMAGE, piece_name)
         image_data = getattr(piece_images, c.Color.black.name)
         image_name = getattr(image_data, 'default')
         image_path = os.path.join(c.IMAGE.IMAGE_DIR, image_name)
-        image = Image.open(image_path)
+        image = Image.open(image_path).convert('RGBA')
         cx = int(image.width / 2)
         cy = int(image.height / 2)
         nb_rows = int(image.width / dart_size)
         nb_columns = int(image.height / dart_size)
-        actives = []
-        for row in range(nb_rows):
-            for column in range(nb_columns):
-                x = int(row * dart_size)
-                y = int(column * dart_size)
-                _, _, _, a = image.getpixel((x, y))
-                if a:
-                    actives.append((x, y))
+
+        # Alpha channel sampled every dart_size pixels, transposed so that
+        # the result is indexed as (x, y) and ordered row by row like the
+        # scan it replaces
+        alpha = numpy.asarray(image)[::dart_size, ::dart_size, 3]
+        alpha = alpha[:nb_columns, :nb_rows].T
+        xs, ys = numpy.nonzero(alpha)
+        actives = list(zip(
+            (xs * dart_size).tolist(),
+            (ys * dart_size).tolist(),
+        ))
 
         # Adding image center as last value. It can be extracted for applying
         # transformations from the the center
         actives.append((cx, cy))
 
-        return actives
+        return tuple(actives)
 
     @property
     def board(self):
@@ -191,7 +224,7 @@ class BoardImage(QtCore.QObject):
 
     @property
     def qt_image(self):
-        return ImageQt.ImageQt(self._board_image)
+        return self._qt_image
 
     @property
     def image(self):
@@ -217,8 +250,13 @@ class BoardImage(QtCore.QObject):
     @is_flipped.setter
     def is_flipped(self, val):
         self._is_flipped = val
+        self._flip_start_time = time.perf_counter()
         self._flip_timer.start()
 
+    @property
+    def flip_state(self):
+        return self._flip_state
+
     @property
     def height(self):
         return self._board_image.height
@@ -481,15 +519,15 @@ class BoardImage(QtCore.QObject):
         self._move_src = None
         self._move_dst = None
         self._move_distance = 0
-        self._flip_direction = -1
-        self._init_height = self._base_image.height
-        self._flip_height = self._init_height
-        self._min_flip_height = 1
-        self._flip_speed = 60
 
     def _reset_anim_params(self):
         self._init_anim_params()
 
+    def _init_flip_params(self):
+        self._flip_state = None
+        self._flip_start_time = None
+        self._flip_board_drawn = False
+
     def animate_move(self, src, dst):
         self._move_src = src
         self._move_dst = dst
@@ -521,73 +559,41 @@ class BoardImage(QtCore.QObject):
 
     def _update_flip(self):
         # Here is how the flip anim is applied -
-        # 1. Keep on decreasing height and rotate the image
-        # 2. Once the height reaches 0.1, flip the pieces
-        # 3. Increase the height and keep on rotating the image
-        # 4. If the final height or flip angle reaches a threshold, stop
-        self.update()
-
-        self._flip_height += self._flip_speed * self._flip_direction
-        normalized_height = 1 - (self._flip_height / self._init_height)
+        # 1. Keep on squashing the image and rotate it
+        # 2. Once halfway through, flip the pieces
+        # 3. Stretch the image back and keep on rotating it to rest
+        # Only the transform is computed here, the image label paints the
+        # board with it. Progress comes from the elapsed time, so a late
+        # tick skips ahead instead of slowing the flip down.
+        elapsed = time.perf_counter() - self._flip_start_time
+        t = elapsed / self.FLIP_DURATION
 
-        if self._flip_height < self._min_flip_height:
-            self._flip_height = self._min_flip_height
-            self._draw_flipped()
-            self._flip_direction = 1
-            normalized_height = self._flip_height / self._init_height
-
-        angle_magnitude = self._rescale(normalized_height, 0, 1, 0, 90)
-        angle = angle_magnitude * self._flip_direction
-        haze_alpha = int(255 * normalized_height)
-        self._board_image = self._board_image.resize(
-            (
-                self._board_image.width,
-                self._flip_height,
-            ),
-            resample=Image.LANCZOS
-        )
-        haze = Image.new(
-            'RGBA',
-            (self._board_image.width, self._board_image.height),
-            color=(25, 25, 25, haze_alpha),
-        )
-        self._board_image.alpha_composite(haze, (0, 0))
-
-        if self._flip_height > self._init_height:
-            self.update()
-            self._board_image = self._board_image.resize(
-                (
-                    self._board_image.width,
-                    self._init_height,
-                ),
-                resample=Image.LANCZOS
-            )
-            self._board_image.rotate(0)
-            self._flip_direction = -1
-            self._flip_height = self._init_height
+        if t >= 1.0:
             self._flip_timer.stop()
-            self.update()
+            if not self._flip_board_drawn:
+                self._draw_flipped()
+            self._init_flip_params()
             self.FRAME_UPDATED_SIGNAL.emit()
             return
 
-        final_image = Image.new(
-            'RGBA',
-            (self._board_image.width, self._init_height),
-            color=(25, 25, 25),
-        )
+        if t < 0.5:
+            flip_direction = -1
+            normalized_height = t * 2
+        else:
+            flip_direction = 1
+            normalized_height = (1 - t) * 2
+            if not self._flip_board_drawn:
+                self._draw_flipped()
+                self._flip_board_drawn = True
+                self.FRAME_UPDATED_SIGNAL.emit()
 
-        final_image.alpha_composite(
-            self._board_image,
-            (
-                int((final_image.width - self._board_image.width) / 2),
-                int((final_image.height - self._board_image.height) / 2),
-            ),
+        angle_magnitude = self._rescale(normalized_height, 0, 1, 0, 90)
+        self._flip_state = FLIP_STATE(
+            scale=max(1 - normalized_height, self.MIN_FLIP_SCALE),
+            angle=angle_magnitude * flip_direction,
+            haze_alpha=int(255 * normalized_height),
         )
-
-        final_image = final_image.rotate(angle)
-        self._board_image = final_image
-
-        self.FRAME_UPDATED_SIGNAL.emit()
+        self.FLIP_UPDATED_SIGNAL.emit()
 
     @staticmethod
     def _rescale(x, x1, y1, x2, y2):
@@ -785,17 +791,40 @@ class BoardImage(QtCore.QObject):
 
     def _init_board_image(self):
         self._base_image = self._load_image(c.IMAGE.BOARD_IMAGE_FILE_PATH)
-        self._board_image = Image.new(
-            'RGBA',
-            self._base_image.size,
-            color=(0, 0, 0),
-        )
+        (
+            self._buffer,
+            self._board_image,
+            self._qt_image,
+        ) = self._create_shared_image(self._base_image.size)
+        self._board_image.paste((0, 0, 0, 255), (0, 0) + self._base_image.size)
 
         self._initial_square_colors = {
             square: self._base_image.getpixel(self.square_to_pixel(square))
             for square in self._board.squares
         }
 
+    @staticmethod
+    def _create_shared_image(size):
+        # The board image and the qt image are two views over the same RGBA
+        # buffer, whatever gets drawn on the board image is what the label
+        # paints without any conversion or copy in between
+        width, height = size
+        buffer = bytearray(width * height * 4)
+        image = Image.frombuffer('RGBA', size, buffer, 'raw', 'RGBA', 0, 1)
+
+        # Images created from a buffer are flagged read-only and PIL would
+        # silently copy the pixels on the first draw, breaking the sharing
+        image.readonly = 0
+
+        qt_image = QtGui.QImage(
+            buffer,
+            width,
+            height,
+            width * 4,
+            QtGui.QImage.Format_RGBA8888,
+        )
+        return buffer, image, qt_image
+
     def _draw_pieces(self):
         for piece in self._board.pieces:
             self._draw_piece(piece)
@@ -986,9 +1015,10 @@ class CapturedImage:
             align="center",
         )
 
-    def draw_stalemate(self):
-        self.draw_winner(c.Color.white, text='DRAW\nSTALEMATE!')
-        self.draw_winner(c.Color.black, text='DRAW\nSTALEMATE!')
+    def draw_stalemate(self, reason_text='STALEMATE'):
+        text = f'DRAW\n{reason_text}!'
+        self.draw_winner(c.Color.white, text=text)
+        self.draw_winner(c.Color.black, text=text)
 
     def _get_y_coordinate(self, piece_type):
         non_pawn_y_coord = int((self._image_height - self._pawn_height) / 2)
@@ -9,7 +9,6 @@ from PySide2 import QtWidgets, QtCore
 from .. import constant as c
 from ..core.history import Player as HistoryPlayer
 from ..core.pgn import MOVES2PGN, PGN2MOVES
-from ..core.engineer import Engine
 
 
 from .widgets import (
@@ -24,6 +23,7 @@ from .widgets import (
     CustomMessageBox,
     MovieGenerationThread,
     MovieProgressBar,
+    EngineThread,
 )
 
 
@@ -45,6 +45,14 @@ class MainWidget(QtWidgets.QDialog):
     GAME_OVER_SIGNAL = QtCore.Signal(bool)
     BULK_MOVE_SIGNAL = QtCore.Signal(tuple)
 
+    DRAW_TEXTS = {
+        c.DrawReason.stalemate: 'STALEMATE',
+        c.DrawReason.repetition: 'REPETITION',
+        c.DrawReason.fifty_moves: '50 MOVES',
+        c.DrawReason.insufficient_material: 'NO MATERIAL',
+        c.DrawReason.adjudication: 'ADJUDICATED',
+    }
+
     def __init__(self, board, parent=None):
         super().__init__(parent=parent)
         self._board = board
@@ -55,7 +63,8 @@ class MainWidget(QtWidgets.QDialog):
         self._collapsed_width = None
         self._history_player = None
         self._engine_color = None
-        self._engine = Engine()
+        self._engine_thread = EngineThread()
+        self._engine_move_timer = None
         self._board = board
 
         self._current_player = c.Color.white
@@ -103,6 +112,7 @@ class MainWidget(QtWidgets.QDialog):
         self._reset()
 
     def _reset(self):
+        self._cancel_engine_move()
         self.GAME_RESET_SIGNAL.emit()
 
         self._board_widget.reset()
@@ -205,7 +215,15 @@ class MainWidget(QtWidgets.QDialog):
             return
 
         moves = [(m.src, m.dst) for m in self._game_data.move_history]
-        best_move = self._engine.get_best_move(moves)
+        self._engine_thread.request_best_move(moves)
+
+    def _engine_move_found(self, result):
+        request_id, best_move = result
+
+        # The game has moved on (reset, game over) since this was requested
+        if request_id != self._engine_thread.request_id:
+            return
+
         if best_move is None:
             return
 
@@ -220,6 +238,12 @@ class MainWidget(QtWidgets.QDialog):
     def _make_engine_move(self, move):
         self.MOVE_SIGNAL.emit((move, None))
 
+    def _cancel_engine_move(self):
+        self._engine_thread.cancel()
+        if self._engine_move_timer is not None:
+            self._engine_move_timer.stop()
+            self._engine_move_timer = None
+
     def update_board(self):
         self._board_widget.update_board()
 
@@ -232,6 +256,11 @@ class MainWidget(QtWidgets.QDialog):
         self._board_widget.stalemate()
         self._moves_widget.display_win(winning_text='1/2-1/2')
 
+    def draw(self, reason):
+        self._set_game_over()
+        self._board_widget.stalemate(reason_text=self.DRAW_TEXTS[reason])
+        self._moves_widget.display_win(winning_text='1/2-1/2')
+
     def promotion_required(self, move_spec):
         w = SelectPromotionWidget(color=self._current_player)
         w.SELECTED_PROMOTION_SIGNAL.connect(
@@ -262,6 +291,16 @@ class MainWidget(QtWidgets.QDialog):
     def keyPressEvent(self, event):
         self._handle_keypress(event=event)
 
+    def closeEvent(self, event):
+        self._cancel_engine_move()
+        self._engine_thread.stop()
+        super().closeEvent(event)
+
+        # The thread must not outlive the application, the window is hidden
+        # first so that the wait for the engine to quit is not seen
+        self.hide()
+        self._engine_thread.wait()
+
     @staticmethod
     def _is_key_pressed(event, key, modifier=None):
         result = event.key() == key
@@ -324,6 +363,9 @@ class MainWidget(QtWidgets.QDialog):
         # Toolbar Signals
         self._tool_bar.BTN_CLICKED_SIGNAL.connect(self._handle_command)
 
+        # Engine Signals
+        self._engine_thread.BEST_MOVE_SIGNAL.connect(self._engine_move_found)
+
         # Internal Signals
         self._timer_white.timeout.connect(self._timer_white_timeout)
         self._timer_black.timeout.connect(self._timer_black_timeout)
@@ -850,9 +892,7 @@ class MainWidget(QtWidgets.QDialog):
         self._engine_color = engine_color
         self._board_widget.engine_color = engine_color
         if self._engine_color == c.Color.white:
-            best_move = self._engine.get_best_move()
-            if best_move is not None:
-                self.MOVE_SIGNAL.emit((best_move, None))
+            self._engine_thread.request_best_move()
 
     def _start_new_game(self, engine_color=None):
         result = self._update_data_for_start(engine_color=engine_color)
@@ -1010,6 +1050,7 @@ class MainWidget(QtWidgets.QDialog):
             self._handle_flip()
 
     def _set_game_over(self, winner=None):
+        self._cancel_engine_move()
         self._winner = winner
         self._is_game_over = True
         self._has_game_started = False
@@ -7,12 +7,14 @@ import re
 import itertools
 import random
 import math
+import queue
 
 
 from PySide2 import QtWidgets, QtCore, QtGui
 
 
 from .. import constant as c
+from ..core.engineer import Engine
 from ..core.pgn import REGEX, NAMEDTUPLES
 from . import imager
 
@@ -39,19 +41,32 @@ RECT_DATA = collections.namedtuple(
 
 class BoardImageLabel(QtWidgets.QLabel):
     NB_RANDOMS = 8
+    SPLASH_FPS = 30
+    SPLASH_TIMER_INTERVAL = 500
 
-    def __init__(self, pixmap, parent=None):
+    # The animation increments were tuned for 60 frames per second, they
+    # are scaled so that the motion speed does not depend on SPLASH_FPS
+    SPLASH_FRAME_STEP = 60 / SPLASH_FPS
+
+    def __init__(self, image, parent=None):
         super().__init__(parent=parent)
         self._pychess_pixmap = QtGui.QPixmap(
             c.IMAGE.PYCHESS_IMAGE_FILE_PATH,
         )
-        self.setPixmap(pixmap)
+        self._image = image
+
+        # The pixmap is only set once so that the label gets its size hint,
+        # the board itself is painted straight from the shared image
+        self.setPixmap(QtGui.QPixmap.fromImage(image))
         self.setSizePolicy(
             QtWidgets.QSizePolicy.MinimumExpanding,
             QtWidgets.QSizePolicy.MinimumExpanding,
         )
 
         self._splash_on = True
+        self._is_shown = False
+        self._flip_state = None
+        self._update_background()
 
         self._init_splash_graphics_params()
         self._init_splash_graphics_timers()
@@ -62,7 +77,21 @@ class BoardImageLabel(QtWidgets.QLabel):
 
     @splash_on.setter
     def splash_on(self, val):
+        if val == self._splash_on:
+            return
+
         self._splash_on = val
+        self._update_background()
+        self._update_splash_timers()
+        self.update()
+
+    @property
+    def flip_state(self):
+        return self._flip_state
+
+    @flip_state.setter
+    def flip_state(self, val):
+        self._flip_state = val
 
     def paintEvent(self, event):
         size = self.size()
@@ -82,6 +111,13 @@ class BoardImageLabel(QtWidgets.QLabel):
     def showEvent(self, event):
         self._init_width = self.sizeHint().width()
         self._init_height = self.sizeHint().height()
+        self._is_shown = True
+        self._update_splash_timers()
+
+    def hideEvent(self, event):
+        # Also received (as a spontaneous event) when the window is minimized
+        self._is_shown = False
+        self._update_splash_timers()
 
     def resizeEvent(self, event):
         self._scale = (
@@ -90,33 +126,59 @@ class BoardImageLabel(QtWidgets.QLabel):
                 (self.size().height() / self._init_height)
             ) / 2
         ) ** 2
+        self._grid_layer = None
 
     def setPixmap(self, pixmap):
         self.pixmap = pixmap
         super().setPixmap(self.pixmap)
 
+    def set_image(self, image):
+        self._image = image
+        self.update()
+
     def _init_splash_graphics_timers(self):
         self._hue = 0
-        self._hue_timer = QtCore.QTimer()
-        self._hue_timer.timeout.connect(self._update_hue)
-        self._hue_timer.start()
+        self._frame_timer = QtCore.QTimer(self)
+        self._frame_timer.setInterval(int(1000 / self.SPLASH_FPS))
+        self._frame_timer.timeout.connect(self._update_splash_frame)
 
-        self._color_timer = QtCore.QTimer()
-        self._color_timer.setInterval(500)
+        self._color_timer = QtCore.QTimer(self)
+        self._color_timer.setInterval(self.SPLASH_TIMER_INTERVAL)
         self._color_timer.timeout.connect(self._randomize_colors)
-        self._color_timer.start()
 
-        self._random_timer = QtCore.QTimer()
-        self._random_timer.setInterval(500)
+        self._random_timer = QtCore.QTimer(self)
+        self._random_timer.setInterval(self.SPLASH_TIMER_INTERVAL)
         self._random_timer.timeout.connect(self._randomize_squares)
-        self._random_timer.start()
 
         self._current_band_no = 2
         self._current_band = self._get_band(self._current_band_no)
-        self._band_timer = QtCore.QTimer()
-        self._band_timer.setInterval(500)
+        self._band_timer = QtCore.QTimer(self)
+        self._band_timer.setInterval(self.SPLASH_TIMER_INTERVAL)
         self._band_timer.timeout.connect(self._change_band)
-        self._band_timer.start()
+
+        self._splash_timers = [
+            self._frame_timer,
+            self._color_timer,
+            self._random_timer,
+            self._band_timer,
+        ]
+
+        self._update_splash_timers()
+
+    def _update_splash_timers(self):
+        # Nothing of the splash is visible when the board is being shown or
+        # the label is hidden, so there is no reason to keep ticking
+        is_running = self._splash_on and self._is_shown
+        for timer in self._splash_timers:
+            if is_running and not timer.isActive():
+                timer.start()
+            elif not is_running and timer.isActive():
+                timer.stop()
+
+    def _update_splash_frame(self):
+        self._update_hue()
+        self._update_piece_anim()
+        self.update()
 
     def _init_splash_graphics_params(self):
         self._grid_iter = list(
@@ -134,6 +196,7 @@ class BoardImageLabel(QtWidgets.QLabel):
         self._randoms = randoms[:self.NB_RANDOMS]
 
         self._border_size = 2
+        self._grid_layer = None
 
         self._init_width = self.sizeHint().width()
         self._init_height = self.sizeHint().height()
@@ -160,6 +223,47 @@ class BoardImageLabel(QtWidgets.QLabel):
         self._draw_logo(size=size, painter=painter)
 
     def _draw_bg_grid(self, size, painter):
+        # The dimmed grid only changes on resize or when the colors are
+        # shuffled, it is rendered once and only the hue squares are drawn
+        # on top of it every frame
+        if self._grid_layer is None or self._grid_layer.size() != size:
+            self._grid_layer = self._render_grid_layer(size=size)
+
+        painter.drawPixmap(0, 0, self._grid_layer)
+
+        qcolor = QtGui.QColor()
+        qcolor.setHsv(self._hue, 100, 50)
+        painter.setBrush(qcolor)
+        painter.setPen(qcolor)
+
+        colored = set(self._randoms) | set(self._current_band)
+        for row, column, rect in self._get_grid_rects(size=size):
+            if (row, column) in colored:
+                painter.drawRect(rect)
+
+    def _render_grid_layer(self, size):
+        pixmap = QtGui.QPixmap(size)
+        pixmap.fill(QtGui.QColor(0, 0, 0))
+        painter = QtGui.QPainter(pixmap)
+        for row, column, rect in self._get_grid_rects(size=size):
+            color = self._grid_colors[(row, column)]
+            qcolor = QtGui.QColor(*color)
+            tcolor = QtGui.QColor()
+            tcolor.setHsv(
+                qcolor.hue(),
+                qcolor.saturation(),
+                qcolor.value() / 2,
+            )
+            painter.setBrush(tcolor)
+            painter.setPen(tcolor)
+            painter.drawRect(rect)
+
+        painter.end()
+        painter = None
+
+        return pixmap
+
+    def _get_grid_rects(self, size):
         rect_data = self._get_rect_data(
             size=size,
             nb_squares=c.IMAGE.NB_SQUARES,
@@ -168,27 +272,6 @@ class BoardImageLabel(QtWidgets.QLabel):
 
         last_row, last_column = max(self._grid_iter)
         for row, column in self._grid_iter:
-            is_random = (row, column) in self._randoms
-            is_band = (row, column) in self._current_band
-            to_color = is_random or is_band
-
-            if to_color:
-                qcolor = QtGui.QColor()
-                qcolor.setHsv(self._hue, 100, 50)
-            else:
-                color = self._grid_colors[(row, column)]
-                qcolor = QtGui.QColor(*color)
-                tcolor = QtGui.QColor()
-                tcolor.setHsv(
-                    qcolor.hue(),
-                    qcolor.saturation(),
-                    qcolor.value() / 2,
-                )
-                qcolor = tcolor
-
-            painter.setBrush(qcolor)
-            painter.setPen(qcolor)
-
             draw_width = rect_data.width
             if row == last_row:
                 draw_width = rect_data.width + rect_data.extra_width
@@ -204,31 +287,37 @@ class BoardImageLabel(QtWidgets.QLabel):
                 height=rect_data.height,
                 border=self._border_size
             )
-            painter.drawRect(x, y, draw_width, draw_height)
-
-    def _draw_piece_anim(self, size, painter):
-        self._t += (4 * self._scale)
-        self._size_scale += 0.06
-        self._alpha_scale += 0.05
-
-        x1 = size.width() * 0.5
-        y1 = size.height() * 0.5
-        x2 = self._dest_x * size.width()
-        y2 = self._dest_y * size.height()
+            yield row, column, QtCore.QRect(x, y, draw_width, draw_height)
 
-        curr_x, curr_y = self._get_curr_pos_along_line(x1, y1, x2, y2, self._t)
-        dot_scale = 0.5
+    def _update_piece_anim(self):
+        step = self.SPLASH_FRAME_STEP
+        self._t += (4 * self._scale * step)
+        self._size_scale += 0.06 * step
+        self._alpha_scale += 0.05 * step
 
+        curr_x, curr_y = self._get_piece_anim_pos(size=self.size())
         out_of_bounds = (
             curr_x < 0 or
-            curr_x > size.width() or
+            curr_x > self.size().width() or
             curr_y < 0 or
-            curr_y > size.height()
+            curr_y > self.size().height()
         )
 
         if out_of_bounds:
             self._reset_piece_anim_params()
 
+    def _get_piece_anim_pos(self, size):
+        x1 = size.width() * 0.5
+        y1 = size.height() * 0.5
+        x2 = self._dest_x * size.width()
+        y2 = self._dest_y * size.height()
+
+        return self._get_curr_pos_along_line(x1, y1, x2, y2, self._t)
+
+    def _draw_piece_anim(self, size, painter):
+        curr_x, curr_y = self._get_piece_anim_pos(size=size)
+        dot_scale = 0.5
+
         for (x, y) in self._active_pixels:
             x = x - self._piece_cx  # Apply transform from center
             y = y - self._piece_cy  # Apply transform from center
@@ -298,19 +387,38 @@ class BoardImageLabel(QtWidgets.QLabel):
 
     def _draw_board(self, size, painter):
         point = QtCore.QPoint(0, 0)
-        scaled_pixmap = self.pixmap.scaled(
+        scaled_size = self._image.size().scaled(
             size,
             QtCore.Qt.KeepAspectRatio,
-            transformMode=QtCore.Qt.SmoothTransformation,
         )
 
-        point.setX((size.width() - scaled_pixmap.width()) / 2)
-        point.setY((size.height() - scaled_pixmap.height()) / 2)
+        point.setX((size.width() - scaled_size.width()) / 2)
+        point.setY((size.height() - scaled_size.height()) / 2)
+        target_rect = QtCore.QRect(point, scaled_size)
 
         painter.setRenderHint(QtGui.QPainter.TextAntialiasing)
         painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
         painter.setRenderHint(QtGui.QPainter.HighQualityAntialiasing)
-        painter.drawPixmap(point, scaled_pixmap)
+
+        if self._flip_state is not None:
+            self._apply_flip_transform(size=size, painter=painter)
+
+        # Scaling happens while painting, no intermediate pixmap is created
+        painter.drawImage(target_rect, self._image)
+
+        if self._flip_state is not None:
+            haze = QtGui.QColor(25, 25, 25, self._flip_state.haze_alpha)
+            painter.fillRect(target_rect, haze)
+
+    def _apply_flip_transform(self, size, painter):
+        # Squash and rotate the board around the center of the label, the
+        # angle is negated as QPainter rotates clockwise
+        cx = size.width() / 2
+        cy = size.height() / 2
+        painter.translate(cx, cy)
+        painter.rotate(-self._flip_state.angle)
+        painter.scale(1, self._flip_state.scale)
+        painter.translate(-cx, -cy)
 
     @staticmethod
     def _get_band(band_no):
@@ -368,10 +476,11 @@ class BoardImageLabel(QtWidgets.QLabel):
         return curr_x, curr_y
 
     def _update_hue(self):
-        self._hue += 0.7
+        self._hue += 0.7 * self.SPLASH_FRAME_STEP
         if self._hue > 359:
             self._hue = 0
 
+    def _update_background(self):
         if not self._splash_on:
             self.setStyleSheet(
                 'background-color: rgb(25, 25, 25);'
@@ -387,6 +496,7 @@ class BoardImageLabel(QtWidgets.QLabel):
         keys = list(self._grid_colors.keys())[:]
         self._grid_colors.clear()
         self._grid_colors = dict([(k, v) for k, v in zip(keys, values)])
+        self._grid_layer = None
 
     def _randomize_squares(self):
         randoms = self._grid_iter[:]
@@ -661,6 +771,7 @@ class BoardWidget(QtWidgets.QDialog):
         self._board = board
         self._board_image = imager.BoardImage(self._board)
         self._board_image.FRAME_UPDATED_SIGNAL.connect(self._animate_move)
+        self._board_image.FLIP_UPDATED_SIGNAL.connect(self._animate_flip)
         self._board_image.ANIM_FINISHED_SIGNAL.connect(self._animation_done)
         self._captured_image = imager.CapturedImage()
         self._splash_pixmap = QtGui.QPixmap(c.IMAGE.SPLASH_IMAGE_FILE_PATH)
@@ -735,6 +846,7 @@ class BoardWidget(QtWidgets.QDialog):
     def reset(self):
         self._board_image = imager.BoardImage(self._board)
         self._board_image.FRAME_UPDATED_SIGNAL.connect(self._animate_move)
+        self._board_image.FLIP_UPDATED_SIGNAL.connect(self._animate_flip)
         self._board_image.ANIM_FINISHED_SIGNAL.connect(self._animation_done)
         self._captured_image = imager.CapturedImage()
 
@@ -829,15 +941,20 @@ class BoardWidget(QtWidgets.QDialog):
     def game_over(self, winner):
         self._set_game_over(winner=winner)
 
-    def stalemate(self):
-        self._set_game_over(is_stalemate=True)
+    def stalemate(self, reason_text='STALEMATE'):
+        self._set_game_over(is_stalemate=True, reason_text=reason_text)
 
-    def _set_game_over(self, winner=None, is_stalemate=False):
+    def _set_game_over(
+            self,
+            winner=None,
+            is_stalemate=False,
+            reason_text='STALEMATE',
+    ):
         self._winner = winner
         self._is_game_over = True
 
         if is_stalemate:
-            self._captured_image.draw_stalemate()
+            self._captured_image.draw_stalemate(reason_text=reason_text)
         else:
             self._captured_image.draw_winner(winner)
 
@@ -916,11 +1033,9 @@ class BoardWidget(QtWidgets.QDialog):
 
     def _create_image_widget(self):
         widget = QtWidgets.QWidget()
-        # Create Pixmap
-        self._pixmap = QtGui.QPixmap.fromImage(self._board_image.qt_image)
 
-        # Create Label and add the pixmap
-        self._image_label = BoardImageLabel(pixmap=self._pixmap)
+        # Create Label and add the board image
+        self._image_label = BoardImageLabel(image=self._board_image.qt_image)
         self._image_label.setCursor(
             QtGui.QCursor(QtCore.Qt.PointingHandCursor)
         )
@@ -1000,6 +1115,10 @@ class BoardWidget(QtWidgets.QDialog):
     def _animate_move(self):
         self._update_image_label()
 
+    def _animate_flip(self):
+        self._image_label.flip_state = self._board_image.flip_state
+        self._image_label.update()
+
     def _animation_done(self):
         if self._show_threatened:
             self._display_threatened()
@@ -1118,8 +1237,8 @@ class BoardWidget(QtWidgets.QDialog):
 
     def _update_image_label(self):
         self._image_label.splash_on = False
-        self._pixmap = QtGui.QPixmap.fromImage(self._board_image.qt_image)
-        self._image_label.setPixmap(self._pixmap)
+        self._image_label.flip_state = self._board_image.flip_state
+        self._image_label.set_image(self._board_image.qt_image)
 
     def _update_splash(self):
         self._image_label.splash_on = True
@@ -2420,6 +2539,82 @@ class MovieGenerationThread(QtCore.QThread):
         self.quit()
 
 
+class EngineThread(QtCore.QThread):
+    """
+    Owns the engine, which is started, searches and quits on the thread
+    itself. Nothing here waits on the thread, cancel and stop only mark
+    the requests as stale and ask the search in progress to stop.
+    """
+    # Emits (request_id, best_move)
+    BEST_MOVE_SIGNAL = QtCore.Signal(tuple)
+
+    def __init__(self, engine_kwargs=None, parent=None):
+        super().__init__(parent=parent)
+        self._engine_kwargs = dict(engine_kwargs or {})
+        self._engine = None
+        self._requests = queue.Queue()
+        self._request_id = 0
+
+    @property
+    def request_id(self):
+        return self._request_id
+
+    def request_best_move(self, moves=None):
+        self._request_id += 1
+        self._requests.put((self._request_id, list(moves or [])))
+        if not self.isRunning():
+            self.start()
+
+        return self._request_id
+
+    def cancel(self):
+        # Any request issued before this point is now stale, its result (if
+        # the engine is already searching) will be dropped
+        self._request_id += 1
+        self._clear_requests()
+        self._stop_search()
+
+    def stop(self):
+        self.cancel()
+        self.requestInterruption()
+        self._requests.put(None)
+
+    def run(self):
+        self._engine = Engine(**self._engine_kwargs)
+        try:
+            while not self.isInterruptionRequested():
+                request = self._requests.get()
+                if request is None:
+                    break
+
+                request_id, moves = request
+                if request_id != self._request_id:
+                    continue
+
+                best_move = self._engine.get_best_move(moves)
+                if request_id != self._request_id:
+                    continue
+
+                self.BEST_MOVE_SIGNAL.emit((request_id, best_move))
+        finally:
+            engine, self._engine = self._engine, None
+            engine.quit()
+
+    def _stop_search(self):
+        # Only sends the stop command (or sets the flag of the native
+        # search), the search returns on the engine thread
+        engine = self._engine
+        if engine is not None:
+            engine.stop()
+
+    def _clear_requests(self):
+        while True:
+            try:
+                self._requests.get_nowait()
+            except queue.Empty:
+                break
+
+
 class MovieProgressBar(QtWidgets.QDialog):
     MAX_WIDTH = 400
     PBAR_HEIGHT = 3
@@ -0,0 +1,75 @@
+"""
+Scripted UCI engine for the tests, it does not know the rules. A search
+answers with `bestmove e2e4` (or `e7e5` when black is to move after moves
+from the start position) and reports:
+
+    score   cp 10 times the number of moves given with the position
+    nodes   the value of the Threads option, to see the options in effect
+
+The commands received are appended to the file named by FAKE_UCI_LOG,
+when it is set.
+"""
+import os
+import sys
+
+
+OPTIONS = {
+    'Threads': '1',
+    'Hash': '16',
+    'Skill Level': '20',
+}
+
+
+def _out(line):
+    sys.stdout.write(f'{line}\n')
+    sys.stdout.flush()
+
+
+def _log(line):
+    path = os.environ.get('FAKE_UCI_LOG')
+    if path is not None:
+        with open(path, 'a') as fp:
+            fp.write(line)
+
+
+def main():
+    options = dict(OPTIONS)
+    nb_moves = 0
+    for line in sys.stdin:
+        _log(line)
+        tokens = line.split()
+        if not tokens:
+            continue
+
+        command = tokens[0]
+        if command == 'uci':
+            _out('id name FakeUCI')
+            for name, default in OPTIONS.items():
+                _out(f'option name {name} type spin default {default}')
+            _out('uciok')
+        elif command == 'isready':
+            _out('readyok')
+        elif command == 'setoption':
+            name = ' '.join(tokens[2:tokens.index('value')])
+            options[name] = tokens[-1]
+        elif command == 'position':
+            moves = []
+            if 'moves' in tokens:
+                moves = tokens[tokens.index('moves') + 1:]
+            nb_moves = len(moves)
+        elif command == 'go':
+            depth = 1
+            if 'depth' in tokens:
+                depth = int(tokens[tokens.index('depth') + 1])
+            best_move = 'e7e5' if nb_moves % 2 else 'e2e4'
+            _out(
+                f'info depth {depth} score cp {nb_moves * 10} '
+                f'nodes {options["Threads"]} time 0 pv {best_move}'
+            )
+            _out(f'bestmove {best_move}')
+        elif command == 'quit':
+            break
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+
+from pychess.core import annotator
+from pychess.core.annotator import Annotator
+from pychess.core.engineer import SEARCH_RESULT
+from pychess.core.pgn import PGN2MOVES
+
+
+# Scores and best moves from the side to move, before each ply
+GAME = ['e2e4', 'e7e5', 'g1f3', 'f7f6', 'f3e5', 'f6e5']
+EVALS = [
+    (30, None, 'e2e4'),
+    (-30, None, 'e7e5'),
+    (90, None, 'g1f3'),
+    (-90, None, 'b8c6'),
+    (200, None, 'f3e5'),
+    (-200, None, 'd8e7'),
+    (600, None, 'd1h5'),
+]
+
+FOOLS_MATE = ['f2f3', 'e7e5', 'g2g4', 'd8h4']
+FOOLS_MATE_EVALS = [
+    (20, None, 'e2e4'),
+    (-20, None, 'e7e5'),
+    (0, None, 'e2e4'),
+    (None, 1, 'd8h4'),
+    (None, 0, None),
+]
+
+PGN = '''[Event "First"]
+[Site "?"]
+[Date "????.??.??"]
+[Round "1"]
+[White "A"]
+[Black "B"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 f6 3. Nxe5 fxe5 1-0
+
+[Event "Second"]
+[Site "?"]
+[Date "????.??.??"]
+[Round "2"]
+[White "C"]
+[Black "D"]
+[Result "0-1"]
+
+1. f3 e5 2. g4 Qh4# 0-1
+'''
+
+
+class _StubEngine:
+    # Answers with fixed evaluations, looked up by the moves played
+    def __init__(self, *args, **kwargs):
+        self.nb_searches = 0
+
+    def analyse(self, moves=None, depth=None, movetime=None, nodes=None):
+        self.nb_searches += 1
+        moves = list(moves or [])
+        game, evals = GAME, EVALS
+        if moves[:1] == FOOLS_MATE[:1]:
+            game, evals = FOOLS_MATE, FOOLS_MATE_EVALS
+
+        if moves != game[:len(moves)]:
+            error_msg = f'Unexpected moves {moves}'
+            raise RuntimeError(error_msg)
+
+        score, mate, best_move = evals[len(moves)]
+        return SEARCH_RESULT(
+            best_move=best_move,
+            score=score,
+            mate=mate,
+            depth=depth,
+            pv=[],
+            nodes=0,
+            nps=0,
+            time=0,
+        )
+
+    def quit(self):
+        pass
+
+
+class TestAnnotator(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.pgn_path = os.path.join(self.directory, 'games.pgn')
+        with open(self.pgn_path, 'w') as fp:
+            fp.write(PGN)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_annotate_moves(self):
+        annotations = Annotator(depth=1).annotate_moves(_StubEngine(), GAME)
+        self.assertEqual(
+            [a.san for a in annotations],
+            ['e4', 'e5', 'Nf3', 'f6', 'Nxe5', 'fxe5'],
+        )
+        self.assertEqual(
+            [a.eval_text for a in annotations],
+            ['0.30', '0.90', '0.90', '2.00', '2.00', '6.00'],
+        )
+        self.assertEqual(
+            [a.nag for a in annotations],
+            [None, '$6', None, '$2', None, '$4'],
+        )
+        self.assertEqual(
+            [a.comment for a in annotations],
+            [
+                None,
+                'Inaccuracy',
+                None,
+                'Mistake. Best was Nc6.',
+                None,
+                'Blunder. Best was Qe7.',
+            ],
+        )
+
+    def test_mate(self):
+        annotations = Annotator(depth=1).annotate_moves(
+            _StubEngine(),
+            FOOLS_MATE,
+        )
+        self.assertEqual(annotations[2].eval_text, '#-1')
+        self.assertEqual(annotations[2].nag, '$4')
+        self.assertEqual(annotations[2].comment, 'Blunder. Best was e4.')
+        self.assertEqual(annotations[3].san, 'Qh4#')
+        self.assertIsNone(annotations[3].nag)
+
+    def test_game_text(self):
+        annotations = Annotator(depth=1).annotate_moves(
+            _StubEngine(),
+            GAME[:4],
+        )
+        text = Annotator._game_text('[Event "First"]', annotations, '*')
+        self.assertEqual(
+            text,
+            '[Event "First"]\n\n'
+            '1. e4 { [%eval 0.30] } 1... e5 $6 { [%eval 0.90] Inaccuracy } '
+            '2. Nf3 { [%eval\n0.90] } 2... f6 $2 { [%eval 2.00] Mistake. '
+            'Best was Nc6. } *',
+        )
+
+    def test_get_moves_twice(self):
+        pgn = PGN2MOVES(pgn_file_path=self.pgn_path)
+        first = pgn.get_moves(0)
+        self.assertEqual(pgn.get_moves(1)[0][0].address, 'f2')
+
+        # Every game is resolved from the start position
+        self.assertEqual(pgn.get_moves(0), first)
+
+    def test_annotate(self):
+        output_path = os.path.join(self.directory, 'annotated.pgn')
+        checkpoint_path = f'{output_path}.checkpoint'
+        with unittest.mock.patch.object(annotator, 'Engine', _StubEngine):
+            nb_games = Annotator(depth=1, nb_engines=2).annotate(
+                self.pgn_path,
+                output_path,
+            )
+        self.assertEqual(nb_games, 2)
+
+        with open(output_path) as fp:
+            text = fp.read()
+        self.assertIn('3... fxe5 $4 { [%eval 6.00] Blunder. Best was', text)
+        self.assertIn('Qh4# { [%eval #0] } 0-1', text)
+
+        with open(checkpoint_path) as fp:
+            indices = sorted(json.loads(line)['index'] for line in fp)
+        self.assertEqual(indices, [0, 1])
+
+        # Games already in the checkpoint are not analysed again
+        with unittest.mock.patch.object(annotator, 'Engine', _StubEngine):
+            nb_games = Annotator(depth=1).annotate(
+                self.pgn_path,
+                output_path,
+            )
+        self.assertEqual(nb_games, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
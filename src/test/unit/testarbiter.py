@@ -0,0 +1,200 @@
+import math
+import os
+import shutil
+import tempfile
+import unittest
+
+
+from pychess.core import arbiter
+from pychess.core.arbiter import (
+    GAME_RECORD,
+    PLAYER,
+    Tournament,
+    elo_estimate,
+    game_pgn,
+)
+from pychess.core.gamer import Game
+from pychess.core.positioner import Position
+from pychess import constant as c
+
+
+def _native(name):
+    return PLAYER(name=name, engine_type=c.EngineType.native, depth=1)
+
+
+def _play(moves, fen=None):
+    game = Game()
+    position = Position() if fen is None else Position(fen)
+    if fen is not None:
+        game.set_fen(fen)
+    for uci in moves:
+        game.move((uci, None))
+        position.push_uci(uci)
+
+    return game, position
+
+
+class TestArbiter(unittest.TestCase):
+    def test_score_to_elo(self):
+        self.assertEqual(arbiter._score_to_elo(0.5), 0)
+        self.assertAlmostEqual(arbiter._score_to_elo(0.75), 190.85, 2)
+        self.assertAlmostEqual(arbiter._score_to_elo(0.25), -190.85, 2)
+        self.assertEqual(arbiter._score_to_elo(0), -math.inf)
+        self.assertEqual(arbiter._score_to_elo(1), math.inf)
+
+    def test_elo_estimate(self):
+        self.assertEqual(elo_estimate(0, 0, 0), (0.0, math.inf, 0.5))
+
+        elo, margin, los = elo_estimate(30, 0, 10)
+        self.assertAlmostEqual(elo, 190.85, 2)
+        self.assertAlmostEqual(margin, 135.58, 2)
+        self.assertAlmostEqual(los, 0.9992, 4)
+
+        # The same score with draws is more certain
+        elo, margin, los = elo_estimate(20, 20, 0)
+        self.assertAlmostEqual(elo, 190.85, 2)
+        self.assertAlmostEqual(margin, 73.68, 2)
+
+        # Too few games to bound the difference
+        elo, margin, los = elo_estimate(3, 0, 1)
+        self.assertEqual(margin, math.inf)
+        self.assertAlmostEqual(los, 0.8413, 4)
+
+        elo, margin, los = elo_estimate(2, 0, 0)
+        self.assertEqual((elo, margin), (math.inf, math.inf))
+        self.assertAlmostEqual(los, 0.9214, 4)
+
+    def test_match_stats(self):
+        records = [
+            GAME_RECORD(0, 'a', 'b', '1-0', 'checkmate', None, []),
+            GAME_RECORD(1, 'b', 'a', '1-0', 'checkmate', None, []),
+            GAME_RECORD(2, 'a', 'b', '1/2-1/2', 'repetition', None, []),
+            GAME_RECORD(3, 'b', 'a', '0-1', 'checkmate', None, []),
+            GAME_RECORD(4, 'a', 'c', '0-1', 'checkmate', None, []),
+        ]
+        stats = Tournament.match_stats(records, 'a', 'b')
+        self.assertEqual(stats[:4], (2, 1, 1, 2.5))
+        self.assertEqual(stats[4:], elo_estimate(2, 1, 1))
+
+        stats = Tournament.match_stats(records, 'b', 'a')
+        self.assertEqual(stats[:4], (1, 1, 2, 1.5))
+
+    def test_create_jobs(self):
+        players = [_native('a'), _native('b'), _native('c')]
+        with self.assertRaises(ValueError):
+            Tournament(players[:1])
+        with self.assertRaises(ValueError):
+            Tournament([players[0], players[0]])
+
+        jobs = Tournament(players, nb_games=4)._create_jobs()
+        self.assertEqual([job[0] for job in jobs], list(range(12)))
+
+        pairings = [(white.name, black.name) for _, white, black, *_ in jobs]
+        self.assertEqual(
+            pairings,
+            [('a', 'b'), ('b', 'a')] * 2 +
+            [('a', 'c'), ('c', 'a')] * 2 +
+            [('b', 'c'), ('c', 'b')] * 2,
+        )
+        self.assertTrue(all(job[3] is None for job in jobs))
+
+        # Both colors play the same chess960 position
+        jobs = Tournament(players, nb_games=4, chess960=True)._create_jobs()
+        orders = [job[3] for job in jobs]
+        for index in range(0, len(orders), 2):
+            self.assertIsNotNone(orders[index])
+            self.assertEqual(orders[index], orders[index + 1])
+
+    def test_game_over_result(self):
+        game, position = _play(['f2f3', 'e7e5', 'g2g4', 'd8h4'])
+        self.assertEqual(
+            arbiter._game_over_result(game, position),
+            ('0-1', 'checkmate'),
+        )
+
+        game, position = _play(['g1f3', 'g8f6', 'f3g1', 'f6g8'] * 2)
+        self.assertEqual(
+            arbiter._game_over_result(game, position),
+            ('1/2-1/2', 'repetition'),
+        )
+
+        game, position = _play(['b6c7'], fen='k7/8/KQ6/8/8/8/8/8 w - - 0 1')
+        self.assertEqual(
+            arbiter._game_over_result(game, position),
+            ('1/2-1/2', 'stalemate'),
+        )
+
+    def test_game_pgn(self):
+        record = GAME_RECORD(
+            index=2,
+            white='a',
+            black='b',
+            result='0-1',
+            termination='checkmate',
+            fen=None,
+            moves=['f2f3', 'e7e5', 'g2g4', 'd8h4'],
+        )
+        self.assertEqual(
+            game_pgn(record),
+            '[Event "pychess tournament"]\n'
+            '[Round "3"]\n'
+            '[White "a"]\n'
+            '[Black "b"]\n'
+            '[Result "0-1"]\n'
+            '[Termination "checkmate"]\n'
+            '\n'
+            '1. f3 e5 2. g4 Qh4# 0-1'
+        )
+
+        fen = arbiter.chess_960_fen([1, 2, 0, 3, 4, 6, 7, 5])
+        self.assertEqual(
+            fen,
+            'brnqkrbn/pppppppp/8/8/8/8/PPPPPPPP/BRNQKRBN w - - 0 1',
+        )
+        record = record._replace(fen=fen, moves=['c1d3'], result='*')
+        self.assertEqual(
+            game_pgn(record).split('\n')[-4:],
+            [
+                '[SetUp "1"]',
+                f'[FEN "{fen}"]',
+                '',
+                '1. Nd3 *',
+            ],
+        )
+
+    def test_tournament(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        pgn_path = os.path.join(directory, 'games.pgn')
+
+        tournament = Tournament(
+            [_native('a'), _native('b')],
+            nb_games=2,
+            nb_workers=1,
+            max_plies=6,
+        )
+        records = tournament.run(pgn_path=pgn_path)
+        self.assertEqual([r.index for r in records], [0, 1])
+        self.assertEqual(
+            [(r.white, r.black) for r in records],
+            [('a', 'b'), ('b', 'a')],
+        )
+        for record in records:
+            self.assertEqual(len(record.moves), 6)
+            self.assertEqual(
+                (record.result, record.termination),
+                ('1/2-1/2', 'max plies'),
+            )
+
+        with open(pgn_path) as fp:
+            self.assertEqual(
+                fp.read(),
+                '\n\n'.join(game_pgn(r) for r in records) + '\n',
+            )
+
+        stats = Tournament.match_stats(records, 'a', 'b')
+        self.assertEqual(stats[:4], (0, 2, 0, 1.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+import unittest
+
+
+from pychess.core import attacker
+from pychess.element.boarder import Board
+from pychess.element.piecer import Piece
+from pychess.element.squarer import Square
+from pychess import constant as c
+
+
+def _board(pieces):
+    board = Board()
+    board.clear()
+    for address, (piece_type, color) in pieces.items():
+        order = sum(
+            1
+            for p in board.pieces
+            if p.type == piece_type and p.color == color
+        )
+        board.add_piece(Piece(piece_type, color, order), Square(address))
+    return board
+
+
+class TestAttacker(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.k = c.PieceType.king
+        cls.q = c.PieceType.queen
+        cls.r = c.PieceType.rook
+        cls.n = c.PieceType.knight
+        cls.p = c.PieceType.pawn
+        cls.wt = c.Color.white
+        cls.bl = c.Color.black
+
+    def test_start_position(self):
+        b = Board()
+        self.assertTrue(attacker.has_legal_move(b, self.wt))
+        self.assertTrue(attacker.has_legal_move(b, self.bl))
+        self.assertEqual(attacker.checkers(b, self.wt), [])
+        self.assertEqual(attacker.pins(b, self.wt), {})
+
+    def test_is_attacked(self):
+        b = Board()
+        self.assertTrue(attacker.is_attacked(b, Square('f3'), self.wt))
+        self.assertFalse(attacker.is_attacked(b, Square('e4'), self.wt))
+        self.assertTrue(attacker.is_attacked(b, Square('e6'), self.bl))
+
+    def test_mate(self):
+        b = _board(
+            {
+                'a8': (self.k, self.bl),
+                'b7': (self.q, self.wt),
+                'c6': (self.k, self.wt),
+            }
+        )
+        self.assertEqual(attacker.checkers(b, self.bl), [Square('b7')])
+        self.assertFalse(attacker.has_legal_move(b, self.bl))
+
+    def test_check_blocked(self):
+        b = _board(
+            {
+                'g8': (self.k, self.bl),
+                'f7': (self.p, self.bl),
+                'g7': (self.p, self.bl),
+                'h7': (self.p, self.bl),
+                'a6': (self.n, self.bl),
+                'e1': (self.r, self.wt),
+                'e8': (self.r, self.wt),
+                'g1': (self.k, self.wt),
+            }
+        )
+        self.assertFalse(attacker.has_legal_move(b, self.bl))
+
+        # With the rook on d8 the knight can block on e8
+        b.move(Square('a6'), Square('c7'))
+        b.move(Square('e8'), Square('d8'))
+        self.assertTrue(attacker.has_legal_move(b, self.bl))
+
+    def test_stalemate(self):
+        b = _board(
+            {
+                'a8': (self.k, self.bl),
+                'b6': (self.q, self.wt),
+                'c1': (self.k, self.wt),
+            }
+        )
+        self.assertEqual(attacker.checkers(b, self.bl), [])
+        self.assertFalse(attacker.has_legal_move(b, self.bl))
+
+    def test_double_check(self):
+        b = _board(
+            {
+                'e8': (self.k, self.bl),
+                'd8': (self.q, self.bl),
+                'e1': (self.r, self.wt),
+                'f6': (self.n, self.wt),
+                'd7': (self.p, self.bl),
+                'f7': (self.p, self.bl),
+                'f8': (self.r, self.bl),
+                'a1': (self.k, self.wt),
+            }
+        )
+
+        # The queen could take the knight but the rook still gives check
+        self.assertEqual(len(attacker.checkers(b, self.bl)), 2)
+        self.assertFalse(attacker.has_legal_move(b, self.bl))
+
+    def test_pins(self):
+        b = _board(
+            {
+                'e1': (self.k, self.wt),
+                'e4': (self.r, self.wt),
+                'e8': (self.r, self.bl),
+                'h8': (self.k, self.bl),
+            }
+        )
+        pins = attacker.pins(b, self.wt)
+        self.assertEqual(list(pins), [(4, 3)])
+        self.assertEqual(pins[(4, 3)], {(4, y) for y in range(1, 8)})
+
+        self.assertFalse(
+            attacker.leaves_king_attacked(
+                b, Square('e4'), Square('e8'), self.wt,
+            )
+        )
+        self.assertTrue(
+            attacker.leaves_king_attacked(
+                b, Square('e4'), Square('a4'), self.wt,
+            )
+        )
+
+    def test_en_passant_discovered_check(self):
+        b = _board(
+            {
+                'a5': (self.k, self.wt),
+                'b5': (self.p, self.wt),
+                'c7': (self.p, self.bl),
+                'h5': (self.r, self.bl),
+                'h8': (self.k, self.bl),
+            }
+        )
+        b.move(Square('c7'), Square('c5'))
+
+        # Taking en passant empties the rank between the king and the rook
+        self.assertTrue(
+            attacker.leaves_king_attacked(
+                b, Square('b5'), Square('c6'), self.wt,
+            )
+        )
+        self.assertFalse(
+            attacker.leaves_king_attacked(
+                b, Square('b5'), Square('b6'), self.wt,
+            )
+        )
+        self.assertFalse(attacker.can_take_en_passant(b, self.wt))
+
+    def test_can_take_en_passant(self):
+        b = Board()
+        b.move(Square('e2'), Square('e4'))
+        self.assertFalse(attacker.can_take_en_passant(b, self.bl))
+
+        b = _board(
+            {
+                'e1': (self.k, self.wt),
+                'e2': (self.p, self.wt),
+                'd4': (self.p, self.bl),
+                'e8': (self.k, self.bl),
+            }
+        )
+        b.move(Square('e2'), Square('e4'))
+        self.assertTrue(attacker.can_take_en_passant(b, self.bl))
+
+
+if __name__ == '__main__':
+    unittest.main()
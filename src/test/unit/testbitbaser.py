@@ -0,0 +1,133 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+
+from pychess.core import bitbaser
+from pychess.core.bitbaser import Bitbases, BitbaseGenerator
+from pychess.core.gamer import Game
+from pychess import constant as c
+
+
+# Generating a table takes a while, it is shared by all the tests
+BITBASES = None
+KQK_DATA = None
+
+
+def setUpModule():
+    global BITBASES, KQK_DATA
+    directory = tempfile.mkdtemp()
+    try:
+        BITBASES = Bitbases(directory=directory)
+    finally:
+        shutil.rmtree(directory)
+
+    KQK_DATA = BitbaseGenerator('KQK', bitbases=BITBASES).generate()
+    BITBASES.add('KQK', KQK_DATA)
+
+
+def _square(address):
+    return (int(address[1]) - 1) * 8 + ord(address[0]) - ord('a')
+
+
+def _pieces(white, black):
+    return [
+        (is_white, address[0], _square(address[1:]))
+        for is_white, pieces in ((True, white), (False, black))
+        for address in pieces
+    ]
+
+
+class TestBitbaser(unittest.TestCase):
+    def _probe(self, white, black, white_to_move):
+        return BITBASES.probe_pieces(_pieces(white, black), white_to_move)
+
+    def test_kqk(self):
+        # Mated, taking the loose queen and stalemated
+        self.assertEqual(
+            self._probe(['Kb6', 'Qb7'], ['Ka8'], False),
+            bitbaser.LOSS,
+        )
+        self.assertEqual(
+            self._probe(['Kh8', 'Qb2'], ['Ka1'], False),
+            bitbaser.DRAW,
+        )
+        self.assertEqual(
+            self._probe(['Kc1', 'Qb6'], ['Ka8'], False),
+            bitbaser.DRAW,
+        )
+
+        self.assertEqual(
+            self._probe(['Ke1', 'Qd1'], ['Ke8'], True),
+            bitbaser.WIN,
+        )
+        self.assertEqual(
+            self._probe(['Ke1', 'Qd1'], ['Ke2'], True),
+            bitbaser.ILLEGAL,
+        )
+
+        # Black is the strong side
+        self.assertEqual(
+            self._probe(['Ke1'], ['Ke8', 'Qd8'], False),
+            bitbaser.WIN,
+        )
+
+    def test_missing_tables(self):
+        self.assertEqual(
+            self._probe(['Ke1', 'Bc1'], ['Ke8'], True),
+            bitbaser.DRAW,
+        )
+        self.assertIsNone(self._probe(['Ke1', 'Ra1'], ['Ke8'], True))
+        self.assertIsNone(self._probe(['Ke1', 'Qd1', 'Pa2'], ['Ke8'], True))
+
+        # Promotions need the KQK and KRK tables
+        with self.assertRaises(RuntimeError):
+            BitbaseGenerator('KPK', bitbases=BITBASES).generate()
+
+    def test_save(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        generator = BitbaseGenerator('KQK')
+        path = os.path.join(directory, f'KQK{bitbaser.FILE_EXTENSION}')
+        generator.save(path, data=KQK_DATA)
+        self.assertEqual(os.path.getsize(path), generator.size // 4)
+
+        bitbases = Bitbases(directory=directory)
+        self.assertEqual(bitbases.signatures, ['KQK'])
+        self.assertEqual(
+            bitbases.probe_pieces(_pieces(['Kb6', 'Qb7'], ['Ka8']), False),
+            bitbaser.LOSS,
+        )
+
+    def test_adjudication(self):
+        reasons = []
+        game = Game(bitbases=BITBASES)
+        game.DRAW_SIGNAL.connect(reasons.append)
+        game.set_fen('7K/8/8/8/8/2Q5/8/k7 w - - 0 1')
+
+        # The queen is given away
+        game.move(('c3b2', None))
+        self.assertTrue(game.is_game_over)
+        self.assertIsNone(game.winner)
+        self.assertEqual(game.draw_reason, c.DrawReason.adjudication)
+        self.assertEqual(reasons, [c.DrawReason.adjudication])
+
+        winners = []
+        game = Game(bitbases=BITBASES)
+        game.MATE_SIGNAL.connect(winners.append)
+        game.set_fen('7K/8/8/8/8/2Q5/8/k7 w - - 0 1')
+        game.move(('c3d4', None))
+        self.assertTrue(game.is_game_over)
+        self.assertEqual(game.winner, c.Color.white)
+        self.assertEqual(winners, [c.Color.white])
+
+        # Without bitbases the game goes on
+        game = Game()
+        game.set_fen('7K/8/8/8/8/2Q5/8/k7 w - - 0 1')
+        game.move(('c3d4', None))
+        self.assertFalse(game.is_game_over)
+
+
+if __name__ == '__main__':
+    unittest.main()
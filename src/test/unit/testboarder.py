@@ -242,6 +242,123 @@ class TestBoarder(unittest.TestCase):
         b.reverse = reverse_copy
         self.assertEqual(b.reverse, reverse_copy)
 
+    def test_get_pieces(self):
+        b = Board()
+        for color in c.Color:
+            expected_result = sorted(
+                p for p in self.data.values() if p.color == color
+            )
+            self.assertEqual(sorted(b.get_pieces(color)), expected_result)
+
+            knights = b.get_pieces(color, c.PieceType.knight)
+            self.assertEqual(
+                sorted(knights),
+                [
+                    Piece(c.PieceType.knight, color, order=0),
+                    Piece(c.PieceType.knight, color, order=1),
+                ],
+            )
+
+        # Captures and promotions keep the index up to date
+        b.move(Square('e2'), Square('e7'))
+        b.promote(
+            Piece(c.PieceType.queen, c.Color.white, order=1),
+            Square('e7'),
+        )
+        self.assertEqual(len(b.get_pieces(c.Color.black)), 15)
+        self.assertEqual(
+            len(b.get_pieces(c.Color.white, c.PieceType.pawn)),
+            7,
+        )
+        self.assertEqual(
+            len(b.get_pieces(c.Color.white, c.PieceType.queen)),
+            2,
+        )
+
+    def test_king_square(self):
+        b = Board()
+        self.assertEqual(b.king_square(c.Color.white), Square('e1'))
+        self.assertEqual(b.king_square(c.Color.black), Square('e8'))
+
+        b.castle(c.Color.white, is_short_castle=True)
+        self.assertEqual(b.king_square(c.Color.white), Square('g1'))
+
+        b.reverse = self.reverse
+        self.assertEqual(b.king_square(c.Color.white), Square('e1'))
+
+        b.clear()
+        self.assertIsNone(b.king_square(c.Color.black))
+
+    def test_evaluation(self):
+        b = Board()
+        self.assertEqual(b.evaluation, (39, 39, 0))
+
+        # Mirrored moves keep the score even
+        for src, dst in [
+                ('e2', 'e4'), ('e7', 'e5'),
+                ('g1', 'f3'), ('g8', 'f6'),
+                ('f1', 'c4'), ('f8', 'c5'),
+        ]:
+            b.move(Square(src), Square(dst))
+        b.castle(c.Color.white, is_short_castle=True)
+        b.castle(c.Color.black, is_short_castle=True)
+        self.assertEqual(b.score, 0)
+
+        b.move(Square('d1'), Square('d7'))
+        self.assertEqual(b.material(c.Color.black), 38)
+        self.assertGreater(b.score, 0)
+
+        b.move(Square('h2'), Square('h8'))
+        b.promote(
+            Piece(c.PieceType.queen, c.Color.white, order=1),
+            Square('h8'),
+        )
+        self.assertEqual(b.material(c.Color.white), 47)
+        self.assertEqual(b.material(c.Color.black), 38)
+
+        b.reverse = self.reverse
+        self.assertEqual(b.evaluation, (39, 39, 0))
+
+    def test_fen(self):
+        start = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR'
+        b = Board()
+        self.assertEqual(b.fen, start)
+
+        b.move(Square('e2'), Square('e4'))
+        fen = 'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR'
+        self.assertEqual(b.fen, fen)
+
+        b.set_fen(start)
+        self.assertEqual(b.data, Board().data)
+        self.assertIsNone(b.pawn_two_square_dst)
+        self.assertEqual(b.evaluation, (39, 39, 0))
+
+        b.set_fen(fen, en_passant='e3', player=c.Color.black)
+        self.assertEqual(b.fen, fen)
+        self.assertEqual(b.pawn_two_square_dst, Square('e4'))
+
+        # No pawn has just been pushed over the target for the side to move
+        for placement, en_passant, player in [
+                (fen, 'e3', c.Color.white),
+                (fen, 'd3', c.Color.black),
+                (start, 'e3', c.Color.black),
+                ('rnbqkbnr/pppppppp/8/8/4P3/4P3/PPP2PPP/RNBQKBNR', 'e3',
+                 c.Color.black),
+                ('rnbqkbnr/pppppppp/8/8/4P3/8/PPPPPPPP/RNBQKBNR', 'e3',
+                 c.Color.black),
+        ]:
+            with self.assertRaises(ValueError):
+                b.set_fen(placement, en_passant=en_passant, player=player)
+
+        for placement in [
+                'rnbqkbnr/pppppppp/8/8/8/PPPPPPPP/RNBQKBNR',
+                'rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR',
+                'rnbqkbnr/ppppxppp/8/8/8/8/PPPPPPPP/RNBQKBNR',
+                'rnbq1bnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR',
+        ]:
+            with self.assertRaises(ValueError):
+                b.set_fen(placement)
+
     def test_move_hint_1(self):
         b = Board()
         expected_hints = {
@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+
+from pychess.core.booker import BOOK_ENTRY, OpeningBook, polyglot_key
+from pychess.core.positioner import Position
+
+
+# Reference keys of the Polyglot book format
+KEYS = [
+    ([], 0x463b96181691fc9c),
+    (['e2e4'], 0x823c9b50fd114196),
+    (['e2e4', 'd7d5'], 0x0756b94461c50fb0),
+    (['e2e4', 'd7d5', 'e4e5'], 0x662fafb965db29d4),
+    (['e2e4', 'd7d5', 'e4e5', 'f7f5'], 0x22a48b5a8e47ff78),
+    (['e2e4', 'd7d5', 'e4e5', 'f7f5', 'e1e2'], 0x652a607ca3f242c1),
+    (['e2e4', 'd7d5', 'e4e5', 'f7f5', 'e1e2', 'e8f7'], 0x00fdd303c946bdd9),
+    (['a2a4', 'b7b5', 'h2h4', 'b5b4', 'c2c4'], 0x3c8123ea7b067637),
+    (
+        ['a2a4', 'b7b5', 'h2h4', 'b5b4', 'c2c4', 'b4c3', 'a1a3'],
+        0x5c3f9b829b279560,
+    ),
+]
+
+
+def _position(moves=None, fen=None):
+    position = Position() if fen is None else Position(fen)
+    for move in moves or []:
+        position.push_uci(move)
+
+    return position
+
+
+def _encode(uci):
+    # to file, to rank, from file, from rank and promotion, 3 bits each
+    from_file, from_rank = ord(uci[0]) - ord('a'), int(uci[1]) - 1
+    to_file, to_rank = ord(uci[2]) - ord('a'), int(uci[3]) - 1
+    promotion = ' nbrq'.index(uci[4]) if len(uci) > 4 else 0
+    return (
+        to_file |
+        to_rank << 3 |
+        from_file << 6 |
+        from_rank << 9 |
+        promotion << 12
+    )
+
+
+class TestBooker(unittest.TestCase):
+    CASTLING_FEN = 'r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1'
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'book.bin')
+
+        entries = [
+            (polyglot_key(_position()), 'e2e4', 10),
+            (polyglot_key(_position()), 'd2d4', 5),
+            (polyglot_key(_position(['e2e4'])), 'c7c5', 1),
+            (polyglot_key(_position(fen=self.CASTLING_FEN)), 'e1h1', 1),
+        ]
+        with open(self.path, 'wb') as fp:
+            for key, uci, weight in sorted(entries):
+                fp.write(BOOK_ENTRY.pack(key, _encode(uci), weight, 0))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_polyglot_key(self):
+        for moves, key in KEYS:
+            self.assertEqual(polyglot_key(_position(moves)), key, moves)
+
+    def test_get_moves(self):
+        with OpeningBook(self.path) as book:
+            self.assertEqual(len(book), 4)
+            self.assertEqual(
+                sorted(book.get_moves(_position())),
+                [('d2d4', 5), ('e2e4', 10)],
+            )
+            self.assertEqual(
+                book.get_moves(_position(['e2e4'])),
+                [('c7c5', 1)],
+            )
+            self.assertEqual(book.get_moves(_position(['d2d4'])), [])
+
+            # Castling is stored as the king taking its own rook
+            position = _position(fen=self.CASTLING_FEN)
+            self.assertEqual(book.get_moves(position), [('e1g1', 1)])
+
+    def test_get_move(self):
+        with OpeningBook(self.path) as book:
+            self.assertEqual(book.get_move(_position(), best=True), 'e2e4')
+            self.assertIn(book.get_move(_position()), ('e2e4', 'd2d4'))
+            self.assertIsNone(book.get_move(_position(['d2d4'])))
+
+    def test_empty_book(self):
+        open(self.path, 'wb').close()
+        with OpeningBook(self.path) as book:
+            self.assertEqual(len(book), 0)
+            self.assertIsNone(book.get_move(_position()))
+
+
+if __name__ == '__main__':
+    unittest.main()
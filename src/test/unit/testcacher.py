@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+
+from pychess.core.cacher import EvalCache
+
+
+class TestCacher(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'evals.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_depth(self):
+        cache = EvalCache()
+        cache.put('a', 5, ['e2e4', 30])
+        self.assertEqual(cache.get('a', 5), ['e2e4', 30])
+        self.assertEqual(cache.get('a', 3), ['e2e4', 30])
+        self.assertIsNone(cache.get('a', 6))
+        self.assertIsNone(cache.get('b', 1))
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+        # A shallower result does not replace a deeper one
+        cache.put('a', 3, ['d2d4', 10])
+        self.assertEqual(cache.get('a', 1), ['e2e4', 30])
+
+        cache.put('a', 8, ['c2c4', 20])
+        self.assertEqual(cache.get('a', 8), ['c2c4', 20])
+
+    def test_lru(self):
+        cache = EvalCache(max_size=2)
+        cache.put('a', 1, 'a')
+        cache.put('b', 1, 'b')
+        cache.get('a', 1)
+        cache.put('c', 1, 'c')
+
+        # b was the least recently used
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b', 1))
+        self.assertEqual(cache.get('a', 1), 'a')
+        self.assertEqual(cache.get('c', 1), 'c')
+
+    def test_sqlite(self):
+        cache = EvalCache(path=self.path, max_size=1)
+        cache.put('a', 4, ['e2e4', 30])
+        cache.put('b', 2, ['d2d4', 10])
+
+        # Evicted from memory, read back from the file
+        self.assertEqual(cache.get('a', 4), ['e2e4', 30])
+        cache.put('a', 2, ['g1f3', 0])
+        cache.close()
+
+        cache = EvalCache(path=self.path)
+        self.assertEqual(cache.get('a', 4), ['e2e4', 30])
+        self.assertEqual(cache.get('b', 2), ['d2d4', 10])
+        cache.put('b', 6, ['c2c4', 20])
+        cache.flush()
+
+        other = EvalCache(path=self.path)
+        self.assertEqual(other.get('b', 6), ['c2c4', 20])
+        other.close()
+
+        cache.clear()
+        self.assertIsNone(cache.get('a', 1))
+        cache.close()
+
+    def test_batched_commits(self):
+        cache = EvalCache(path=self.path)
+        other = EvalCache(path=self.path)
+        for index in range(EvalCache.COMMIT_EVERY - 1):
+            cache.put(str(index), 1, index)
+        self.assertIsNone(other.get('0', 1))
+
+        cache.put('last', 1, 'last')
+        self.assertEqual(other.get('0', 1), 0)
+        self.assertEqual(other.get('last', 1), 'last')
+
+        cache.close()
+        other.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,265 @@
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+
+from pychess.core.cacher import EvalCache
+from pychess.core.engineer import Engine, EnginePool, POSITION
+from pychess import constant as c
+
+
+FAKE_UCI = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    'fakeuci.py',
+)
+
+
+def _install_fake_engine():
+    # The engine is looked up by name in the PATH
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, c.APP.STOCKFISH_EXE_NAME)
+    with open(path, 'w') as fp:
+        fp.write(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_UCI}"\n')
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+
+    os.environ['PATH'] = os.pathsep.join([directory, os.environ['PATH']])
+    return directory
+
+
+class TestEnginePool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.path = os.environ['PATH']
+        cls.directory = _install_fake_engine()
+        cls.pool = EnginePool(nb_engines=2, depth=3)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+        os.environ['PATH'] = cls.path
+        shutil.rmtree(cls.directory)
+
+    def _check(self, positions):
+        analyses = sorted(
+            self.pool.analyse(positions),
+            key=lambda a: a.index,
+        )
+        self.assertEqual([a.index for a in analyses], list(range(3)))
+        for analysis, moves in zip(analyses, positions):
+            self.assertEqual(analysis.position.moves, moves)
+            self.assertEqual(analysis.result.score, 10 * len(moves))
+            self.assertEqual(analysis.result.depth, 3)
+
+    def test_analyse(self):
+        positions = [[], ['e2e4'], ['e2e4', 'e7e5']]
+        self._check(positions)
+
+        fen = 'k7/8/2K5/8/8/8/8/1Q6 w - - 0 1'
+        analyses = list(self.pool.analyse([POSITION(moves=[], fen=fen)]))
+        self.assertEqual(analyses[0].position.fen, fen)
+        self.assertEqual(analyses[0].result.best_move, 'e2e4')
+
+    def test_error(self):
+        positions = [['e2e4']] * 4 + [['xx']] + [['d2d4']] * 4
+        with self.assertRaises(RuntimeError):
+            list(self.pool.analyse(positions))
+
+        # Nothing of the failed batch shows up in the next one
+        self._check([['g1f3'], [], ['g1f3', 'g8f6']])
+
+    def test_stop_iterating(self):
+        analyses = self.pool.analyse([['e2e4']] * 8)
+        next(analyses)
+        analyses.close()
+
+        self._check([['c2c4'], [], ['c2c4', 'c7c5']])
+
+    def test_concurrent_calls(self):
+        # Each caller only gets the results of its own positions
+        results = {}
+
+        def analyse(name, positions):
+            results[name] = sorted(
+                (a.index, a.position.moves, a.result.score)
+                for a in self.pool.analyse(positions)
+            )
+
+        positions = {
+            'first': [['e2e4']] * 6,
+            'second': [['d2d4', 'd7d5']] * 6,
+        }
+        threads = [
+            threading.Thread(target=analyse, args=item)
+            for item in positions.items()
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+
+        for name, moves in positions.items():
+            self.assertEqual(
+                results[name],
+                [
+                    (index, m, 10 * len(m))
+                    for index, m in enumerate(moves)
+                ],
+            )
+
+
+class TestEngineOptions(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.path = os.environ['PATH']
+        cls.directory = _install_fake_engine()
+
+    @classmethod
+    def tearDownClass(cls):
+        os.environ['PATH'] = cls.path
+        shutil.rmtree(cls.directory)
+
+    def setUp(self):
+        self.engine = Engine(hash_size=32, depth=1)
+        self.addCleanup(self.engine.quit)
+
+    def test_call_options_reset(self):
+        self.assertEqual(self.engine.analyse(threads=2).nodes, 2)
+        self.assertEqual(self.engine.options, {'Hash': 32, 'Threads': 2})
+
+        # The engine default is back for the next call
+        self.assertEqual(self.engine.analyse().nodes, 1)
+        self.assertEqual(self.engine.options, {'Hash': 32})
+
+        # Instance options are kept, they can be overridden for a call
+        self.engine.analyse(hash_size=64)
+        self.assertEqual(self.engine.options, {'Hash': 64})
+        self.engine.analyse()
+        self.assertEqual(self.engine.options, {'Hash': 32})
+
+    def test_cache(self):
+        engine = Engine(cache=EvalCache(), depth=1)
+        self.addCleanup(engine.quit)
+
+        # A search with the default options is not served the result of
+        # a search with other options
+        self.assertEqual(engine.analyse(threads=2).nodes, 2)
+        self.assertEqual(engine.analyse().nodes, 1)
+        self.assertEqual(len(engine.cache), 2)
+
+    def test_defaults(self):
+        self.assertEqual(
+            self.engine._engine.defaults,
+            {'Threads': '1', 'Hash': '16', 'Skill Level': '20'},
+        )
+
+        engine = Engine(engine_type=c.EngineType.native, depth=1)
+        self.addCleanup(engine.quit)
+        searcher = engine._engine._searcher
+        tt_size = searcher.tt_size
+        engine.analyse(hash_size=1)
+        self.assertLess(searcher.tt_size, tt_size)
+        engine.analyse()
+        self.assertEqual(searcher.tt_size, tt_size)
+
+
+class TestEngineSession(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.path = os.environ['PATH']
+        cls.directory = _install_fake_engine()
+
+    @classmethod
+    def tearDownClass(cls):
+        os.environ['PATH'] = cls.path
+        shutil.rmtree(cls.directory)
+
+    def setUp(self):
+        self.log_path = os.path.join(self.directory, 'commands.log')
+        os.environ['FAKE_UCI_LOG'] = self.log_path
+        self.addCleanup(os.environ.pop, 'FAKE_UCI_LOG')
+        self.addCleanup(os.remove, self.log_path)
+
+        self.engine = Engine(depth=1)
+        self.addCleanup(self.engine.quit)
+
+    def _commands(self):
+        # What the engine got since the last call, the session commands only
+        with open(self.log_path) as fp:
+            lines = fp.read().splitlines()
+        open(self.log_path, 'w').close()
+
+        return [
+            line
+            for line in lines
+            if line.split()[0] in ('ucinewgame', 'position')
+        ]
+
+    def _analyse(self, moves, fen=None):
+        with mock.patch.object(
+                Engine,
+                '_to_uci',
+                wraps=Engine._to_uci,
+        ) as to_uci:
+            self.engine.analyse(moves=moves, fen=fen)
+
+        return [call.args[0] for call in to_uci.call_args_list]
+
+    def test_new_plies(self):
+        self.engine.analyse(moves=[])
+        self._commands()
+
+        # Only the plies played since the last call are converted
+        self.assertEqual(self._analyse(['e2e4']), ['e2e4'])
+        self.assertEqual(
+            self._analyse(['e2e4', 'e7e5', ('g1', 'f3')]),
+            ['e7e5', ('g1', 'f3')],
+        )
+        self.assertEqual(
+            self._analyse(['e2e4', 'e7e5', ('g1', 'f3')]),
+            [],
+        )
+        self.assertEqual(
+            self._commands(),
+            [
+                'position startpos moves e2e4',
+                'position startpos moves e2e4 e7e5 g1f3',
+                'position startpos moves e2e4 e7e5 g1f3',
+            ],
+        )
+
+    def test_new_game(self):
+        self.engine.analyse(moves=['e2e4', 'e7e5'])
+        self._commands()
+
+        # A take back starts over
+        self.assertEqual(self._analyse(['e2e4']), ['e2e4'])
+        self.assertEqual(
+            self._commands(),
+            ['ucinewgame', 'position startpos moves e2e4'],
+        )
+
+        # So does another game, from the start or from a FEN
+        self.assertEqual(self._analyse(['d2d4']), ['d2d4'])
+        fen = 'k7/8/2K5/8/8/8/8/1Q6 w - - 0 1'
+        self.assertEqual(self._analyse(['b1b7'], fen=fen), ['b1b7'])
+        self.assertEqual(self._analyse([], fen=fen), [])
+        self.assertEqual(
+            self._commands(),
+            [
+                'ucinewgame',
+                'position startpos moves d2d4',
+                'ucinewgame',
+                f'position fen {fen} moves b1b7',
+                'ucinewgame',
+                f'position fen {fen}',
+            ],
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
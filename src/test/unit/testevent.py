@@ -0,0 +1,79 @@
+import unittest
+
+
+from pychess.core.gamer import Game
+from pychess.event import Signal
+from pychess import constant as c
+
+
+class _Emitter:
+    VALUE_SIGNAL = Signal(int)
+    DONE_SIGNAL = Signal()
+
+
+class TestEvent(unittest.TestCase):
+    def test_instances(self):
+        first, second = Game(), Game()
+        first_players, second_players = [], []
+        first.PLAYER_CHANGED_SIGNAL.connect(first_players.append)
+        second.PLAYER_CHANGED_SIGNAL.connect(second_players.append)
+
+        first.move(('e2e4', None))
+        self.assertEqual(first_players, [c.Color.black])
+        self.assertEqual(second_players, [])
+
+        second.move(('d2d4', None))
+        second.move(('d7d5', None))
+        self.assertEqual(first_players, [c.Color.black])
+        self.assertEqual(second_players, [c.Color.black, c.Color.white])
+
+        # Nothing is connected on the class
+        self.assertEqual(Game.PLAYER_CHANGED_SIGNAL.connected_callbacks, [])
+
+    def test_class_connection(self):
+        values = []
+        _Emitter.VALUE_SIGNAL.connect(values.append)
+        self.addCleanup(_Emitter.VALUE_SIGNAL.disconnect, values.append)
+
+        first, second = _Emitter(), _Emitter()
+        first_values = []
+        first.VALUE_SIGNAL.connect(first_values.append)
+
+        first.VALUE_SIGNAL.emit(1)
+        second.VALUE_SIGNAL.emit(2)
+        _Emitter.VALUE_SIGNAL.emit(3)
+        self.assertEqual(values, [1, 2, 3])
+        self.assertEqual(first_values, [1])
+
+    def test_disconnect(self):
+        emitter = _Emitter()
+        calls = []
+
+        def once():
+            calls.append('once')
+            emitter.DONE_SIGNAL.disconnect(once)
+
+        emitter.DONE_SIGNAL.connect(once)
+        emitter.DONE_SIGNAL.connect(lambda: calls.append('always'))
+
+        # The callbacks after the one that disconnects are still called
+        emitter.DONE_SIGNAL.emit()
+        emitter.DONE_SIGNAL.emit()
+        self.assertEqual(calls, ['once', 'always', 'always'])
+
+        # Disconnecting what is not connected does nothing
+        emitter.DONE_SIGNAL.disconnect(once)
+        _Emitter().DONE_SIGNAL.disconnect(once)
+
+    def test_validation(self):
+        emitter = _Emitter()
+        with self.assertRaises(TypeError):
+            emitter.VALUE_SIGNAL.emit('1')
+        with self.assertRaises(TypeError):
+            emitter.VALUE_SIGNAL.connect(1)
+        with self.assertRaises(TypeError):
+            _Emitter.DONE_SIGNAL.emit(1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -354,6 +354,219 @@ class TestGamer(unittest.TestCase):
         expected_result = move_spec
         self.assertEqual(Game.parse_move_spec(move_spec), expected_result)
 
+    def test_apply_moves_trusted(self):
+        moves = [
+            ('e2e4', None), ('e7e5', None), ('g1f3', None), ('b8c6', None),
+            ('f1b5', None), ('a7a6', None), ('b5c6', None), ('d7c6', None),
+            ('e1g1', None), ('f7f6', None), ('f3e5', None), ('f6e5', None),
+            ('d1h5', None),
+        ]
+        game = Game()
+        game.apply_moves(moves)
+        trusted_game = Game()
+        trusted_game.apply_moves(moves, trusted=True)
+
+        self.assertEqual(trusted_game.board.data, game.board.data)
+        self.assertEqual(trusted_game.move_history, game.move_history)
+        self.assertEqual(trusted_game.captured_white, game.captured_white)
+        self.assertEqual(trusted_game.captured_black, game.captured_black)
+        self.assertEqual(trusted_game.capturables, game.capturables)
+        self.assertTrue(trusted_game.move_history[-1].is_check)
+
+        # Checks are kept on the moves before the last one
+        moves = [
+            ('e2e4', None), ('e7e5', None), ('f1c4', None), ('d7d6', None),
+            ('c4f7', None), ('e8f7', None), ('d1f3', None), ('f7e8', None),
+            ('g1e2', None),
+        ]
+        trusted_game = Game()
+        trusted_game.apply_moves(moves, trusted=True)
+        self.assertEqual(
+            [i for i, m in enumerate(trusted_game.move_history) if m.is_check],
+            [4, 6],
+        )
+
+    def test_move_signal(self):
+        payloads = []
+        game = Game()
+        game.MOVE_SIGNAL.connect(payloads.append)
+        game.move(('e2e4', None))
+        game.move(('d7d5', None))
+        game.move(('e4d5', None))
+
+        game_data = payloads[-1]
+        self.assertEqual(len(payloads), 3)
+        self.assertEqual(game_data.src, Square('e4'))
+        self.assertEqual(game_data.dst, Square('d5'))
+        self.assertEqual(game_data.move, game.move_history[-1])
+        self.assertTrue(game_data.move.is_capture)
+        self.assertEqual(game_data.captured_black, game.captured_black)
+        self.assertEqual(game_data.leader, c.Color.white)
+        self.assertEqual(game_data.lead, 1)
+        self.assertEqual(game_data.evaluation, game.evaluation)
+
+    def test_repetition(self):
+        reasons = []
+        game = Game()
+        game.DRAW_SIGNAL.connect(reasons.append)
+        moves = ['g1f3', 'g8f6', 'f3g1', 'f6g8'] * 2
+        for move in moves:
+            self.assertFalse(game.is_game_over)
+            game.move((move, None))
+
+        self.assertTrue(game.is_game_over)
+        self.assertIsNone(game.winner)
+        self.assertEqual(game.draw_reason, c.DrawReason.repetition)
+        self.assertEqual(reasons, [c.DrawReason.repetition])
+        self.assertEqual(game.halfmove_clock, 8)
+
+        # No pawn can take the e4 pawn, its first position counts too
+        game = Game()
+        moves = ['e2e4'] + ['g8f6', 'g1f3', 'f6g8', 'f3g1'] * 2
+        for move in moves:
+            self.assertFalse(game.is_game_over)
+            game.move((move, None))
+
+        self.assertTrue(game.is_game_over)
+        self.assertEqual(game.draw_reason, c.DrawReason.repetition)
+
+    def test_insufficient_material(self):
+        game = Game()
+        game.board.clear()
+        for piece_type, color, address in [
+                (c.PieceType.king, c.Color.white, 'e1'),
+                (c.PieceType.king, c.Color.black, 'e8'),
+                (c.PieceType.bishop, c.Color.white, 'c1'),
+                (c.PieceType.pawn, c.Color.black, 'd2'),
+        ]:
+            game.board.add_piece(Piece(piece_type, color), Square(address))
+
+        # The king takes the last pawn, a bishop cannot mate alone
+        game.move(('e1d2', None))
+        self.assertTrue(game.is_game_over)
+        self.assertIsNone(game.winner)
+        self.assertEqual(
+            game.draw_reason,
+            c.DrawReason.insufficient_material,
+        )
+
+    def test_fen(self):
+        game = Game()
+        self.assertEqual(
+            game.fen,
+            'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+        )
+
+        game.move(('e2e4', None))
+        game.move(('g8f6', None))
+        fen = 'rnbqkb1r/pppppppp/5n2/8/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 1 2'
+        self.assertEqual(game.fen, fen)
+
+        other = Game()
+        other.set_fen(fen)
+        self.assertEqual(other.fen, fen)
+        self.assertTrue(other.move(('e4e5', None)))
+        self.assertTrue(other.move(('d7d5', None)))
+        self.assertTrue(other.move(('e5d6', None)))
+        self.assertEqual(
+            other.fen,
+            'rnbqkb1r/ppp1pppp/3P1n2/8/8/8/PPPP1PPP/RNBQKBNR b KQkq - 0 3',
+        )
+
+        with self.assertRaises(ValueError):
+            other.set_fen('8/8/8/8/8/8/8/8 w - -')
+
+        start = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR'
+        for fen in [
+                f'{start} w KQkq e3 0 1',
+                f'{start} b KQkq e3 0 1',
+                'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR w KQkq e3 0 1',
+                'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e6 0 1',
+                f'{start} w KQkq - -1 1',
+                f'{start} w KQkq - 0 x',
+        ]:
+            with self.assertRaises(ValueError):
+                other.set_fen(fen)
+
+        fen = 'rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq e6 0 2'
+        other.set_fen(fen)
+        self.assertEqual(other.fen, fen)
+
+    def test_set_fen_mate(self):
+        game = Game()
+        game.set_fen('k7/1Q6/2K5/8/8/8/8/8 b - - 0 40')
+        self.assertTrue(game.is_game_over)
+        self.assertEqual(game.winner, c.Color.white)
+
+        # White mates in one from here
+        game.set_fen('k7/8/2K5/8/8/8/8/1Q6 w - - 0 40')
+        self.assertFalse(game.is_game_over)
+        game.move(('b1b7', None))
+        self.assertTrue(game.is_game_over)
+        self.assertEqual(game.winner, c.Color.white)
+
+    def test_fen_finished_game(self):
+        fools_mate = (
+            'rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3'
+        )
+        for moves, fen, is_game_over in [
+                (['f2f3', 'e7e5', 'g2g4', 'd8h4'], fools_mate, True),
+                (
+                    ['g1f3', 'g8f6', 'f3g1', 'f6g8'] * 2,
+                    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR '
+                    'w KQkq - 8 5',
+                    False,
+                ),
+        ]:
+            game = Game()
+            for move in moves:
+                game.move((move, None))
+            self.assertTrue(game.is_game_over)
+            self.assertEqual(game.fen, fen)
+
+            # The repetitions are not part of the FEN
+            other = Game()
+            other.set_fen(fen)
+            self.assertEqual(other.is_game_over, is_game_over)
+            self.assertEqual(other.fen, fen)
+
+        self.assertEqual(other.winner, None)
+        other.set_fen(fools_mate)
+        self.assertEqual(other.winner, c.Color.black)
+
+        game = Game()
+        game.set_fen('k7/8/2K5/8/8/8/8/1Q6 w - - 0 40')
+        game.move(('b1b7', None))
+        self.assertEqual(game.fen, 'k7/1Q6/2K5/8/8/8/8/8 b - - 1 40')
+
+    def test_castling_rights(self):
+        fen = 'r3k2r/8/8/8/8/8/8/R3K2R w K - 0 1'
+        game = Game()
+        game.set_fen(fen)
+        self.assertEqual(game.fen, fen)
+        self.assertFalse(game.move(('e1c1', None)))
+        self.assertTrue(game.move(('e1g1', None)))
+
+        # A rook move only loses the castling on its side
+        game.set_fen('r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1')
+        game.move(('h1h2', None))
+        game.move(('a8a7', None))
+        self.assertEqual(
+            game.fen,
+            '4k2r/r7/8/8/8/8/7R/R3K3 w Qk - 2 2',
+        )
+        self.assertTrue(game.move(('e1c1', None)))
+
+        # So does a rook taken on its corner
+        game.set_fen('r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1')
+        game.move(('a1a8', None))
+        self.assertEqual(game.fen, 'R3k2r/8/8/8/8/8/8/4K2R b Kk - 0 1')
+        self.assertFalse(game.move(('e8c8', None)))
+
+        # Rights without their rook are dropped
+        game.set_fen('4k3/8/8/8/8/8/8/4K2R w KQkq - 0 1')
+        self.assertEqual(game.fen, '4k3/8/8/8/8/8/8/4K2R w K - 0 1')
+
 
 if __name__ == '__main__':
     unittest.main()
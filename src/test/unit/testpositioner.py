@@ -0,0 +1,90 @@
+import unittest
+
+
+from pychess.core.positioner import Position, START_FEN, WHITE, BLACK
+
+
+def _perft(position, depth):
+    if depth == 0:
+        return 1
+
+    nb_nodes = 0
+    for move in position.legal_moves():
+        position.make_move(move)
+        nb_nodes += _perft(position, depth - 1)
+        position.unmake_move()
+
+    return nb_nodes
+
+
+class TestPositioner(unittest.TestCase):
+    def _check_perft(self, fen, expected):
+        position = Position(fen)
+        for depth, nb_nodes in enumerate(expected, 1):
+            self.assertEqual(_perft(position, depth), nb_nodes, depth)
+
+        # Unmaking every move gives back the same position
+        self.assertEqual(position.fen(), Position(fen).fen())
+        self.assertEqual(position.hash, Position(fen).hash)
+        self.assertEqual(position.score, Position(fen).score)
+
+    def test_perft_start(self):
+        self._check_perft(START_FEN, [20, 400, 8902])
+
+    def test_perft_kiwipete(self):
+        self._check_perft(
+            'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - '
+            '0 1',
+            [48, 2039, 97862],
+        )
+
+    def test_perft_en_passant(self):
+        self._check_perft(
+            '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+            [14, 191, 2812],
+        )
+
+    def test_perft_promotion(self):
+        self._check_perft(
+            'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+            [6, 264, 9467],
+        )
+        self._check_perft(
+            'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+            [44, 1486],
+        )
+
+    def test_fen(self):
+        fen = 'rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq e6 0 2'
+        position = Position(fen)
+        self.assertEqual(position.fen(), fen)
+        self.assertEqual(position.turn, WHITE)
+
+        position.push_uci('g1f3')
+        self.assertEqual(position.turn, BLACK)
+        self.assertEqual(
+            position.fen(),
+            'rnbqkbnr/pppp1ppp/8/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2',
+        )
+
+    def test_mate_and_stalemate(self):
+        position = Position()
+        for uci in ['f2f3', 'e7e5', 'g2g4', 'd8h4']:
+            position.push_uci(uci)
+        self.assertTrue(position.is_checkmate())
+
+        position = Position('k7/8/1Q6/8/8/8/8/2K5 b - - 0 1')
+        self.assertTrue(position.is_stalemate())
+
+    def test_san(self):
+        position = Position()
+        move = position.parse_uci('g1f3')
+        self.assertEqual(position.move_to_san(move), 'Nf3')
+
+        position = Position('k7/2P5/1K6/8/8/8/8/8 w - - 0 1')
+        move = position.parse_uci('c7c8q')
+        self.assertEqual(position.move_to_san(move), 'c8=Q#')
+
+
+if __name__ == '__main__':
+    unittest.main()
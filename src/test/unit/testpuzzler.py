@@ -0,0 +1,84 @@
+import unittest
+from unittest import mock
+
+
+from pychess.core import puzzler
+
+
+class TestPuzzler(unittest.TestCase):
+    def test_parse_epd(self):
+        epd = puzzler.parse_epd(
+            'k7/8/2K5/8/8/8/8/1Q6 w - - bm Qb7#; dm 1; id "mate in one";'
+        )
+        self.assertEqual(epd.fen, 'k7/8/2K5/8/8/8/8/1Q6 w - - 0 1')
+        self.assertEqual(
+            epd.operations,
+            {'bm': ['Qb7#'], 'dm': ['1'], 'id': ['mate in one']},
+        )
+
+        epd = puzzler.parse_epd('k7/8/2K5/8/8/8/8/1Q6 b - - 3 40')
+        self.assertEqual(epd.fen, 'k7/8/2K5/8/8/8/8/1Q6 b - - 3 40')
+        self.assertEqual(epd.operations, {})
+
+        epd = puzzler.parse_epd('k7/8/2K5/8/8/8/8/1Q6 w - - hmvc 5; fmvn 9;')
+        self.assertEqual(epd.fen, 'k7/8/2K5/8/8/8/8/1Q6 w - - 5 9')
+
+        with self.assertRaises(ValueError):
+            puzzler.parse_epd('k7/8/2K5/8/8/8/8/1Q6 w')
+        with self.assertRaises(ValueError):
+            puzzler.parse_epd('k7/8/2K5/8/8/8/8/1Q6 w - - hmvc;')
+
+    def test_process(self):
+        lines = [
+            '# puzzles',
+            'k7/8/2K5/8/8/8/8/1Q6 w - - dm 1; id "queen";',
+            '6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - dm 2;',
+            '',
+            '8/8/8/8/8/8/8/8 w - -',
+            'k7/8/8/8/8/8/8/K6P w - -',
+            'k7/1Q6/8/8/8/8/8/K7 w - -',
+            'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq e3',
+            '6k1/5ppp/8/8/8/8/8/R5K1 w - - dm;',
+        ]
+        checker = puzzler.PuzzleChecker(
+            checks=(puzzler.PuzzleChecker.LEGAL, puzzler.PuzzleChecker.MATE),
+            nb_workers=1,
+            chunk_size=2,
+        )
+        results = sorted(checker.process(lines), key=lambda r: r.index)
+        self.assertEqual([r.index for r in results], [1, 2, 4, 5, 6, 7, 8])
+        self.assertEqual(
+            [r.status for r in results],
+            ['ok', 'ok'] + ['invalid'] * 5,
+        )
+
+        self.assertEqual(results[0].id, 'queen')
+        self.assertEqual(results[0].nb_legal_moves, 28)
+        self.assertEqual(results[0].mate_move, 'b1b7')
+        self.assertEqual(results[1].mate_move, 'a1a8')
+        self.assertTrue(all(r.time_ms >= 0 for r in results))
+
+        with self.assertRaises(ValueError):
+            puzzler.PuzzleChecker(checks=('perft', ))
+
+    def test_check_error(self):
+        puzzler._init_worker(puzzler.PuzzleChecker.CHECKS, None, None)
+        self.addCleanup(puzzler._WORKER.clear)
+
+        line = 'k7/8/2K5/8/8/8/8/1Q6 w - - bm Qb7#;'
+        with mock.patch.object(
+                puzzler,
+                '_get_engine',
+                side_effect=RuntimeError('engine died'),
+        ):
+            result = puzzler._check_line(0, line)
+        self.assertEqual(result.status, 'error')
+        self.assertEqual(result.error, 'RuntimeError: engine died')
+
+        # The next line is checked as usual
+        result = puzzler._check_line(1, 'k7/8/2K5/8/8/8/8/1Q6 w - - dm 1;')
+        self.assertEqual((result.status, result.mate_move), ('ok', 'b1b7'))
+
+
+if __name__ == '__main__':
+    unittest.main()
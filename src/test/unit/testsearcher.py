@@ -0,0 +1,51 @@
+import unittest
+
+
+from pychess.core.positioner import Position
+from pychess.core.searcher import Searcher
+
+
+class TestSearcher(unittest.TestCase):
+    def test_mate_in_one(self):
+        position = Position('6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1')
+        info = Searcher().search(position, depth=3)
+        self.assertEqual(info.best_move, 'a1a8')
+        self.assertEqual(info.mate, 1)
+        self.assertIsNone(info.score)
+
+    def test_mate_in_two(self):
+        position = Position('2k5/8/1K6/8/8/8/8/7R w - - 0 1')
+        fen = position.fen()
+        info = Searcher().search(position, depth=4)
+        self.assertEqual(info.mate, 2)
+        self.assertEqual(len(info.pv), 3)
+        self.assertEqual(info.pv[-1][2:], 'd8')
+
+        # The searched position is left untouched
+        self.assertEqual(position.fen(), fen)
+
+    def test_mated(self):
+        position = Position('k7/1Q6/2K5/8/8/8/8/8 b - - 0 1')
+        info = Searcher().search(position, depth=2)
+        self.assertIsNone(info.best_move)
+        self.assertEqual(info.mate, 0)
+
+    def test_capture(self):
+        # The undefended queen is taken
+        position = Position('k7/8/8/3q4/8/8/8/K2R4 w - - 0 1')
+        info = Searcher().search(position, depth=2)
+        self.assertEqual(info.best_move, 'd1d5')
+
+    def test_limits(self):
+        position = Position()
+        info = Searcher().search(position, nodes=500)
+        self.assertIsNotNone(info.best_move)
+        self.assertLess(info.nodes, 500 + Searcher.CHECK_EVERY)
+
+        move = position.parse_uci('a2a3')
+        info = Searcher().search(position, depth=2, moves=[move])
+        self.assertEqual(info.best_move, 'a2a3')
+
+
+if __name__ == '__main__':
+    unittest.main()
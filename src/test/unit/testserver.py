@@ -0,0 +1,142 @@
+import asyncio
+import unittest
+from unittest import mock
+
+
+from pychess.core import server
+from pychess.core.server import GameClient, GameServer, benchmark
+
+
+class _StubWriter:
+    def __init__(self):
+        self.is_closed = False
+
+    def close(self):
+        self.is_closed = True
+
+
+class TestServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = GameServer(port=0, nb_workers=1, max_pending=4)
+        await self.server.start()
+
+        self.client = GameClient()
+        await self.client.connect(port=self.server.port)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.server.close()
+
+    async def _events(self, nb_events):
+        return [
+            await asyncio.wait_for(self.client.events.get(), 5)
+            for _ in range(nb_events)
+        ]
+
+    async def test_game(self):
+        request = self.client.request
+        self.assertEqual(await request('new 5 2'), 'ok 1')
+        self.assertEqual(await request('subscribe 1'), 'ok 1')
+        self.assertEqual(await request('result 1'), 'result 1 *')
+        self.assertEqual(
+            await request('clock 1'),
+            'clock 1 300000 300000 white',
+        )
+
+        self.assertEqual(await request('move 1 f2f3'), 'ok 1 f2f3')
+        clock = (await request('clock 1')).split()
+        self.assertEqual(clock[2], '302000')
+        self.assertLessEqual(int(clock[3]), 300000)
+        self.assertEqual(clock[4], 'black')
+
+        self.assertEqual(
+            await request('move 1 e7e4'),
+            'error illegal move',
+        )
+        for uci in ('e7e5', 'g2g4'):
+            self.assertEqual(await request(f'move 1 {uci}'), f'ok 1 {uci}')
+        self.assertEqual(await request('move 1 d8h4'), 'ok 1 d8h4 0-1')
+
+        events = await self._events(5)
+        self.assertEqual(
+            [event.split()[:4] for event in events[:4]],
+            [
+                ['event', '1', 'move', uci]
+                for uci in ('f2f3', 'e7e5', 'g2g4', 'd8h4')
+            ],
+        )
+        self.assertEqual(events[4], 'event 1 result 0-1')
+
+        self.assertEqual(await request('result 1'), 'result 1 0-1')
+        self.assertEqual(
+            await request('move 1 a2a3'),
+            'error game over 0-1',
+        )
+
+    async def test_errors(self):
+        request = self.client.request
+        self.assertEqual(await request('new'), 'ok 1')
+        self.assertEqual(await request('move 2 e2e4'), 'error unknown game 2')
+        self.assertEqual(
+            await request('move 1'),
+            'error malformed request move 1',
+        )
+        self.assertEqual(await request('draw 1'), 'error unknown command draw')
+        self.assertEqual(await request('unsubscribe 1'), 'ok 1')
+
+    async def test_slow_subscriber(self):
+        request = self.client.request
+        self.assertEqual(await request('new'), 'ok 1')
+
+        # A subscriber whose outbox is never emptied
+        writer = _StubWriter()
+        connection = server._Connection(writer, max_pending=2)
+        self.assertEqual(
+            await self.server._subscribe(connection, '1'),
+            'ok 1',
+        )
+
+        moves = ['g1f3', 'g8f6', 'f3g1', 'f6g8']
+        for uci in moves[:2]:
+            self.assertEqual(await request(f'move 1 {uci}'), f'ok 1 {uci}')
+        self.assertFalse(writer.is_closed)
+
+        # Once it falls behind it is dropped, the game goes on
+        for uci in moves[2:]:
+            self.assertEqual(await request(f'move 1 {uci}'), f'ok 1 {uci}')
+        self.assertTrue(writer.is_closed)
+        self.assertEqual(connection.outbox.qsize(), 2)
+        self.assertEqual(self.server._sessions[1].subscribers, set())
+
+    def test_play_move(self):
+        server._create_game(0)
+        self.addCleanup(server._drop_game, 0)
+        self.assertEqual(server._play_move(0, 'e2e5'), (False, 'illegal move'))
+        self.assertEqual(server._play_move(0, 'zz'), (False, 'illegal move'))
+
+        # A bug in the rules is logged instead of refusing the move
+        with mock.patch.object(
+                server.Game,
+                'move',
+                side_effect=AttributeError('bug'),
+        ):
+            with self.assertLogs(server.logger, 'ERROR'):
+                self.assertEqual(
+                    server._play_move(0, 'e2e4'),
+                    (False, 'internal error'),
+                )
+        self.assertEqual(server._play_move(0, 'e2e4'), (True, None))
+
+    async def test_benchmark(self):
+        result = await benchmark(
+            port=self.server.port,
+            nb_clients=2,
+            nb_moves=4,
+        )
+        self.assertEqual(result.nb_moves + result.nb_refused, 8)
+        self.assertLessEqual(result.p50_latency, result.p99_latency)
+        self.assertEqual(self.server.nb_games, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+
+from pychess.core.solver import MateSolver
+
+
+class TestSolver(unittest.TestCase):
+    def test_mate_in_one(self):
+        solver = MateSolver()
+        result = solver.solve('6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1', 3)
+        self.assertEqual(result.mate_in, 1)
+        self.assertEqual(result.pv, ['a1a8'])
+        self.assertGreater(result.nodes, 0)
+
+    def test_mate_in_two(self):
+        solver = MateSolver()
+        result = solver.solve('2k5/8/1K6/8/8/8/8/7R w - - 0 1', 3)
+        self.assertEqual(result.mate_in, 2)
+        self.assertEqual(len(result.pv), 3)
+        self.assertEqual(result.pv[-1][2:], 'd8')
+
+    def test_quiet_first_move(self):
+        # The king has to step in first, there is no check to start with
+        fen = '1k6/8/1K6/8/8/8/8/2R5 w - - 0 1'
+        self.assertEqual(MateSolver().solve(fen, 2).mate_in, 2)
+        self.assertIsNone(MateSolver(checks_only=True).solve(fen, 2).mate_in)
+
+    def test_no_mate(self):
+        solver = MateSolver()
+        result = solver.solve('kr6/8/8/8/8/8/8/K7 b - - 0 1', 2)
+        self.assertIsNone(result.mate_in)
+        self.assertEqual(result.pv, [])
+        self.assertGreater(solver.tt_size, 0)
+
+        # Proven depths are served by the table on the next search
+        result = solver.solve('kr6/8/8/8/8/8/8/K7 b - - 0 1', 2)
+        self.assertIsNone(result.mate_in)
+        self.assertGreater(result.tt_hits, 0)
+
+        solver.clear()
+        self.assertEqual(solver.tt_size, 0)
+
+    def test_castling(self):
+        # Only the king on c1 covers c2, the rook alone does not mate
+        fen = '8/8/8/8/2ppp3/2pkp3/8/R3K1N1 w Q - 0 1'
+        result = MateSolver().solve(fen, 1)
+        self.assertEqual(result.pv, ['e1c1'])
+
+        fen = '8/8/8/8/2ppp3/2pkp3/8/R3K1N1 w - - 0 1'
+        self.assertIsNone(MateSolver().solve(fen, 1).mate_in)
+
+        # The king side right does not allow castling queen side
+        fen = '8/8/8/8/2ppp3/2pkp3/8/R3K1NR w K - 0 1'
+        self.assertIsNone(MateSolver().solve(fen, 1).mate_in)
+
+    def test_promotion(self):
+        result = MateSolver().solve('k7/2P5/1K6/8/8/8/8/8 w - - 0 1', 1)
+        self.assertEqual(result.mate_in, 1)
+        self.assertIn(result.pv, [['c7c8q'], ['c7c8r']])
+
+
+if __name__ == '__main__':
+    unittest.main()